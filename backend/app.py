@@ -1,15 +1,29 @@
+import asyncio
+import hashlib
+import heapq
 import json
 import logging
+import math
+import mmap
+import multiprocessing
+import os
+import queue
 import random
+import sqlite3
+import struct
 import threading
 import time
 import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Dict, Optional, Literal, List, Any, Union, Tuple, TypedDict, cast
+from typing import Callable, Dict, Iterator, Optional, Set, Literal, List, Any, Union, Tuple, TypedDict, cast
 
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -17,11 +31,90 @@ logger = logging.getLogger(__name__)
 
 # Initialize Flask application
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=["Retry-After", "ETag"])
 
 # API version tracking
 VERSION = "1.0.0"
 
+# Worker pool configuration
+WORKER_POOL_SIZE = int(os.environ.get("WORKER_POOL_SIZE", "4"))  # Number of pre-started transcription workers
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", "2"))  # Workers per pipeline stage
+RESOLVE_MODEL_WORKERS = int(os.environ.get("RESOLVE_MODEL_WORKERS", "8"))
+CATEGORIZE_WORKERS = int(os.environ.get("CATEGORIZE_WORKERS", "16"))
+FINALIZE_WORKERS = int(os.environ.get("FINALIZE_WORKERS", "2"))
+STAGE_QUEUE_DEPTH = int(os.environ.get("STAGE_QUEUE_DEPTH", "4"))  # Jobs buffered between stages before the previous stage blocks
+JOB_QUEUE_MAX_DEPTH = int(os.environ.get("JOB_QUEUE_MAX_DEPTH", "100"))  # Max jobs waiting for a worker
+INTERACTIVE_PRIORITY_WEIGHT = int(os.environ.get("INTERACTIVE_PRIORITY_WEIGHT", "4"))  # Interactive dequeues per bulk dequeue
+BULK_PRIORITY_WEIGHT = int(os.environ.get("BULK_PRIORITY_WEIGHT", "1"))
+ADMISSION_MAX_QUEUE_DEPTH = int(os.environ.get("ADMISSION_MAX_QUEUE_DEPTH", "50"))  # Shed uploads above this many queued jobs
+ADMISSION_MAX_ESTIMATED_WAIT = float(os.environ.get("ADMISSION_MAX_ESTIMATED_WAIT", "120"))  # Shed uploads above this estimated wait (seconds)
+ADMISSION_MAX_USER_BACKLOG = int(os.environ.get("ADMISSION_MAX_USER_BACKLOG", "10"))  # Throttle a user above this many queued jobs
+ADMISSION_DEFAULT_JOB_SECONDS = float(os.environ.get("ADMISSION_DEFAULT_JOB_SECONDS", "6"))  # Assumed job duration before any are measured
+CATEGORIZATION_EXECUTION = os.environ.get("CATEGORIZATION_EXECUTION", "async")  # "async" (event loop) or "thread"
+LLM_MOCK_LATENCY_SECONDS = float(os.environ.get("LLM_MOCK_LATENCY_SECONDS", "1.5"))  # Simulated provider round trip
+JOB_DEFAULT_DEADLINE_SECONDS = float(os.environ.get("JOB_DEFAULT_DEADLINE_SECONDS", "300"))  # Deadline when the client doesn't set one
+JOB_MAX_DEADLINE_SECONDS = float(os.environ.get("JOB_MAX_DEADLINE_SECONDS", "3600"))  # Upper bound on client-requested deadlines
+STAGE_TIMEOUT_TRANSCRIPTION = float(os.environ.get("STAGE_TIMEOUT_TRANSCRIPTION", "60"))  # Per-stage time budgets (seconds)
+STAGE_TIMEOUT_PREFERENCE_LOOKUP = float(os.environ.get("STAGE_TIMEOUT_PREFERENCE_LOOKUP", "10"))
+STAGE_TIMEOUT_CATEGORIZATION = float(os.environ.get("STAGE_TIMEOUT_CATEGORIZATION", "15"))
+STAGE_CALL_WORKERS = int(os.environ.get("STAGE_CALL_WORKERS", "16"))  # Threads for blocking stage calls that need a timeout
+LLM_BATCHING_ENABLED = os.environ.get("LLM_BATCHING_ENABLED", "true").lower() == "true"  # Micro-batch async categorizations
+LLM_BATCH_MAX_SIZE = int(os.environ.get("LLM_BATCH_MAX_SIZE", "16"))  # Send a batch once this many requests are waiting
+LLM_BATCH_MAX_WAIT_MS = float(os.environ.get("LLM_BATCH_MAX_WAIT_MS", "50"))  # Longest a request waits for its batch to fill
+LLM_MOCK_BATCH_ITEM_SECONDS = float(os.environ.get("LLM_MOCK_BATCH_ITEM_SECONDS", "0.05"))  # Simulated extra latency per batched item
+LLM_MOCK_FAILURE_RATE = float(os.environ.get("LLM_MOCK_FAILURE_RATE", "0"))  # Fraction of simulated provider calls that fail
+LLM_RETRY_MAX_ATTEMPTS = int(os.environ.get("LLM_RETRY_MAX_ATTEMPTS", "3"))  # Provider call attempts before giving up
+LLM_RETRY_BASE_DELAY_MS = float(os.environ.get("LLM_RETRY_BASE_DELAY_MS", "200"))  # Backoff before the first retry, doubled each retry
+LLM_RETRY_MAX_DELAY_MS = float(os.environ.get("LLM_RETRY_MAX_DELAY_MS", "2000"))  # Upper bound on a single backoff
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.environ.get("LLM_BREAKER_FAILURE_THRESHOLD", "5"))  # Consecutive failures that open a provider's circuit
+LLM_BREAKER_RESET_SECONDS = float(os.environ.get("LLM_BREAKER_RESET_SECONDS", "30"))  # How long an open circuit fails fast before probing
+LLM_RATE_LIMIT_PER_SECOND = float(os.environ.get("LLM_RATE_LIMIT_PER_SECOND", "50"))  # Requests per second per provider, 0 for unlimited; override with LLM_RATE_LIMIT_PER_SECOND_<PROVIDER>
+LLM_RATE_LIMIT_BURST = float(os.environ.get("LLM_RATE_LIMIT_BURST", "20"))  # Requests a provider may receive at once after a quiet spell
+DB_LOOKUP_RATE_LIMIT_PER_SECOND = float(os.environ.get("DB_LOOKUP_RATE_LIMIT_PER_SECOND", "20"))  # Preference DB queries per second, 0 for unlimited
+DB_LOOKUP_RATE_LIMIT_BURST = float(os.environ.get("DB_LOOKUP_RATE_LIMIT_BURST", "10"))
+LLM_CONCURRENCY_INITIAL = int(os.environ.get("LLM_CONCURRENCY_INITIAL", "16"))  # Starting in-flight limit per provider, adapted by AIMD
+LLM_CONCURRENCY_MIN = int(os.environ.get("LLM_CONCURRENCY_MIN", "1"))
+LLM_CONCURRENCY_MAX = int(os.environ.get("LLM_CONCURRENCY_MAX", "128"))
+DB_LOOKUP_CONCURRENCY_INITIAL = int(os.environ.get("DB_LOOKUP_CONCURRENCY_INITIAL", "8"))  # Starting in-flight limit for preference DB queries
+DB_LOOKUP_CONCURRENCY_MIN = int(os.environ.get("DB_LOOKUP_CONCURRENCY_MIN", "1"))
+DB_LOOKUP_CONCURRENCY_MAX = int(os.environ.get("DB_LOOKUP_CONCURRENCY_MAX", "64"))
+ADAPTIVE_LATENCY_TOLERANCE = float(os.environ.get("ADAPTIVE_LATENCY_TOLERANCE", "2.0"))  # Back off when a window's median latency exceeds this multiple of the baseline
+ADAPTIVE_DECREASE_FACTOR = float(os.environ.get("ADAPTIVE_DECREASE_FACTOR", "0.5"))  # Multiply the limit by this on congestion
+LLM_HEDGING_ENABLED = os.environ.get("LLM_HEDGING_ENABLED", "false").lower() == "true"  # Race a slow categorization against the other provider
+LLM_HEDGE_PERCENTILE = float(os.environ.get("LLM_HEDGE_PERCENTILE", "95"))  # Hedge once a call is slower than this latency percentile
+LLM_HEDGE_MIN_SAMPLES = int(os.environ.get("LLM_HEDGE_MIN_SAMPLES", "20"))  # Latency samples needed before the percentile is trusted
+LLM_HEDGE_DEFAULT_DELAY_MS = float(os.environ.get("LLM_HEDGE_DEFAULT_DELAY_MS", "3000"))  # Hedge delay until enough samples exist
+LLM_HEDGE_MAX_RATE = float(os.environ.get("LLM_HEDGE_MAX_RATE", "0.1"))  # Hedges allowed per categorization, on average
+JOB_STORE = os.environ.get("JOB_STORE", "memory")  # "memory" or "sqlite"
+JOB_STORE_PATH = os.environ.get("JOB_STORE_PATH", "jobs.db")  # SQLite database file
+JOB_STORE_FLUSH_INTERVAL_MS = float(os.environ.get("JOB_STORE_FLUSH_INTERVAL_MS", "200"))  # How often buffered progress is written
+JOB_STORE_CHANGE_POLL_MS = float(os.environ.get("JOB_STORE_CHANGE_POLL_MS", "100"))  # How often the SQLite change log is checked for other processes' writes
+JOB_RETENTION_COMPLETED_MINUTES = float(os.environ.get("JOB_RETENTION_COMPLETED_MINUTES", "60"))  # How long finished jobs are kept, 0 to keep forever
+JOB_RETENTION_FAILED_MINUTES = float(os.environ.get("JOB_RETENTION_FAILED_MINUTES", "30"))
+JOB_RETENTION_CANCELLED_MINUTES = float(os.environ.get("JOB_RETENTION_CANCELLED_MINUTES", "10"))
+JOB_RETENTION_MAX_JOBS = int(os.environ.get("JOB_RETENTION_MAX_JOBS", "10000"))  # Evict the oldest finished jobs above this many, 0 for no cap
+JOB_RETENTION_MAX_BYTES = int(os.environ.get("JOB_RETENTION_MAX_BYTES", str(64 * 1024 * 1024)))  # ...or above this many bytes, 0 for no cap
+JOB_REAPER_INTERVAL_SECONDS = float(os.environ.get("JOB_REAPER_INTERVAL_SECONDS", "30"))  # How often retention is enforced
+JOB_EVENTS_MAX_BACKLOG = int(os.environ.get("JOB_EVENTS_MAX_BACKLOG", "10000"))  # Recent job changes kept for event stream catch-up
+JOB_EVENTS_HEARTBEAT_SECONDS = float(os.environ.get("JOB_EVENTS_HEARTBEAT_SECONDS", "15"))  # Idle time before an event stream sends a keep-alive
+JOB_LONG_POLL_MAX_SECONDS = float(os.environ.get("JOB_LONG_POLL_MAX_SECONDS", "30"))  # Longest ?wait= a job status request may block for
+AUDIO_SPOOL_DIR = os.environ.get("AUDIO_SPOOL_DIR", "audio_spool")  # Where accepted audio is kept until transcribed
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(100 * 1024 * 1024)))  # Largest audio upload accepted
+UPLOAD_CHUNK_BYTES = int(os.environ.get("UPLOAD_CHUNK_BYTES", str(64 * 1024)))  # Read size when streaming an upload to the spool
+AUDIO_DEDUP_ENABLED = os.environ.get("AUDIO_DEDUP_ENABLED", "true").lower() == "true"  # Reuse or join jobs for identical audio
+AUDIO_DEDUP_MAX_ENTRIES = int(os.environ.get("AUDIO_DEDUP_MAX_ENTRIES", "10000"))  # Audio hashes remembered for dedup
+JOB_MAX_RECOVERY_ATTEMPTS = int(os.environ.get("JOB_MAX_RECOVERY_ATTEMPTS", "3"))  # Restarts a job may be resumed across before it is failed
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "30"))  # How long a process's hold on its unfinished jobs lasts unrenewed; also how often orphaned jobs are looked for
+TRANSCRIPTION_EXECUTOR = os.environ.get("TRANSCRIPTION_EXECUTOR", "thread")  # "thread" or "process"
+PROCESS_POOL_SIZE = int(os.environ.get("PROCESS_POOL_SIZE", str(os.cpu_count() or 2)))  # Worker processes in "process" mode
+TRANSCRIPTION_SEGMENT_BYTES = int(os.environ.get("TRANSCRIPTION_SEGMENT_BYTES", str(1024 * 1024)))  # PCM WAV clips with more sample bytes than this are split (~30s of 16kHz 16-bit mono)
+TRANSCRIPTION_SEGMENT_OVERLAP_BYTES = int(os.environ.get("TRANSCRIPTION_SEGMENT_OVERLAP_BYTES", str(32 * 1024)))  # Audio shared by neighbouring segments
+TRANSCRIPTION_SILENCE_SEARCH_BYTES = int(os.environ.get("TRANSCRIPTION_SILENCE_SEARCH_BYTES", str(64 * 1024)))  # How far either side of a cut to look for silence
+TRANSCRIPTION_SEGMENT_WORKERS = int(os.environ.get("TRANSCRIPTION_SEGMENT_WORKERS", "8"))  # Segments transcribed at once across all jobs
+
+# Reject oversized request bodies before they are parsed; allow a little room for the multipart framing
+app.config["MAX_CONTENT_LENGTH"] = UPLOAD_MAX_BYTES + 64 * 1024
+
 # Job status constants
 class JobStatus:
     """Enum-like class for job status values"""
@@ -29,6 +122,10 @@ class JobStatus:
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+# Statuses a job never leaves, and which retention may remove
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
 
 # Type definitions
 class TranscriptionCategories(TypedDict):
@@ -47,166 +144,3811 @@ class TranscriptionJob(TypedDict):
     completed_at: Optional[str]
     result: Optional[str]
     error: Optional[str]
+    failure_reason: Optional[str]
+    deadline_at: Optional[str]
     categories: Optional[TranscriptionCategories]
+    user_id: Optional[str]
+    priority: str
+    last_stage: Optional[str]
+    recovery_attempts: int
+    audio_hash: Optional[str]
+    duplicate_of: Optional[str]
+    segments: Optional[List[str]]
+    revision: int
+
+class WavLayout(TypedDict):
+    """Type for where the PCM samples sit in a WAV file"""
+    data_start: int
+    data_end: int
+    channels: int
+    sample_width: int
+    sample_rate: int
+
+
+class JobChangeFeed:
+    """Sequence of job changes that requests can wait on.
+    
+    The job store publishes every write with its job ID and the change
+    sequence number it assigned, in order; with a shared store that includes
+    writes made by other processes. A bounded log of recent changes lets a subscriber ask
+    which jobs changed since the last sequence it saw, so bursts of
+    progress updates to one job collapse into a single change. Requests
+    interested in a single job watch() it instead, and are only woken by
+    changes to that job.
+    """
+    
+    def __init__(self, max_events: int, start_sequence: int = 0):
+        """Create an empty feed.
+        
+        Args:
+            max_events: Recent changes kept for changes_since()
+            start_sequence: The store's latest change sequence when the feed starts
+        """
+        self._condition = threading.Condition()
+        self._events: deque = deque(maxlen=max(1, max_events))
+        self._sequence = start_sequence
+        # Changes at or before this sequence are no longer in the log
+        self._floor = start_sequence
+        self._watchers: Dict[str, List[threading.Event]] = {}
+    
+    @property
+    def sequence(self) -> int:
+        """The sequence number of the latest change."""
+        with self._condition:
+            return self._sequence
+    
+    def publish(self, job_id: str, sequence: int) -> None:
+        """Record a change to a job and wake everyone waiting.
+        
+        Args:
+            job_id: The ID of the job that changed
+            sequence: The change's sequence number; changes already seen are ignored
+        """
+        with self._condition:
+            if sequence <= self._sequence:
+                return
+            if len(self._events) == self._events.maxlen:
+                self._floor = self._events[0][0]
+            self._sequence = sequence
+            self._events.append((sequence, job_id))
+            self._condition.notify_all()
+            for watcher in self._watchers.pop(job_id, ()):
+                watcher.set()
+    
+    def watch(self, job_id: str) -> threading.Event:
+        """Return an event that is set by the next change to a job.
+        
+        Call before reading the job, so a change made in between isn't
+        missed, and pass the event to unwatch() when done with it.
+        """
+        watcher = threading.Event()
+        with self._condition:
+            self._watchers.setdefault(job_id, []).append(watcher)
+        return watcher
+    
+    def unwatch(self, job_id: str, watcher: threading.Event) -> None:
+        """Stop watching a job, if the watcher hasn't already fired."""
+        with self._condition:
+            watchers = self._watchers.get(job_id)
+            if watchers and watcher in watchers:
+                watchers.remove(watcher)
+                if not watchers:
+                    del self._watchers[job_id]
+    
+    def wait(self, sequence: int, timeout: float) -> int:
+        """Block until there is a change after sequence, or the timeout passes.
+        
+        Args:
+            sequence: The last sequence number the caller has seen
+            timeout: Longest time to wait in seconds
+        
+        Returns:
+            int: The latest sequence number
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._sequence > sequence, timeout=timeout)
+            return self._sequence
+    
+    def changes_since(self, sequence: int) -> Tuple[int, Optional[List[str]]]:
+        """Return the jobs changed after sequence, oldest change first.
+        
+        Args:
+            sequence: The last sequence number the caller has seen
+        
+        Returns:
+            Tuple[int, Optional[List[str]]]: The latest sequence number and the
+            changed job IDs, or None if the log no longer reaches back that far
+        """
+        with self._condition:
+            if sequence >= self._sequence:
+                return self._sequence, []
+            if sequence < self._floor:
+                return self._sequence, None
+            recent: List[str] = []
+            for event_sequence, job_id in reversed(self._events):
+                if event_sequence <= sequence:
+                    break
+                recent.append(job_id)
+            return self._sequence, list(dict.fromkeys(reversed(recent)))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return the feed's position and backlog size.
+        
+        Returns:
+            Dict[str, Any]: Latest sequence number and events held
+        """
+        with self._condition:
+            return {
+                "sequence": self._sequence,
+                "backlog": len(self._events),
+                "max_backlog": self._events.maxlen,
+                "watchers": sum(len(watchers) for watchers in self._watchers.values())
+            }
+
+
+class JobStore:
+    """Interface for where transcription jobs are kept.
+    
+    Implementations are called from Flask request threads and pipeline
+    workers at the same time. Jobs they return are snapshots; change a job
+    through update() rather than in place.
+    """
+    
+    # Whether jobs survive a restart, and so whether they can be recovered
+    durable = False
+    # Fraction of the caps that evict() brings the store back down to
+    EVICTION_LOW_WATER = 0.9
+    
+    def __init__(self):
+        self._listeners: List[Callable[[str, int], None]] = []
+        # Names this store's run of change sequence numbers, which restart if the store does
+        self.change_epoch = uuid.uuid4().hex[:12]
+    
+    def add_listener(self, listener: Callable[[str, int], None]) -> None:
+        """Call listener with (job_id, change sequence) after every write to, or removal of, a job.
+        
+        Calls are made in sequence order, and a store shared between processes
+        reports writes made by the others too.
+        """
+        self._listeners.append(listener)
+    
+    def _notify(self, job_id: str, sequence: int) -> None:
+        """Pass one change to the listeners."""
+        for listener in self._listeners:
+            listener(job_id, sequence)
+    
+    def latest_change(self) -> int:
+        """Return the sequence number of the latest change to any job."""
+        raise NotImplementedError
+    
+    def change_token(self) -> str:
+        """Return a value that differs whenever any job has changed, as seen by every process using the store."""
+        return f"{self.change_epoch}-{self.latest_change()}"
+    
+    def create(self, job: TranscriptionJob) -> None:
+        """Store a new job."""
+        raise NotImplementedError
+    
+    def get(self, job_id: str) -> Optional[TranscriptionJob]:
+        """Return a job by ID, or None if it doesn't exist."""
+        raise NotImplementedError
+    
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Overwrite fields on a job, bump its updated_at timestamp and increment its revision."""
+        raise NotImplementedError
+    
+    def update_progress(self, job_id: str, progress: int) -> None:
+        """Record a job's progress. May be buffered, but get() must see it (and a new revision) straight away."""
+        self.update(job_id, progress=progress)
+    
+    def request_cancel(self, job_id: str) -> bool:
+        """Mark a pending or processing job cancelled on behalf of whichever process is running it.
+        
+        The running process finds out through cancel_requested() at its
+        job's next check and stops there.
+        
+        Returns:
+            bool: False if the job is gone or already finished
+        """
+        raise NotImplementedError
+    
+    def cancel_requested(self, job_id: str) -> bool:
+        """Return whether request_cancel() has marked a job cancelled."""
+        raise NotImplementedError
+    
+    def claim_orphaned(self) -> List[TranscriptionJob]:
+        """Take over the unfinished jobs whose owning process has stopped.
+        
+        Each process holds a lease on the jobs it creates or claims and
+        renews it while it runs. Jobs whose lease has run out are given to
+        the caller in one step, with recovery_attempts incremented, so no
+        two processes take over the same job.
+        
+        Returns:
+            List[TranscriptionJob]: The jobs now owned by the caller
+        """
+        raise NotImplementedError
+    
+    def complete(self, job_id: str, result: str, categories: Optional[TranscriptionCategories]) -> None:
+        """Mark a job completed with its result."""
+        self.update(
+            job_id,
+            status=JobStatus.COMPLETED,
+            progress=100,
+            result=result,
+            categories=categories,
+            segments=None,
+            completed_at=datetime.now().isoformat()
+        )
+    
+    def delete(self, job_id: str) -> None:
+        """Remove a job if it exists."""
+        raise NotImplementedError
+    
+    def list(self, user_id: Optional[str] = None, statuses: Optional[Tuple[str, ...]] = None) -> List[TranscriptionJob]:
+        """Return jobs, optionally only those of one user and/or in the given statuses."""
+        raise NotImplementedError
+    
+    def count(self) -> int:
+        """Return the number of stored jobs."""
+        raise NotImplementedError
+    
+    def size_bytes(self) -> int:
+        """Return roughly how many bytes the stored jobs take up."""
+        raise NotImplementedError
+    
+    def expire(self, status: str, finished_before: datetime) -> List[str]:
+        """Delete jobs in a finished status last updated before a cutoff, returning their IDs."""
+        raise NotImplementedError
+    
+    def evict(self, max_jobs: int, max_bytes: int) -> List[str]:
+        """Delete the oldest finished jobs while over either cap, returning their IDs.
+        
+        Eviction goes down to EVICTION_LOW_WATER of the caps rather than just
+        under them, so a store sitting at its cap isn't swept on every insert.
+        Pending and processing jobs are never evicted. A cap of 0 is no cap.
+        """
+        raise NotImplementedError
+    
+    def over_caps(self, max_jobs: int, max_bytes: int) -> bool:
+        """Return whether the store is over either cap. A cap of 0 is no cap."""
+        return (max_jobs > 0 and self.count() > max_jobs) or (max_bytes > 0 and self.size_bytes() > max_bytes)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return backend-specific statistics."""
+        return {"backend": type(self).__name__, "jobs": self.count(), "bytes": self.size_bytes()}
+
+
+# Monotonic and wall-clock readings taken together, for turning monotonic timestamps into ISO strings
+_MONOTONIC_ANCHOR = time.monotonic()
+_WALL_CLOCK_ANCHOR = time.time()
+
+
+def monotonic_to_iso(timestamp: Optional[float]) -> Optional[str]:
+    """Format a time.monotonic() reading as a local ISO timestamp."""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(_WALL_CLOCK_ANCHOR + (timestamp - _MONOTONIC_ANCHOR)).isoformat()
+
+
+def iso_to_monotonic(value: Optional[str]) -> Optional[float]:
+    """Convert a local ISO timestamp to the equivalent time.monotonic() reading."""
+    if value is None:
+        return None
+    return datetime.fromisoformat(value).timestamp() - _WALL_CLOCK_ANCHOR + _MONOTONIC_ANCHOR
+
+
+class JobRecord:
+    """Compact in-memory form of a TranscriptionJob.
+    
+    Timestamps are time.monotonic() floats and the status is an integer
+    code; ISO strings and status names are only produced by to_job(), so a
+    progress update just overwrites two attributes.
+    """
+    
+    __slots__ = (
+        "id", "status_code", "progress", "created_at", "updated_at", "completed_at", "deadline_at",
+        "result", "error", "failure_reason", "categories", "user_id", "priority", "last_stage",
+        "recovery_attempts", "audio_hash", "duplicate_of", "segments", "revision", "size", "cancel_requested"
+    )
+    
+    STATUSES = (JobStatus.PENDING, JobStatus.PROCESSING, JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+    STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+    TIMESTAMP_FIELDS = ("created_at", "updated_at", "completed_at", "deadline_at")
+    FIELDS = (
+        "id", "status", "progress", "created_at", "updated_at", "completed_at", "result", "error",
+        "failure_reason", "deadline_at", "categories", "user_id", "priority", "last_stage", "recovery_attempts",
+        "audio_hash", "duplicate_of", "segments", "revision"
+    )
+    
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status_code = 0
+        self.progress = 0
+        self.created_at: Optional[float] = None
+        self.updated_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+        self.deadline_at: Optional[float] = None
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.failure_reason: Optional[str] = None
+        self.categories: Optional[TranscriptionCategories] = None
+        self.user_id: Optional[str] = None
+        self.priority: str = PriorityClass.INTERACTIVE
+        self.last_stage: Optional[str] = None
+        self.recovery_attempts = 0
+        self.audio_hash: Optional[str] = None
+        self.duplicate_of: Optional[str] = None
+        self.segments: Optional[List[str]] = None
+        self.revision = 1
+        self.size = 0
+        self.cancel_requested = False
+    
+    @classmethod
+    def from_job(cls, job: TranscriptionJob) -> "JobRecord":
+        """Build a record from a job dict."""
+        record = cls(job["id"])
+        record.set_fields({key: value for key, value in job.items() if key != "id"})
+        return record
+    
+    @property
+    def status(self) -> str:
+        return self.STATUSES[self.status_code]
+    
+    def set_fields(self, fields: Dict[str, Any]) -> None:
+        """Overwrite fields given in their TranscriptionJob form.
+        
+        Raises:
+            ValueError: If a field isn't part of a job
+        """
+        for field, value in fields.items():
+            if field == "status":
+                self.status_code = self.STATUS_CODES[value]
+            elif field in self.TIMESTAMP_FIELDS:
+                setattr(self, field, iso_to_monotonic(value))
+            elif field in self.FIELDS:
+                setattr(self, field, value)
+            else:
+                raise ValueError(f"Unknown job field: {field}")
+    
+    def estimate_size(self) -> int:
+        """Estimate the bytes this record holds: a fixed overhead plus its text."""
+        size = 320 + len(self.id) + len(self.result or "") + len(self.error or "") + len(self.user_id or "")
+        if self.categories:
+            size += len(json.dumps(self.categories))
+        if self.segments:
+            size += sum(len(segment) + 8 for segment in self.segments)
+        return size
+    
+    def to_job(self) -> TranscriptionJob:
+        """Return the record as a TranscriptionJob dict with ISO timestamps."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "created_at": cast(str, monotonic_to_iso(self.created_at)),
+            "updated_at": cast(str, monotonic_to_iso(self.updated_at)),
+            "completed_at": monotonic_to_iso(self.completed_at),
+            "result": self.result,
+            "error": self.error,
+            "failure_reason": self.failure_reason,
+            "deadline_at": monotonic_to_iso(self.deadline_at),
+            "categories": self.categories,
+            "user_id": self.user_id,
+            "priority": self.priority,
+            "last_stage": self.last_stage,
+            "recovery_attempts": self.recovery_attempts,
+            "audio_hash": self.audio_hash,
+            "duplicate_of": self.duplicate_of,
+            "segments": list(self.segments) if self.segments is not None else None,
+            "revision": self.revision
+        }
+
+
+class InMemoryJobStore(JobStore):
+    """JobStore backed by JobRecords in this process. Jobs are lost on restart.
+    
+    Sizes are estimates kept up to date on every write, so the caps can be
+    checked without walking the store.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._jobs: Dict[str, JobRecord] = {}
+        self._bytes = 0
+        self._change_sequence = 0
+        self._lock = threading.Lock()
+    
+    def _resize(self, record: JobRecord) -> None:
+        """Re-estimate a stored record's size. Caller holds the lock."""
+        size = record.estimate_size()
+        self._bytes += size - record.size
+        record.size = size
+    
+    def _remove(self, job_id: str) -> bool:
+        """Drop a record, returning whether it existed. Caller holds the lock."""
+        record = self._jobs.pop(job_id, None)
+        if record is not None:
+            self._bytes -= record.size
+        return record is not None
+    
+    def _changed(self, *job_ids: str) -> None:
+        """Number and report changes. Caller holds the lock, so listeners see them in order."""
+        for job_id in job_ids:
+            self._change_sequence += 1
+            self._notify(job_id, self._change_sequence)
+    
+    def latest_change(self) -> int:
+        with self._lock:
+            return self._change_sequence
+    
+    def create(self, job: TranscriptionJob) -> None:
+        record = JobRecord.from_job(job)
+        with self._lock:
+            self._remove(record.id)
+            self._jobs[record.id] = record
+            self._resize(record)
+            self._changed(record.id)
+    
+    def get(self, job_id: str) -> Optional[TranscriptionJob]:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            return record.to_job() if record is not None else None
+    
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if record is None:
+                return
+            record.set_fields(fields)
+            record.updated_at = time.monotonic()
+            record.revision += 1
+            self._resize(record)
+            self._changed(job_id)
+    
+    def update_progress(self, job_id: str, progress: int) -> None:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if record is None:
+                return
+            record.progress = progress
+            record.updated_at = time.monotonic()
+            record.revision += 1
+            self._changed(job_id)
+    
+    def request_cancel(self, job_id: str) -> bool:
+        unfinished = {JobRecord.STATUS_CODES[JobStatus.PENDING], JobRecord.STATUS_CODES[JobStatus.PROCESSING]}
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if record is None or record.status_code not in unfinished:
+                return False
+            record.set_fields({"status": JobStatus.CANCELLED, "error": "Cancelled by user"})
+            record.cancel_requested = True
+            record.updated_at = time.monotonic()
+            record.revision += 1
+            self._resize(record)
+            self._changed(job_id)
+            return True
+    
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            return record is not None and record.cancel_requested
+    
+    def claim_orphaned(self) -> List[TranscriptionJob]:
+        # Every job in memory belongs to this process, which is still running
+        return []
+    
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            if self._remove(job_id):
+                self._changed(job_id)
+    
+    def list(self, user_id: Optional[str] = None, statuses: Optional[Tuple[str, ...]] = None) -> List[TranscriptionJob]:
+        codes = {JobRecord.STATUS_CODES[status] for status in statuses} if statuses is not None else None
+        with self._lock:
+            return [
+                record.to_job() for record in self._jobs.values()
+                if (user_id is None or record.user_id == user_id)
+                and (codes is None or record.status_code in codes)
+            ]
+    
+    def count(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+    
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+    
+    def expire(self, status: str, finished_before: datetime) -> List[str]:
+        code = JobRecord.STATUS_CODES[status]
+        cutoff = cast(float, iso_to_monotonic(finished_before.isoformat()))
+        with self._lock:
+            expired = [
+                record.id for record in self._jobs.values()
+                if record.status_code == code and (record.updated_at or 0.0) < cutoff
+            ]
+            for job_id in expired:
+                self._remove(job_id)
+            self._changed(*expired)
+        return expired
+    
+    def evict(self, max_jobs: int, max_bytes: int) -> List[str]:
+        evicted: List[str] = []
+        finished_codes = {JobRecord.STATUS_CODES[status] for status in FINISHED_STATUSES}
+        with self._lock:
+            target_jobs = int(max_jobs * self.EVICTION_LOW_WATER) if max_jobs > 0 else None
+            target_bytes = int(max_bytes * self.EVICTION_LOW_WATER) if max_bytes > 0 else None
+            if (max_jobs <= 0 or len(self._jobs) <= max_jobs) and (max_bytes <= 0 or self._bytes <= max_bytes):
+                return evicted
+            finished = sorted(
+                (record for record in self._jobs.values() if record.status_code in finished_codes),
+                key=lambda record: record.updated_at or 0.0
+            )
+            for record in finished:
+                if (target_jobs is None or len(self._jobs) <= target_jobs) and (target_bytes is None or self._bytes <= target_bytes):
+                    break
+                self._remove(record.id)
+                evicted.append(record.id)
+            self._changed(*evicted)
+        return evicted
+
+
+class SQLiteJobStore(JobStore):
+    """JobStore backed by a SQLite database in WAL mode.
+    
+    Several processes (e.g. gunicorn workers) can share one database file.
+    Progress updates are buffered and written in batches by a background
+    thread, so repeated updates to the same job are coalesced; every other
+    change is written immediately. Statements use fixed SQL text with
+    parameters, so sqlite3's per-connection statement cache reuses them.
+    
+    Every write also appends the job's ID to a job_changes log in the same
+    transaction. The log's AUTOINCREMENT key is the change sequence all
+    processes share, and a follower thread reports new entries, whichever
+    process wrote them, to listeners.
+    """
+    
+    # Column name -> SQLite type. Missing columns are added on startup.
+    COLUMNS: Dict[str, str] = {
+        "status": "TEXT NOT NULL DEFAULT 'pending'",
+        "progress": "INTEGER NOT NULL DEFAULT 0",
+        "created_at": "TEXT",
+        "updated_at": "TEXT",
+        "completed_at": "TEXT",
+        "result": "TEXT",
+        "error": "TEXT",
+        "failure_reason": "TEXT",
+        "deadline_at": "TEXT",
+        "categories": "TEXT",
+        "user_id": "TEXT",
+        "priority": "TEXT",
+        "last_stage": "TEXT",
+        "recovery_attempts": "INTEGER NOT NULL DEFAULT 0",
+        "audio_hash": "TEXT",
+        "duplicate_of": "TEXT",
+        "segments": "TEXT",
+        "revision": "INTEGER NOT NULL DEFAULT 1"
+    }
+    JSON_COLUMNS = {"categories", "segments"}
+    # Bookkeeping columns that aren't part of the job
+    INTERNAL_COLUMNS: Dict[str, str] = {
+        "lease_owner": "TEXT",
+        "lease_expires_at": "TEXT",
+        "cancel_requested": "INTEGER NOT NULL DEFAULT 0"
+    }
+    durable = True
+    
+    def __init__(self, path: str, flush_interval: float, change_poll_interval: float, change_log_rows: int,
+                 lease_seconds: float = 30.0):
+        """Open (and if needed create) the job database.
+        
+        Args:
+            path: Path of the SQLite database file
+            flush_interval: Seconds between batched progress writes
+            change_poll_interval: Seconds between checks of the change log for other processes' writes
+            change_log_rows: Recent changes kept in the change log
+            lease_seconds: How long this process's hold on its unfinished jobs lasts without renewal
+        """
+        super().__init__()
+        self.path = path
+        self.flush_interval = flush_interval
+        self.change_poll_interval = change_poll_interval
+        self.change_log_rows = max(1, change_log_rows)
+        self.lease_seconds = lease_seconds
+        self._lease_keeper: Optional[threading.Thread] = None
+        self._follower: Optional[threading.Thread] = None
+        self._change_signal = threading.Event()
+        self._followed_change = 0
+        # Names this process in change tokens that include its buffered progress, and as the owner of its job leases
+        self._process_tag = uuid.uuid4().hex[:8]
+        self._local = threading.local()
+        self._pending_lock = threading.Lock()
+        self._pending_progress: Dict[str, Tuple[int, str, int]] = {}  # job_id -> (progress, updated_at, revisions)
+        self._flusher: Optional[threading.Thread] = None
+        self._buffered_updates = 0
+        self._flushed_updates = 0
+        self._flushes = 0
+        self._init_schema()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def _init_schema(self) -> None:
+        """Create the jobs table and add any columns it is missing."""
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY)")
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in {**self.COLUMNS, **self.INTERNAL_COLUMNS}.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_user_status ON jobs (user_id, status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_updated ON jobs (status, updated_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS job_changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL)")
+        # The first process to open the database picks the change epoch; the others adopt it
+        conn.execute("CREATE TABLE IF NOT EXISTS job_store_meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("INSERT OR IGNORE INTO job_store_meta (key, value) VALUES ('change_epoch', ?)", (self.change_epoch,))
+        self.change_epoch = conn.execute("SELECT value FROM job_store_meta WHERE key = 'change_epoch'").fetchone()[0]
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction, then wake the change follower."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        self._change_signal.set()
+    
+    def _log_changes(self, conn: sqlite3.Connection, job_ids: List[str]) -> None:
+        """Append changed jobs to the change log, inside the caller's transaction."""
+        conn.executemany("INSERT INTO job_changes (job_id) VALUES (?)", [(job_id,) for job_id in job_ids])
+    
+    def latest_change(self) -> int:
+        return self._connection().execute("SELECT COALESCE(MAX(seq), 0) FROM job_changes").fetchone()[0]
+    
+    def change_token(self) -> str:
+        token = super().change_token()
+        with self._pending_lock:
+            if self._pending_progress:
+                token += f"-{self._process_tag}-{self._buffered_updates}"
+        return token
+    
+    def add_listener(self, listener: Callable[[str, int], None]) -> None:
+        super().add_listener(listener)
+        self._ensure_follower()
+    
+    def _ensure_follower(self) -> None:
+        """Start following the change log, from its current end, on first use."""
+        with self._pending_lock:
+            if self._follower is not None:
+                return
+            self._followed_change = self.latest_change()
+            self._follower = threading.Thread(target=self._follow_loop, name="job-store-follower", daemon=True)
+            self._follower.start()
+    
+    def _follow_loop(self) -> None:
+        """Report change log entries to listeners after local writes and every change_poll_interval."""
+        while True:
+            self._change_signal.wait(self.change_poll_interval)
+            self._change_signal.clear()
+            try:
+                self._follow_changes()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to read job changes: {str(e)}")
+    
+    def _follow_changes(self) -> None:
+        """Report change log entries written since the last call, and trim the log."""
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT seq, job_id FROM job_changes WHERE seq > ? ORDER BY seq", (self._followed_change,)
+        ).fetchall()
+        if not rows:
+            return
+        previous = self._followed_change
+        for row in rows:
+            self._notify(row["job_id"], row["seq"])
+        self._followed_change = rows[-1]["seq"]
+        # Trim about once per change_log_rows changes; any process may do it
+        if self._followed_change // self.change_log_rows != previous // self.change_log_rows:
+            conn.execute("DELETE FROM job_changes WHERE seq <= ?", (self._followed_change - self.change_log_rows,))
+    
+    def _encode(self, column: str, value: Any) -> Any:
+        """Convert a job field to its stored form."""
+        if column not in self.COLUMNS:
+            raise ValueError(f"Unknown job field: {column}")
+        return json.dumps(value) if column in self.JSON_COLUMNS and value is not None else value
     
+    def _row_to_job(self, row: sqlite3.Row) -> TranscriptionJob:
+        """Convert a stored row back into a job, applying any buffered progress and its revisions."""
+        job: Dict[str, Any] = dict(row)
+        for column in self.INTERNAL_COLUMNS:
+            job.pop(column, None)
+        for column in self.JSON_COLUMNS:
+            if job.get(column) is not None:
+                job[column] = json.loads(job[column])
+        pending = self._pending_progress.get(job["id"])
+        if pending is not None and job["status"] == JobStatus.PROCESSING:
+            job["progress"], job["updated_at"], revisions = pending
+            job["revision"] += revisions
+        return cast(TranscriptionJob, job)
+    
+    def create(self, job: TranscriptionJob) -> None:
+        columns = ["id"] + [column for column in job if column in self.COLUMNS]
+        values = [job["id"]] + [self._encode(column, job[column]) for column in columns[1:]]  # type: ignore[literal-required]
+        columns += ["lease_owner", "lease_expires_at"]
+        values += [self._process_tag, self._lease_expiry()]
+        placeholders = ", ".join("?" for _ in columns)
+        with self._transaction() as conn:
+            conn.execute(f"INSERT INTO jobs ({', '.join(columns)}) VALUES ({placeholders})", values)
+            self._log_changes(conn, [job["id"]])
+        self._ensure_lease_keeper()
+    
+    def get(self, job_id: str) -> Optional[TranscriptionJob]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row is not None else None
+    
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = datetime.now().isoformat()
+        # Fold in buffered progress so a later flush can't overwrite this write
+        with self._pending_lock:
+            pending = self._pending_progress.pop(job_id, None)
+        if pending is not None and "progress" not in fields:
+            fields["progress"] = pending[0]
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        values = [self._encode(column, value) for column, value in fields.items()]
+        revisions = 1 + (pending[2] if pending is not None else 0)
+        with self._transaction() as conn:
+            updated = conn.execute(
+                f"UPDATE jobs SET {assignments}, revision = revision + ? WHERE id = ?", values + [revisions, job_id]
+            ).rowcount
+            if updated:
+                self._log_changes(conn, [job_id])
+    
+    def request_cancel(self, job_id: str) -> bool:
+        with self._pending_lock:
+            self._pending_progress.pop(job_id, None)
+        with self._transaction() as conn:
+            cancelled = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, cancel_requested = 1, updated_at = ?, revision = revision + 1 "
+                "WHERE id = ? AND status IN (?, ?)",
+                (JobStatus.CANCELLED, "Cancelled by user", datetime.now().isoformat(), job_id,
+                 JobStatus.PENDING, JobStatus.PROCESSING)
+            ).rowcount == 1
+            if cancelled:
+                self._log_changes(conn, [job_id])
+        return cancelled
+    
+    def cancel_requested(self, job_id: str) -> bool:
+        row = self._connection().execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row is not None and bool(row[0])
+    
+    def claim_orphaned(self) -> List[TranscriptionJob]:
+        now = datetime.now().isoformat()
+        # BEGIN IMMEDIATE holds the write lock from the SELECT on, so no other process can claim the same rows
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+                (JobStatus.PENDING, JobStatus.PROCESSING, now)
+            ).fetchall()
+            job_ids = [row["id"] for row in rows]
+            if not job_ids:
+                return []
+            conn.executemany(
+                "UPDATE jobs SET recovery_attempts = recovery_attempts + 1, lease_owner = ?, lease_expires_at = ?, "
+                "updated_at = ?, revision = revision + 1 WHERE id = ?",
+                [(self._process_tag, self._lease_expiry(), now, job_id) for job_id in job_ids]
+            )
+            self._log_changes(conn, job_ids)
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE id IN ({', '.join('?' for _ in job_ids)}) ORDER BY created_at", job_ids
+            ).fetchall()
+        self._ensure_lease_keeper()
+        return [self._row_to_job(row) for row in rows]
+    
+    def _lease_expiry(self) -> str:
+        """Return when a lease taken or renewed now runs out."""
+        return (datetime.now() + timedelta(seconds=self.lease_seconds)).isoformat()
+    
+    def _ensure_lease_keeper(self) -> None:
+        """Start renewing this process's job leases on first use."""
+        if self._lease_keeper is not None:
+            return
+        with self._pending_lock:
+            if self._lease_keeper is None:
+                self._lease_keeper = threading.Thread(target=self._lease_loop, name="job-store-leases", daemon=True)
+                self._lease_keeper.start()
+    
+    def _lease_loop(self) -> None:
+        """Renew leases three times per lease_seconds, so one slow renewal doesn't lose them."""
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            try:
+                self.renew_leases()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to renew job leases: {str(e)}")
+    
+    def renew_leases(self) -> int:
+        """Extend the lease on every unfinished job this process owns.
+        
+        Returns:
+            int: Number of leases renewed
+        """
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE lease_owner = ? AND status IN (?, ?)",
+                (self._lease_expiry(), self._process_tag, JobStatus.PENDING, JobStatus.PROCESSING)
+            ).rowcount
+    
+    def update_progress(self, job_id: str, progress: int) -> None:
+        self._ensure_flusher()
+        with self._pending_lock:
+            previous = self._pending_progress.get(job_id)
+            revisions = previous[2] + 1 if previous is not None else 1
+            self._pending_progress[job_id] = (progress, datetime.now().isoformat(), revisions)
+            self._buffered_updates += 1
+    
+    def _ensure_flusher(self) -> None:
+        """Start the background progress flusher on first use."""
+        if self._flusher is not None:
+            return
+        with self._pending_lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="job-store-flusher", daemon=True)
+                self._flusher.start()
+    
+    def _flush_loop(self) -> None:
+        """Write buffered progress every flush_interval seconds."""
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to flush job progress: {str(e)}")
+    
+    def flush(self) -> None:
+        """Write all buffered progress updates in one transaction."""
+        with self._pending_lock:
+            if not self._pending_progress:
+                return
+            batch, self._pending_progress = self._pending_progress, {}
+        with self._transaction() as conn:
+            # Only processing jobs take progress, so a stale batch can't regress a finished job
+            conn.executemany(
+                "UPDATE jobs SET progress = ?, updated_at = ?, revision = revision + ? WHERE id = ? AND status = ?",
+                [
+                    (progress, updated_at, revisions, job_id, JobStatus.PROCESSING)
+                    for job_id, (progress, updated_at, revisions) in batch.items()
+                ]
+            )
+            self._log_changes(conn, list(batch))
+        with self._pending_lock:
+            self._flushes += 1
+            self._flushed_updates += len(batch)
+    
+    def delete(self, job_id: str) -> None:
+        with self._pending_lock:
+            self._pending_progress.pop(job_id, None)
+        with self._transaction() as conn:
+            if conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount:
+                self._log_changes(conn, [job_id])
+    
+    def list(self, user_id: Optional[str] = None, statuses: Optional[Tuple[str, ...]] = None) -> List[TranscriptionJob]:
+        conditions: List[str] = []
+        params: List[Any] = []
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        if statuses is not None:
+            conditions.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection().execute(f"SELECT * FROM jobs{where} ORDER BY created_at", params).fetchall()
+        return [self._row_to_job(row) for row in rows]
+    
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    
+    def size_bytes(self) -> int:
+        # Pages in use, so space freed by deleted jobs isn't counted
+        conn = self._connection()
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return (page_count - free_pages) * page_size
+    
+    def _delete_ids(self, job_ids: List[str]) -> None:
+        """Delete a batch of jobs in one transaction."""
+        if not job_ids:
+            return
+        with self._pending_lock:
+            for job_id in job_ids:
+                self._pending_progress.pop(job_id, None)
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in job_ids])
+            self._log_changes(conn, job_ids)
+    
+    def expire(self, status: str, finished_before: datetime) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT id FROM jobs WHERE status = ? AND updated_at < ?", (status, finished_before.isoformat())
+        ).fetchall()
+        expired = [row["id"] for row in rows]
+        self._delete_ids(expired)
+        return expired
+    
+    def evict(self, max_jobs: int, max_bytes: int) -> List[str]:
+        count, size = self.count(), self.size_bytes()
+        excess = 0
+        if max_jobs > 0 and count > max_jobs:
+            excess = count - int(max_jobs * self.EVICTION_LOW_WATER)
+        if max_bytes > 0 and size > max_bytes and count:
+            # Pages aren't freed one job at a time, so work out how many jobs to drop from the average job size
+            excess = max(excess, math.ceil((size - max_bytes * self.EVICTION_LOW_WATER) / (size / count)))
+        if excess <= 0:
+            return []
+        rows = self._connection().execute(
+            f"SELECT id FROM jobs WHERE status IN ({', '.join('?' for _ in FINISHED_STATUSES)}) ORDER BY updated_at LIMIT ?",
+            (*FINISHED_STATUSES, excess)
+        ).fetchall()
+        evicted = [row["id"] for row in rows]
+        self._delete_ids(evicted)
+        return evicted
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._pending_lock:
+            pending = len(self._pending_progress)
+            buffered, flushed, flushes = self._buffered_updates, self._flushed_updates, self._flushes
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "jobs": self.count(),
+            "bytes": self.size_bytes(),
+            "pending_progress_updates": pending,
+            "followed_change_sequence": self._followed_change,
+            "buffered_progress_updates": buffered,
+            "flushed_progress_updates": flushed,
+            "coalesced_progress_updates": buffered - flushed - pending,
+            "flushes": flushes
+        }
+
+
+def create_job_store() -> JobStore:
+    """Build the job store selected by JOB_STORE."""
+    if JOB_STORE == "sqlite":
+        logger.info(f"Using SQLite job store at {JOB_STORE_PATH}")
+        return SQLiteJobStore(
+            JOB_STORE_PATH,
+            flush_interval=JOB_STORE_FLUSH_INTERVAL_MS / 1000,
+            change_poll_interval=JOB_STORE_CHANGE_POLL_MS / 1000,
+            change_log_rows=JOB_EVENTS_MAX_BACKLOG,
+            lease_seconds=JOB_LEASE_SECONDS
+        )
+    return InMemoryJobStore()
+
+
 # Storage
-job_queue: Dict[str, TranscriptionJob] = {}  # Store transcription jobs
+job_store: JobStore = create_job_store()  # Store transcription jobs
+job_changes = JobChangeFeed(max_events=JOB_EVENTS_MAX_BACKLOG, start_sequence=job_store.latest_change())  # Wakes event streams when jobs change
+job_store.add_listener(job_changes.publish)
+process_started_at = datetime.now()  # Spooled audio older than this was left by a previous run
 user_model_cache: Dict[str, str] = {}  # Cache for user's preferred LLM model
 llm_categorization_cache: Dict[str, Dict[str, Any]] = {}  # Cache for LLM categorization results
+job_controls: Dict[str, "JobControl"] = {}  # Cancellation handles for pending and processing jobs
 
-def check_version_compatibility():
-    """Middleware decorator to check API version compatibility and log user ID.
+
+class JobReaper:
+    """Background thread that enforces job retention.
     
-    Returns:
-        Function: Decorated route function that checks version compatibility.
+    Finished jobs are removed once they've been in their final status for
+    longer than that status's retention, and the oldest finished jobs are
+    evicted whenever the store is over its job-count or byte cap, so a
+    long-running server's job store stays a bounded size.
     """
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs) -> Union[Response, Tuple[Response, int]]:
-            # Get frontend version from headers
-            frontend_version = request.headers.get('X-Frontend-Version')
-            if not frontend_version:
-                return jsonify({
-                    "error": "Version mismatch",
-                    "message": "Frontend version header is missing. API requests must include X-Frontend-Version header.",
-                    "backend_version": VERSION,
-                    "frontend_version": None
-                }), 409  # Conflict status code
-            elif frontend_version != VERSION:
-                return jsonify({
-                    "error": "Version mismatch",
-                    "message": f"Your application (v{frontend_version}) is out of date with the server (v{VERSION}). Please refresh your browser.",
-                    "backend_version": VERSION,
-                    "frontend_version": frontend_version
-                }), 409  # Conflict status code
-                
-            # Log user ID if present
-            user_id = request.headers.get('X-User-ID')
-            if user_id:
-                logger.info(f"Request to {request.path} from user {user_id}")
-            else:
-                logger.info(f"Request to {request.path} from unknown user")
-                
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
+    
+    def __init__(self, store: JobStore, retention_minutes: Dict[str, float], max_jobs: int, max_bytes: int,
+                 interval: float):
+        """Create a reaper. Call start() to begin sweeping.
+        
+        Args:
+            store: The job store to enforce retention on
+            retention_minutes: Minutes to keep jobs in each finished status; 0 or less keeps them forever
+            max_jobs: Most jobs to keep, 0 for no cap
+            max_bytes: Most bytes of jobs to keep, 0 for no cap
+            interval: Seconds between sweeps
+        """
+        self.store = store
+        self.retention_minutes = retention_minutes
+        self.max_jobs = max_jobs
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._expired: Dict[str, int] = {status: 0 for status in retention_minutes}
+        self._evicted = 0
+        self._sweeps = 0
+        self._last_sweep: Optional[str] = None
+    
+    def start(self) -> None:
+        """Start the background sweep thread if it isn't running."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="job-reaper", daemon=True)
+            self._thread.start()
+    
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Job reaper sweep failed: {str(e)}")
+    
+    def sweep(self) -> int:
+        """Expire and evict jobs now.
+        
+        Returns:
+            int: Number of jobs removed
+        """
+        now = datetime.now()
+        removed = 0
+        for status, minutes in self.retention_minutes.items():
+            if minutes <= 0:
+                continue
+            expired = self.store.expire(status, now - timedelta(minutes=minutes))
+            removed += len(expired)
+            with self._lock:
+                self._expired[status] += len(expired)
+        removed += self.enforce_caps()
+        with self._lock:
+            self._sweeps += 1
+            self._last_sweep = now.isoformat()
+        if removed:
+            logger.info(f"Job reaper removed {removed} jobs")
+        return removed
+    
+    def enforce_caps(self) -> int:
+        """Evict the oldest finished jobs if the store is over a cap.
+        
+        Returns:
+            int: Number of jobs evicted
+        """
+        evicted = self.store.evict(self.max_jobs, self.max_bytes)
+        with self._lock:
+            self._evicted += len(evicted)
+        return len(evicted)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return retention settings and what has been removed so far.
+        
+        Returns:
+            Dict[str, Any]: Retention policy, caps and removal counts
+        """
+        with self._lock:
+            return {
+                "retention_minutes": dict(self.retention_minutes),
+                "max_jobs": self.max_jobs,
+                "max_bytes": self.max_bytes,
+                "interval_seconds": self.interval,
+                "expired": dict(self._expired),
+                "evicted": self._evicted,
+                "sweeps": self._sweeps,
+                "last_sweep": self._last_sweep
+            }
+
+
+job_reaper = JobReaper(
+    job_store,
+    retention_minutes={
+        JobStatus.COMPLETED: JOB_RETENTION_COMPLETED_MINUTES,
+        JobStatus.FAILED: JOB_RETENTION_FAILED_MINUTES,
+        JobStatus.CANCELLED: JOB_RETENTION_CANCELLED_MINUTES
+    },
+    max_jobs=JOB_RETENTION_MAX_JOBS,
+    max_bytes=JOB_RETENTION_MAX_BYTES,
+    interval=JOB_REAPER_INTERVAL_SECONDS
+)
+
+class PriorityClass:
+    """Enum-like class for job scheduling priority classes"""
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Return the pct-th percentile of values using nearest-rank, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class FairJobScheduler:
+    """Bounded task queue that schedules fairly across users and priority classes.
+    
+    Within a priority class each user has their own FIFO and users are served
+    by deficit round robin, so one user with a large backlog only gets their
+    share of workers. Classes share workers by weighted round robin, so
+    interactive jobs are preferred without starving bulk jobs.
+    
+    Implements the subset of the queue.Queue interface used by WorkerPool.
+    """
+    
+    def __init__(self, maxsize: int, class_weights: Dict[str, int], quantum: float = 1.0, wait_sample_size: int = 1000):
+        """Create an empty scheduler.
+        
+        Args:
+            maxsize: Maximum number of queued tasks across all users
+            class_weights: Relative share of dequeues for each priority class, highest priority first
+            quantum: Cost credited to a user each time their turn comes round
+            wait_sample_size: Number of recent queue-wait samples kept per class
+        """
+        self.maxsize = maxsize
+        self.class_weights = class_weights
+        self.quantum = quantum
+        self._not_empty = threading.Condition(threading.Lock())
+        self._size = 0
+        self._flows: Dict[str, Dict[str, deque]] = {name: {} for name in class_weights}
+        self._active_users: Dict[str, deque] = {name: deque() for name in class_weights}
+        self._deficits: Dict[str, Dict[str, float]] = {name: {} for name in class_weights}
+        self._turn_started: Dict[str, bool] = {name: False for name in class_weights}
+        self._class_credits: Dict[str, int] = dict(class_weights)
+        self._wait_samples: Dict[str, deque] = {name: deque(maxlen=wait_sample_size) for name in class_weights}
+        self._dequeued: Dict[str, int] = {name: 0 for name in class_weights}
+    
+    def put_nowait(self, item: Any, flow_key: Optional[str] = None, priority: str = PriorityClass.INTERACTIVE, cost: float = 1.0) -> None:
+        """Queue an item for a user without blocking.
+        
+        Args:
+            item: The task to queue
+            flow_key: User the task is scheduled under; None shares an anonymous flow
+            priority: Priority class of the task
+            cost: Scheduling cost of the task relative to the quantum
+            
+        Raises:
+            queue.Full: If the scheduler already holds maxsize tasks
+            ValueError: If the priority class is unknown
+        """
+        if priority not in self.class_weights:
+            raise ValueError(f"Unknown priority class: {priority}")
+        user = flow_key or "anonymous"
+        with self._not_empty:
+            if self._size >= self.maxsize:
+                raise queue.Full
+            flows = self._flows[priority]
+            if user not in flows:
+                flows[user] = deque()
+                self._deficits[priority][user] = 0.0
+                self._active_users[priority].append(user)
+            flows[user].append((cost, time.monotonic(), item))
+            self._size += 1
+            self._not_empty.notify()
+    
+    def get(self) -> Any:
+        """Remove and return the next task, blocking until one is available."""
+        with self._not_empty:
+            while self._size == 0:
+                self._not_empty.wait()
+            priority = self._next_class()
+            cost, enqueued_at, item = self._pop_from_class(priority)
+            self._size -= 1
+            self._dequeued[priority] += 1
+            self._wait_samples[priority].append(time.monotonic() - enqueued_at)
+            return item
+    
+    def _next_class(self) -> str:
+        """Pick the priority class to serve next by weighted round robin."""
+        for _ in range(2):
+            for name in self.class_weights:
+                if self._flows[name] and self._class_credits[name] > 0:
+                    self._class_credits[name] -= 1
+                    return name
+            # Every backlogged class has used its share this round, start a new one
+            self._class_credits = dict(self.class_weights)
+        raise RuntimeError("Scheduler is empty")
+    
+    def _pop_from_class(self, priority: str) -> Tuple[float, float, Any]:
+        """Pop the next task from a priority class by deficit round robin."""
+        flows = self._flows[priority]
+        active = self._active_users[priority]
+        deficits = self._deficits[priority]
+        while True:
+            user = active[0]
+            if not self._turn_started[priority]:
+                deficits[user] += self.quantum
+                self._turn_started[priority] = True
+            flow = flows[user]
+            if deficits[user] >= flow[0][0]:
+                entry = flow.popleft()
+                deficits[user] -= entry[0]
+                if not flow:
+                    # Idle users don't bank credit
+                    del flows[user]
+                    del deficits[user]
+                    active.popleft()
+                    self._turn_started[priority] = False
+                return entry
+            active.rotate(-1)
+            self._turn_started[priority] = False
+    
+    def qsize(self) -> int:
+        """Return the number of queued tasks."""
+        with self._not_empty:
+            return self._size
+    
+    def remove(self, match: Callable[[Any], bool]) -> List[Any]:
+        """Remove every queued item that match returns True for.
+        
+        Args:
+            match: Predicate called with each queued item
+        
+        Returns:
+            List[Any]: The removed items
+        """
+        removed: List[Any] = []
+        with self._not_empty:
+            for priority, flows in self._flows.items():
+                active = self._active_users[priority]
+                for user in list(flows):
+                    flow = flows[user]
+                    kept = deque(entry for entry in flow if not match(entry[2]))
+                    if len(kept) == len(flow):
+                        continue
+                    removed.extend(entry[2] for entry in flow if match(entry[2]))
+                    if kept:
+                        flows[user] = kept
+                        continue
+                    if active[0] == user:
+                        self._turn_started[priority] = False
+                    active.remove(user)
+                    del flows[user]
+                    del self._deficits[priority][user]
+            self._size -= len(removed)
+        return removed
+    
+    def user_backlog(self, flow_key: Optional[str]) -> int:
+        """Return the number of tasks a user has queued across all priority classes."""
+        user = flow_key or "anonymous"
+        with self._not_empty:
+            return sum(len(flows[user]) for flows in self._flows.values() if user in flows)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return per-class backlog and queue-wait statistics.
+        
+        Returns:
+            Dict[str, Any]: Queue depth, backlogged users and wait percentiles per class
+        """
+        with self._not_empty:
+            classes = {}
+            for name, weight in self.class_weights.items():
+                waits = list(self._wait_samples[name])
+                classes[name] = {
+                    "weight": weight,
+                    "queued": sum(len(flow) for flow in self._flows[name].values()),
+                    "backlogged_users": len(self._flows[name]),
+                    "max_user_backlog": max((len(flow) for flow in self._flows[name].values()), default=0),
+                    "dequeued": self._dequeued[name],
+                    "wait_seconds_p50": percentile(waits, 50),
+                    "wait_seconds_p95": percentile(waits, 95),
+                    "wait_seconds_p99": percentile(waits, 99)
+                }
+            return {
+                "queued": self._size,
+                "max_queued": self.maxsize,
+                "classes": classes
+            }
+
+
+class WorkerPool:
+    """Fixed-size pool of daemon worker threads fed by a bounded task queue.
+    
+    Threads are started once and reused, so a burst of submissions waits in
+    the queue instead of spawning one thread per task.
+    """
+    
+    def __init__(self, name: str, handler: Callable[..., Any], size: int, max_queue_depth: int, task_queue: Optional[Any] = None):
+        """Create the pool without starting its threads.
+        
+        Args:
+            name: Name used for worker threads and log messages
+            handler: Function called with the submitted arguments
+            size: Number of worker threads
+            max_queue_depth: Maximum number of tasks waiting for a worker
+            task_queue: Optional queue.Queue-like scheduler to pull tasks from instead of a FIFO
+        """
+        self.name = name
+        self.handler = handler
+        self.size = size
+        self.max_queue_depth = max_queue_depth
+        self._tasks = task_queue if task_queue is not None else queue.Queue(maxsize=max_queue_depth)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._active_workers = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._avg_task_seconds: Optional[float] = None
+    
+    def start(self) -> None:
+        """Start the worker threads if they are not already running."""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.size):
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"{self.name}-worker-{index}",
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"Started {self.size} workers for pool {self.name}")
+    
+    def submit(self, *args: Any, **schedule_options: Any) -> None:
+        """Queue a task for the next free worker.
+        
+        Args:
+            *args: Arguments passed to the pool's handler
+            **schedule_options: Extra arguments for the task queue's put_nowait, e.g. flow_key
+            
+        Raises:
+            queue.Full: If the task queue is at its maximum depth
+        """
+        self.start()
+        try:
+            self._tasks.put_nowait(args, **schedule_options)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise
+        with self._lock:
+            self._submitted += 1
+    
+    def submit_wait(self, *args: Any, timeout: Optional[float] = None) -> None:
+        """Queue a task, waiting for room if the task queue is full.
+        
+        Args:
+            *args: Arguments passed to the pool's handler
+            timeout: Optional seconds to wait for room
+            
+        Raises:
+            queue.Full: If there is still no room after timeout seconds
+        """
+        self.start()
+        self._tasks.put(args, timeout=timeout)
+        with self._lock:
+            self._submitted += 1
+    
+    def _worker_loop(self) -> None:
+        """Pull tasks off the queue and run them until the process exits."""
+        while True:
+            args = self._tasks.get()
+            with self._lock:
+                self._active_workers += 1
+            started_at = time.monotonic()
+            try:
+                self.handler(*args)
+            except Exception as e:
+                logger.error(f"Unhandled error in pool {self.name}: {str(e)}")
+            finally:
+                elapsed = time.monotonic() - started_at
+                with self._lock:
+                    self._active_workers -= 1
+                    self._completed += 1
+                    # Exponentially weighted moving average of task duration
+                    if self._avg_task_seconds is None:
+                        self._avg_task_seconds = elapsed
+                    else:
+                        self._avg_task_seconds += 0.2 * (elapsed - self._avg_task_seconds)
+    
+    def remove_queued(self, match: Callable[[Tuple[Any, ...]], bool]) -> int:
+        """Drop queued tasks that haven't reached a worker yet.
+        
+        Requires a task queue with a remove() method, such as FairJobScheduler.
+        
+        Args:
+            match: Predicate called with each queued task's argument tuple
+        
+        Returns:
+            int: Number of tasks removed
+        """
+        return len(self._tasks.remove(match))
+    
+    def average_task_seconds(self) -> Optional[float]:
+        """Return the moving average of task duration, or None before the first task finishes."""
+        with self._lock:
+            return self._avg_task_seconds
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of pool sizing and utilisation.
+        
+        Returns:
+            Dict[str, Any]: Pool size, queue depth and worker counts
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "pool_size": self.size,
+                "started_workers": len(self._threads),
+                "active_workers": self._active_workers,
+                "idle_workers": len(self._threads) - self._active_workers,
+                "queue_depth": self._tasks.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "average_task_seconds": self._avg_task_seconds
+            }
+
+
+class AdmissionDecision(TypedDict):
+    """Type for an admission control decision"""
+    admitted: bool
+    status_code: int
+    reason: Optional[str]
+    retry_after: int
+
+
+class AdmissionController:
+    """Decides whether /transcribe should accept another job.
+    
+    Sheds load with 503 once the shared backlog or its estimated wait crosses
+    a threshold, and returns 429 to a user who already has too many jobs
+    waiting. Rejections carry a Retry-After estimate of when the backlog will
+    have drained enough to accept the job.
+    """
+    
+    def __init__(self, pool: WorkerPool, scheduler: FairJobScheduler, max_queue_depth: int,
+                 max_estimated_wait: float, max_user_backlog: int, default_job_seconds: float):
+        """Create the controller.
+        
+        Args:
+            pool: Worker pool whose throughput drains the backlog
+            scheduler: Scheduler holding the queued jobs
+            max_queue_depth: Queued jobs above which new uploads are shed
+            max_estimated_wait: Estimated queue wait in seconds above which new uploads are shed
+            max_user_backlog: Queued jobs per user above which that user is throttled
+            default_job_seconds: Job duration assumed until the pool has measured one
+        """
+        self.pool = pool
+        self.scheduler = scheduler
+        self.max_queue_depth = max_queue_depth
+        self.max_estimated_wait = max_estimated_wait
+        self.max_user_backlog = max_user_backlog
+        self.default_job_seconds = default_job_seconds
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._shed = 0
+        self._throttled = 0
+    
+    def _job_seconds(self) -> float:
+        """Return the average time a worker spends on one job."""
+        return self.pool.average_task_seconds() or self.default_job_seconds
+    
+    def _drain_seconds(self, jobs: int) -> float:
+        """Estimate how long the pool takes to work through the given number of queued jobs."""
+        return jobs * self._job_seconds() / max(1, self.pool.size)
+    
+    def check(self, user_id: Optional[str]) -> AdmissionDecision:
+        """Decide whether to accept a new job from a user.
+        
+        Args:
+            user_id: The submitting user's ID, if known
+        
+        Returns:
+            AdmissionDecision: Whether the job is admitted, and if not the status code and Retry-After
+        """
+        queued = self.scheduler.qsize()
+        estimated_wait = self._drain_seconds(queued)
+        user_backlog = self.scheduler.user_backlog(user_id)
+        
+        status_code = 200
+        reason = None
+        retry_after = 0.0
+        if queued >= self.max_queue_depth or estimated_wait >= self.max_estimated_wait:
+            status_code = 503
+            reason = f"Server is overloaded ({queued} jobs queued, ~{int(estimated_wait)}s wait)"
+            # Time until both the depth and the wait are back under their limits
+            excess_jobs = max(queued - self.max_queue_depth + 1, 0)
+            retry_after = max(self._drain_seconds(excess_jobs), estimated_wait - self.max_estimated_wait)
+        elif user_backlog >= self.max_user_backlog:
+            status_code = 429
+            reason = f"Too many queued jobs for this user ({user_backlog})"
+            # The user's oldest job leaves the queue roughly once per round of users
+            retry_after = self._drain_seconds(user_backlog - self.max_user_backlog + 1)
+        
+        with self._lock:
+            if status_code == 503:
+                self._shed += 1
+            elif status_code == 429:
+                self._throttled += 1
+            else:
+                self._admitted += 1
+        return {
+            "admitted": status_code == 200,
+            "status_code": status_code,
+            "reason": reason,
+            "retry_after": max(1, math.ceil(retry_after)) if status_code != 200 else 0
+        }
+    
+    def state(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Return the current admission state without counting it as a submission.
+        
+        Args:
+            user_id: Optional user to include per-user backlog for
+        
+        Returns:
+            Dict[str, Any]: Load figures, thresholds and decision counters
+        """
+        queued = self.scheduler.qsize()
+        estimated_wait = self._drain_seconds(queued)
+        overloaded = queued >= self.max_queue_depth or estimated_wait >= self.max_estimated_wait
+        state: Dict[str, Any] = {
+            "accepting": not overloaded,
+            "queue_depth": queued,
+            "estimated_wait_seconds": round(estimated_wait, 2),
+            "average_job_seconds": round(self._job_seconds(), 2),
+            "max_queue_depth": self.max_queue_depth,
+            "max_estimated_wait_seconds": self.max_estimated_wait,
+            "max_user_backlog": self.max_user_backlog
+        }
+        if user_id:
+            state["user_backlog"] = self.scheduler.user_backlog(user_id)
+            state["accepting"] = state["accepting"] and state["user_backlog"] < self.max_user_backlog
+        with self._lock:
+            state["admitted"] = self._admitted
+            state["shed"] = self._shed
+            state["throttled"] = self._throttled
+        return state
+
+
+class AsyncBridge:
+    """Runs an asyncio event loop on a background thread for synchronous callers.
+    
+    Flask routes and worker threads hand coroutines to the loop with submit(),
+    so slow I/O waits are multiplexed on one thread instead of each
+    holding an OS thread.
+    """
+    
+    def __init__(self, name: str):
+        """Create the bridge without starting its loop.
+        
+        Args:
+            name: Name of the event loop thread
+        """
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._completed = 0
+    
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Start the event loop thread on first use and return the loop."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name=self.name, daemon=True).start()
+                self._loop = loop
+                logger.info(f"Started event loop thread {self.name}")
+            return self._loop
+    
+    def submit(self, coro: Any) -> "Future[Any]":
+        """Schedule a coroutine on the loop without waiting for it.
+        
+        Args:
+            coro: The coroutine to run
+        
+        Returns:
+            Future: Thread-safe future resolved with the coroutine's result
+        """
+        loop = self._ensure_started()
+        with self._lock:
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        future.add_done_callback(self._on_done)
+        return future
+    
+    def _on_done(self, future: "Future[Any]") -> None:
+        """Update counters when a submitted coroutine finishes."""
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of event loop utilisation.
+        
+        Returns:
+            Dict[str, Any]: Whether the loop is running and coroutine counts
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "running": self._loop is not None,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "completed": self._completed
+            }
+
+
+# Event loop used for the async categorization path
+async_bridge = AsyncBridge(name="categorization-loop")
+
+
+class JobInterruptedError(Exception):
+    """Base class for errors that stop a job's processing early"""
+
+
+class JobCancelledError(JobInterruptedError):
+    """Raised inside a job's processing once the job has been cancelled"""
+
+
+class JobTimeoutError(JobInterruptedError):
+    """Raised inside a job's processing once its deadline or stage budget has passed"""
+
+
+class JobControl:
+    """Cancellation and deadline handle shared by a job's API routes and its worker.
+    
+    Processing code calls check() between stages and sleep() instead of
+    time.sleep(), so a cancelled or expired job stops at the next boundary
+    and a sleeping step wakes up as soon as it is cancelled or out of time.
+    Each stage can also have its own time budget on top of the job deadline.
+    The lock serialises status changes so a cancel can never be overwritten
+    by a late completion. check() also asks the job store, so a cancel made
+    through another process sharing the store stops the job too.
+    """
+    
+    def __init__(self, job_id: str, deadline_seconds: Optional[float] = None):
+        """Create a handle for a job that has not been cancelled.
+        
+        Args:
+            job_id: The ID of the job this handle controls
+            deadline_seconds: Optional time from now by which the whole job must finish
+        """
+        self.job_id = job_id
+        self.lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds is not None else None
+        self.stage: Optional[str] = None
+        self._stage_budget: Optional[float] = None
+        self._stage_deadline: Optional[float] = None
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether the job has been cancelled."""
+        return self._cancelled.is_set()
+    
+    def cancel(self) -> None:
+        """Flag the job as cancelled and wake any sleeping step."""
+        self._cancelled.set()
+    
+    def begin_stage(self, stage: str, budget_seconds: Optional[float]) -> None:
+        """Start timing a new processing stage.
+        
+        Args:
+            stage: Name of the stage, used in timeout errors
+            budget_seconds: Optional maximum time the stage may take
+        """
+        self.stage = stage
+        self._stage_budget = budget_seconds
+        self._stage_deadline = time.monotonic() + budget_seconds if budget_seconds is not None else None
+    
+    def remaining(self) -> Optional[float]:
+        """Return seconds left before the job deadline or stage budget runs out, or None if unbounded."""
+        deadlines = [d for d in (self.deadline, self._stage_deadline) if d is not None]
+        if not deadlines:
+            return None
+        return min(deadlines) - time.monotonic()
+    
+    def check(self) -> None:
+        """Raise if the job has been cancelled or has run out of time.
+        
+        Raises:
+            JobCancelledError: If the job has been cancelled
+            JobTimeoutError: If the job deadline or current stage budget has passed
+        """
+        if self._cancelled.is_set() or job_store.cancel_requested(self.job_id):
+            self._cancelled.set()
+            raise JobCancelledError(f"Job {self.job_id} was cancelled")
+        now = time.monotonic()
+        if self._stage_deadline is not None and now >= self._stage_deadline:
+            raise JobTimeoutError(f"Timed out: {self.stage} stage exceeded its {self._stage_budget:g}s budget")
+        if self.deadline is not None and now >= self.deadline:
+            raise JobTimeoutError(f"Timed out: job deadline passed during {self.stage or 'queueing'}")
+    
+    def sleep(self, seconds: float) -> None:
+        """Sleep for the given time, raising as soon as the job is cancelled or out of time."""
+        remaining = self.remaining()
+        self._cancelled.wait(seconds if remaining is None else max(0.0, min(seconds, remaining)))
+        self.check()
+    
+    def wait_for(self, future: "Future[Any]", poll_interval: float = 0.1) -> Any:
+        """Block on a future, cancelling it if the job is cancelled or runs out of time first.
+        
+        Args:
+            future: The future to wait for
+            poll_interval: Seconds between cancellation and deadline checks
+        
+        Returns:
+            Any: The future's result
+        """
+        while True:
+            try:
+                return future.result(timeout=poll_interval)
+            except FutureTimeoutError:
+                try:
+                    self.check()
+                except JobInterruptedError:
+                    future.cancel()
+                    raise
+
+
+def check_version_compatibility():
+    """Middleware decorator to check API version compatibility and log user ID.
+    
+    Returns:
+        Function: Decorated route function that checks version compatibility.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs) -> Union[Response, Tuple[Response, int]]:
+            # Get frontend version from headers
+            frontend_version = request.headers.get('X-Frontend-Version')
+            if not frontend_version:
+                return jsonify({
+                    "error": "Version mismatch",
+                    "message": "Frontend version header is missing. API requests must include X-Frontend-Version header.",
+                    "backend_version": VERSION,
+                    "frontend_version": None
+                }), 409  # Conflict status code
+            elif frontend_version != VERSION:
+                return jsonify({
+                    "error": "Version mismatch",
+                    "message": f"Your application (v{frontend_version}) is out of date with the server (v{VERSION}). Please refresh your browser.",
+                    "backend_version": VERSION,
+                    "frontend_version": frontend_version
+                }), 409  # Conflict status code
+                
+            # Log user ID if present
+            user_id = request.headers.get('X-User-ID')
+            if user_id:
+                logger.info(f"Request to {request.path} from user {user_id}")
+            else:
+                logger.info(f"Request to {request.path} from unknown user")
+                
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
+def update_job(job_id: str, **fields: Any) -> None:
+    """Apply field updates to a job and bump its updated_at timestamp.
+    
+    Args:
+        job_id: The ID of the job to update
+        **fields: Job fields to overwrite
+    """
+    job_store.update(job_id, **fields)
+
+
+def set_job_progress(job_id: str, progress: int) -> None:
+    """Record transcription progress for a job.
+    
+    Args:
+        job_id: The ID of the job to update
+        progress: Completion percentage
+    """
+    job_store.update_progress(job_id, progress)
+    print(f"Job {job_id} progress updated to: {progress}%")
+
+
+def add_transcript_segment(job_id: str, text: str) -> None:
+    """Append a finished piece of transcript to a processing job.
+    
+    Each job has a single writer of its segments at a time (the transcribe
+    stage or the progress relay), so reading and rewriting the list is safe.
+    
+    Args:
+        job_id: The ID of the job to update
+        text: Transcript text following whatever was added before
+    """
+    job = job_store.get(job_id)
+    if job is None or job["status"] != JobStatus.PROCESSING:
+        return
+    job_store.update(job_id, segments=(job.get("segments") or []) + [text])
+
+
+def _audio_spool_path(job_id: str) -> str:
+    """Return where a job's accepted audio is spooled."""
+    return os.path.join(AUDIO_SPOOL_DIR, f"{job_id}.audio")
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload is bigger than UPLOAD_MAX_BYTES"""
+
+
+def spool_job_audio(job_id: str, stream: Any, max_bytes: int = UPLOAD_MAX_BYTES) -> Tuple[int, str]:
+    """Stream an upload to the job's spool file in chunks, hashing it on the way.
+    
+    Only one chunk is held in memory at a time, however long the clip. The
+    file is written under a temporary name and renamed into place, so a
+    crash mid-write never leaves a truncated clip behind.
+    
+    Args:
+        job_id: The ID of the job the audio belongs to
+        stream: Readable binary stream of the upload
+        max_bytes: Largest upload accepted
+    
+    Returns:
+        Tuple[int, str]: Number of bytes written and the SHA-256 hex digest of the audio
+    
+    Raises:
+        UploadTooLargeError: If the upload is bigger than max_bytes
+    """
+    os.makedirs(AUDIO_SPOOL_DIR, exist_ok=True)
+    path = _audio_spool_path(job_id)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with open(f"{path}.tmp", "wb") as f:
+            while True:
+                chunk = stream.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Audio is larger than {max_bytes} bytes")
+                digest.update(chunk)
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(f"{path}.tmp")
+        raise
+    os.replace(f"{path}.tmp", path)
+    return size, digest.hexdigest()
+
+
+@contextmanager
+def open_job_audio(path: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Open spooled audio as a read-only memory-mapped view.
+    
+    Pages are read from disk as the transcriber touches them, so a job's
+    memory use doesn't grow with the length of its clip.
+    
+    Args:
+        path: Path of the spooled audio file
+    
+    Yields:
+        The audio contents (empty bytes for an empty file, which can't be mapped)
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
+
+
+def discard_job_audio(job_id: str) -> None:
+    """Delete a job's spooled audio if there is any."""
+    try:
+        os.remove(_audio_spool_path(job_id))
+    except FileNotFoundError:
+        pass
+
+
+class AudioDedupIndex:
+    """Remembers which job handled each audio clip, keyed by content hash.
+    
+    claim() decides what a new upload should do: reuse a completed job's
+    result, follow a job that is still running on the same audio, or run
+    itself. Followers keep their own spooled audio until the job they follow
+    finishes, so if it fails or is cancelled they can still run on their own.
+    A follower whose own deadline passes first is expired by a single
+    deadline thread shared by all followers. The oldest hashes are
+    forgotten beyond max_entries.
+    """
+    
+    def __init__(self, max_entries: int):
+        """Create an empty index.
+        
+        Args:
+            max_entries: Most audio hashes to remember
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, str]" = OrderedDict()  # Audio hash -> job that ran it
+        self._followers: Dict[str, List[str]] = {}  # Running job -> jobs waiting on its result
+        self._leaders: Dict[str, str] = {}  # Waiting job -> job it follows
+        self._deadlines: List[Tuple[float, str]] = []  # Heap of (monotonic deadline, waiting job)
+        self._deadline_changed = threading.Condition(self._lock)
+        self._deadline_thread: Optional[threading.Thread] = None
+        self._lookups = 0
+        self._completed_hits = 0
+        self._in_flight_hits = 0
+    
+    def claim(self, audio_hash: str, job_id: str) -> Tuple[str, Optional[TranscriptionJob]]:
+        """Look up a clip for a new job, registering the job if nobody has the clip.
+        
+        Jobs set their final status before they are released, and followers
+        are attached under the same lock that release takes them under, so
+        a job can't gain a follower after it has finished.
+        
+        Args:
+            audio_hash: Content hash of the new job's audio
+            job_id: The ID of the new job
+        
+        Returns:
+            Tuple[str, Optional[TranscriptionJob]]: "completed" or "in_flight" with the
+            matching job, or "miss" with None if the new job should run itself
+        """
+        with self._lock:
+            self._lookups += 1
+            existing_id = self._jobs.get(audio_hash)
+            existing = job_store.get(existing_id) if existing_id else None
+            if existing is not None and existing["status"] == JobStatus.COMPLETED:
+                self._jobs.move_to_end(audio_hash)
+                self._completed_hits += 1
+                return "completed", existing
+            if existing is not None and existing["status"] in (JobStatus.PENDING, JobStatus.PROCESSING):
+                self._followers.setdefault(existing["id"], []).append(job_id)
+                self._leaders[job_id] = existing["id"]
+                self._in_flight_hits += 1
+                return "in_flight", existing
+            self._jobs[audio_hash] = job_id
+            self._jobs.move_to_end(audio_hash)
+            while len(self._jobs) > self.max_entries:
+                self._jobs.popitem(last=False)
+            return "miss", None
+    
+    def forget(self, audio_hash: str, job_id: str) -> None:
+        """Unregister a job that claimed a clip but never ran."""
+        with self._lock:
+            if self._jobs.get(audio_hash) == job_id:
+                del self._jobs[audio_hash]
+    
+    def detach(self, job_id: str) -> bool:
+        """Stop a follower waiting on its leader, e.g. when it is cancelled.
+        
+        Returns:
+            bool: Whether the job was following another
+        """
+        with self._lock:
+            leader_id = self._leaders.pop(job_id, None)
+            if leader_id is None:
+                return False
+            followers = self._followers.get(leader_id, [])
+            if job_id in followers:
+                followers.remove(job_id)
+            self._drop_deadlines([job_id])
+            return True
+    
+    def take_followers(self, job_id: str) -> List[str]:
+        """Remove and return the jobs following a job that has finished."""
+        with self._lock:
+            followers = self._followers.pop(job_id, [])
+            for follower_id in followers:
+                self._leaders.pop(follower_id, None)
+            self._drop_deadlines(followers)
+            return followers
+    
+    def expire_at(self, job_id: str, deadline: float) -> None:
+        """Have a follower expired if it is still waiting at its deadline.
+        
+        Args:
+            job_id: The ID of the following job
+            deadline: time.monotonic() value at which expire_follower() is called for it
+        """
+        with self._lock:
+            if job_id not in self._leaders:
+                return
+            heapq.heappush(self._deadlines, (deadline, job_id))
+            self._deadline_changed.notify()
+            if self._deadline_thread is None:
+                self._deadline_thread = threading.Thread(target=self._expire_loop, name="dedup-deadlines", daemon=True)
+                self._deadline_thread.start()
+    
+    def _drop_deadlines(self, job_ids: List[str]) -> None:
+        """Forget the deadlines of jobs that stopped following. Caller holds the lock."""
+        if not job_ids or not self._deadlines:
+            return
+        dropped = set(job_ids)
+        self._deadlines = [entry for entry in self._deadlines if entry[1] not in dropped]
+        heapq.heapify(self._deadlines)
+    
+    def _expire_loop(self) -> None:
+        """Expire followers as their deadlines pass."""
+        while True:
+            with self._lock:
+                while not self._deadlines or self._deadlines[0][0] > time.monotonic():
+                    self._deadline_changed.wait(self._deadlines[0][0] - time.monotonic() if self._deadlines else None)
+                expired = []
+                while self._deadlines and self._deadlines[0][0] <= time.monotonic():
+                    expired.append(heapq.heappop(self._deadlines)[1])
+            for job_id in expired:
+                try:
+                    expire_follower(job_id)
+                except Exception as e:
+                    logger.error(f"Failed to expire follower {job_id}: {str(e)}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return dedup lookups and hit rates.
+        
+        Returns:
+            Dict[str, Any]: Lookup and hit counts, hit rates and index size
+        """
+        with self._lock:
+            lookups = self._lookups
+            return {
+                "enabled": AUDIO_DEDUP_ENABLED,
+                "lookups": lookups,
+                "completed_hits": self._completed_hits,
+                "in_flight_hits": self._in_flight_hits,
+                "hit_rate": round((self._completed_hits + self._in_flight_hits) / lookups, 3) if lookups else None,
+                "completed_hit_rate": round(self._completed_hits / lookups, 3) if lookups else None,
+                "in_flight_hit_rate": round(self._in_flight_hits / lookups, 3) if lookups else None,
+                "entries": len(self._jobs),
+                "waiting_followers": len(self._leaders),
+                "follower_deadlines": len(self._deadlines)
+            }
+
+
+audio_dedup = AudioDedupIndex(max_entries=AUDIO_DEDUP_MAX_ENTRIES)
+
+
+def release_job(job_id: str) -> None:
+    """Drop the resources held for a job that will not run any further, and settle its followers."""
+    job_controls.pop(job_id, None)
+    discard_job_audio(job_id)
+    settle_followers(job_id)
+
+
+def run_transcription(audio_data: Optional[Union[bytes, mmap.mmap]], report_progress: Callable[[int], None],
+                      sleep: Callable[[float], None] = time.sleep,
+                      report_text: Optional[Callable[[str], None]] = None) -> str:
+    """Mock transcription of an audio clip.
+    
+    This is the CPU-bound part of a job, kept free of shared state so it can
+    run either in a worker thread or in a process-pool worker.
+    
+    Args:
+        audio_data: Optional audio contents, as bytes or a memory-mapped view
+        report_progress: Called with the completion percentage after each step
+        sleep: Used to simulate work, so callers can make steps interruptible
+        report_text: Optional callback given the words each step transcribed
+    
+    Returns:
+        str: The transcription text
+    """
+    # Generate random transcription
+    transcription = random.choice([
+        "I've always been fascinated by cars, especially classic muscle cars from the 60s and 70s. The raw power and beautiful design of those vehicles is just incredible.",
+        "Bald eagles are such majestic creatures. I love watching them soar through the sky and dive down to catch fish. Their white heads against the blue sky is a sight I'll never forget.",
+        "Deep sea diving opens up a whole new world of exploration. The mysterious creatures and stunning coral reefs you encounter at those depths are unlike anything else on Earth."
+    ])
+    words = transcription.split()
+    
+    # Simulate different processing stages - shorter times for testing
+    processing_steps = 3
+    for step in range(processing_steps):
+        # Simulate work - shorter times for testing (1-2 seconds per step)
+        sleep(random.randint(1, 2))
+        if report_text is not None:
+            step_words = words[len(words) * step // processing_steps:len(words) * (step + 1) // processing_steps]
+            if step_words:
+                report_text(" ".join(step_words))
+        # Update progress (from 10% to 90%)
+        progress = 10 + int((step + 1) * (80 / processing_steps))
+        report_progress(progress)
+    
+    return transcription
+
+
+def read_audio_range(audio_path: str, start: int, end: int) -> bytes:
+    """Read one segment of a spooled clip."""
+    with open(audio_path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def _transcribe_in_subprocess(job_id: str, audio_path: Optional[str], progress_queue: Any,
+                              segment: Optional[Tuple[int, int]] = None) -> str:
+    """Process-pool entry point for run_transcription.
+    
+    The child maps the spooled audio itself, so only the path crosses the
+    process boundary. Progress and partial transcript text are sent back to
+    the Flask process as (job_id, progress, text) tuples, except for
+    segments, whose progress and text the parent tracks as they complete.
+    """
+    report_progress = lambda progress: progress_queue.put((job_id, progress, None))
+    report_text = lambda text: progress_queue.put((job_id, None, text))
+    if segment is not None and audio_path is not None:
+        return run_transcription(read_audio_range(audio_path, *segment), lambda progress: None)
+    if audio_path is None:
+        return run_transcription(None, report_progress, report_text=report_text)
+    with open_job_audio(audio_path) as audio:
+        return run_transcription(audio, report_progress, report_text=report_text)
+
+
+class ProcessTranscriptionBackend:
+    """Runs the transcription stage in a pool of worker processes.
+    
+    Child processes read the job's spooled audio by path and progress is relayed
+    back into the job store by a listener thread, so CPU-heavy transcription does
+    not hold the GIL of the process serving Flask requests.
+    """
+    
+    def __init__(self, max_workers: int):
+        """Create the backend without starting any processes.
+        
+        Args:
+            max_workers: Number of worker processes
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager: Optional[Any] = None
+        self._progress_queue: Optional[Any] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+    
+    def _ensure_started(self) -> None:
+        """Start the process pool and progress listener on first use."""
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._manager = multiprocessing.Manager()
+            self._progress_queue = self._manager.Queue()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=random.seed)
+            threading.Thread(target=self._relay_progress, name="transcription-progress", daemon=True).start()
+        logger.info(f"Started transcription process pool with {self.max_workers} workers")
+    
+    def _relay_progress(self) -> None:
+        """Copy progress and transcript messages from worker processes into the job store."""
+        while True:
+            try:
+                job_id, progress, text = self._progress_queue.get()
+            except (EOFError, OSError):
+                return
+            if text is not None:
+                add_transcript_segment(job_id, text)
+                continue
+            # Messages can arrive after the job has moved on, so never move progress backwards
+            job = job_store.get(job_id)
+            if job is None or job["status"] != JobStatus.PROCESSING or progress <= job["progress"]:
+                continue
+            set_job_progress(job_id, progress)
+    
+    def transcribe(self, job_id: str, audio_path: Optional[str], control: Optional[JobControl] = None,
+                   segment: Optional[Tuple[int, int]] = None) -> str:
+        """Transcribe audio in a worker process, blocking until it finishes.
+        
+        A cancelled job stops waiting straight away; the child process finishes
+        its current clip and the result is discarded.
+        
+        Args:
+            job_id: The ID of the job being processed
+            audio_path: Optional path of the job's spooled audio
+            control: Optional cancellation handle for the job
+            segment: Optional (start, end) byte range to transcribe instead of the whole clip
+        
+        Returns:
+            str: The transcription text
+        """
+        self._ensure_started()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(_transcribe_in_subprocess, job_id, audio_path, self._progress_queue, segment)
+            transcription = control.wait_for(future) if control else future.result()
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        with self._lock:
+            self._completed += 1
+        return transcription
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of process pool utilisation.
+        
+        Returns:
+            Dict[str, Any]: Worker count and job counters
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "started": self._executor is not None,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "failed": self._failed
+            }
+
+
+def stitch_transcripts(texts: List[str], max_overlap_words: int = 20) -> str:
+    """Join segment transcripts in order, dropping words repeated across each overlap.
+    
+    Neighbouring segments share a little audio, so the end of one transcript
+    can repeat at the start of the next. The longest run of words (up to
+    max_overlap_words) that ends one and starts the next is kept once.
+    
+    Args:
+        texts: Segment transcripts in audio order
+        max_overlap_words: Longest repeated run to look for
+    
+    Returns:
+        str: The combined transcript
+    """
+    words: List[str] = []
+    for text in texts:
+        new_words = text.split()
+        overlap = 0
+        for n in range(min(max_overlap_words, len(words), len(new_words)), 0, -1):
+            if [word.lower() for word in words[-n:]] == [word.lower() for word in new_words[:n]]:
+                overlap = n
+                break
+        words.extend(new_words[overlap:])
+    return " ".join(words)
+
+
+def parse_wav_header(audio: Union[bytes, mmap.mmap]) -> Optional[WavLayout]:
+    """Find the PCM samples in a RIFF/WAVE file.
+    
+    Args:
+        audio: The whole file
+    
+    Returns:
+        Optional[WavLayout]: Where the samples are and how they're laid out, or
+        None if the file isn't uncompressed 16- or 32-bit PCM WAV
+    """
+    if len(audio) < 12 or audio[0:4] != b"RIFF" or audio[8:12] != b"WAVE":
+        return None
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(audio):
+        chunk_id = audio[offset:offset + 4]
+        chunk_size = struct.unpack("<I", audio[offset + 4:offset + 8])[0]
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            # A short or truncated format chunk can't be trusted
+            if chunk_size < 16 or body + chunk_size > len(audio):
+                return None
+            fmt = struct.unpack("<HHIIHH", audio[body:body + 16])
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            audio_format, channels, sample_rate, _, block_align, bits = fmt
+            if audio_format != 1 or bits not in (16, 32) or channels < 1 or block_align != channels * bits // 8:
+                return None
+            # Streamed WAVs may leave the data size at 0 or past the end of the file
+            data_end = min(len(audio), body + chunk_size) if chunk_size else len(audio)
+            return {
+                "data_start": body,
+                "data_end": data_end,
+                "channels": channels,
+                "sample_width": bits // 8,
+                "sample_rate": sample_rate
+            }
+        # Chunks are padded to an even length
+        offset = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+class SegmentedTranscriber:
+    """Transcribes long clips as overlapping segments in parallel.
+    
+    Only uncompressed PCM WAV clips are segmented; anything else (such as
+    the recorder's webm/opus) can't be cut at arbitrary byte offsets and is
+    transcribed in a single pass. Clips whose samples are longer than
+    segment_bytes are cut near every segment_bytes, on a sample frame
+    boundary at the quietest 20ms within search_bytes of the target so cuts
+    tend to fall between words. Neighbouring segments overlap by overlap_bytes, so a
+    word on a cut is heard whole by at least one of them. Segments from all
+    jobs share one pool of segment workers, each running the same mock
+    transcription (in-thread or in a worker process, per
+    TRANSCRIPTION_EXECUTOR), and the results are stitched back in order.
+    """
+    
+    SAMPLE_CODES = {2: "h", 4: "i"}  # memoryview formats for each sample width
+    
+    def __init__(self, segment_bytes: int, overlap_bytes: int, search_bytes: int, max_workers: int):
+        """Create a transcriber with its own segment worker pool.
+        
+        Args:
+            segment_bytes: Target segment length in bytes
+            overlap_bytes: Bytes shared by neighbouring segments
+            search_bytes: How far either side of a target cut to look for silence
+            max_workers: Segments transcribed at once
+        """
+        self.segment_bytes = segment_bytes
+        self.overlap_bytes = overlap_bytes
+        self.search_bytes = search_bytes
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcribe-segment")
+        self._lock = threading.Lock()
+        self._jobs = 0
+        self._segments = 0
+    
+    def _quietest_frame(self, audio: Union[bytes, mmap.mmap], layout: WavLayout, frame_bytes: int,
+                        low: int, high: int) -> int:
+        """Return the offset of the quietest 20ms in audio[low:high], aligned to the clip's sample frames."""
+        block = layout["channels"] * layout["sample_width"]
+        low -= (low - layout["data_start"]) % block
+        code = self.SAMPLE_CODES[layout["sample_width"]]
+        best, best_energy = low, None
+        for offset in range(low, high - frame_bytes + 1, frame_bytes):
+            energy = sum(map(abs, memoryview(audio[offset:offset + frame_bytes]).cast(code)))
+            if best_energy is None or energy < best_energy:
+                best, best_energy = offset, energy
+        return best
+    
+    def split(self, audio: Union[bytes, mmap.mmap]) -> List[Tuple[int, int]]:
+        """Work out the overlapping (start, end) byte ranges to transcribe.
+        
+        Args:
+            audio: The whole clip
+        
+        Returns:
+            List[Tuple[int, int]]: Ranges of the clip's samples in order, or the
+            whole file as a single range for short clips and anything that
+            isn't PCM WAV
+        """
+        layout = parse_wav_header(audio)
+        if layout is None or self.segment_bytes <= 0 or layout["data_end"] - layout["data_start"] <= self.segment_bytes:
+            return [(0, len(audio))]
+        block = layout["channels"] * layout["sample_width"]
+        frame_bytes = max(1, layout["sample_rate"] // 50) * block
+        # Keep the overlap whole sample frames so every segment starts on a frame boundary
+        half_overlap = self.overlap_bytes // 2 // block * block
+        length = layout["data_end"]
+        segments = []
+        start = layout["data_start"]
+        while length - start > self.segment_bytes:
+            target = start + self.segment_bytes
+            cut = self._quietest_frame(audio, layout, frame_bytes,
+                                       max(start + half_overlap + frame_bytes, target - self.search_bytes),
+                                       min(length, target + self.search_bytes))
+            segments.append((start, min(length, cut + half_overlap)))
+            start = max(start + block, cut - half_overlap)
+        segments.append((start, length))
+        return segments
+    
+    def transcribe(self, job_id: str, audio_path: str, segments: List[Tuple[int, int]], control: JobControl) -> str:
+        """Transcribe a clip's segments in parallel and stitch the results.
+        
+        Job progress moves from 10 to 90 as the segments' combined progress does.
+        As soon as a segment and every one before it have finished, the new
+        words they add to the stitched transcript are published on the job.
+        
+        Args:
+            job_id: The ID of the job being processed
+            audio_path: Path of the job's spooled audio
+            segments: Byte ranges from split()
+            control: The job's cancellation and deadline handle
+        
+        Returns:
+            str: The combined transcript
+        """
+        done = [0.0] * len(segments)
+        texts: List[Optional[str]] = [None] * len(segments)
+        published_segments = 0
+        published_text = ""
+        progress_lock = threading.Lock()
+        
+        def report(index: int, fraction: float) -> None:
+            with progress_lock:
+                done[index] = fraction
+                set_job_progress(job_id, 10 + int(80 * sum(done) / len(done)))
+        
+        def publish(index: int, text: str) -> None:
+            nonlocal published_segments, published_text
+            with progress_lock:
+                texts[index] = text
+                while published_segments < len(texts):
+                    segment_text = texts[published_segments]
+                    if segment_text is None:
+                        break
+                    previous = published_text
+                    published_text = stitch_transcripts([previous, segment_text])
+                    published_segments += 1
+                    added = published_text[len(previous):].strip()
+                    if added:
+                        add_transcript_segment(job_id, added)
+        
+        def transcribe_segment(index: int, start: int, end: int) -> str:
+            control.check()
+            if TRANSCRIPTION_EXECUTOR == "process":
+                text = process_transcription_backend.transcribe(job_id, audio_path, control, segment=(start, end))
+            else:
+                text = run_transcription(
+                    read_audio_range(audio_path, start, end),
+                    lambda progress: report(index, (progress - 10) / 80),
+                    sleep=control.sleep
+                )
+            report(index, 1.0)
+            publish(index, text)
+            return text
+        
+        with self._lock:
+            self._jobs += 1
+            self._segments += len(segments)
+        logger.info(f"Transcribing job {job_id} as {len(segments)} segments")
+        futures = [self._executor.submit(transcribe_segment, index, start, end) for index, (start, end) in enumerate(segments)]
+        try:
+            results: List[str] = [control.wait_for(future) for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+        return stitch_transcripts(results)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return segmentation settings and counters.
+        
+        Returns:
+            Dict[str, Any]: Segment sizes, worker count and segmented job counts
+        """
+        with self._lock:
+            return {
+                "segment_bytes": self.segment_bytes,
+                "overlap_bytes": self.overlap_bytes,
+                "max_workers": self.max_workers,
+                "segmented_jobs": self._jobs,
+                "segments": self._segments
+            }
+
+
+# Threads for blocking categorization calls, so the job worker can give up on them at the deadline
+stage_call_executor = ThreadPoolExecutor(max_workers=STAGE_CALL_WORKERS, thread_name_prefix="stage-call")
+
+# Process pool used when TRANSCRIPTION_EXECUTOR is "process"
+process_transcription_backend = ProcessTranscriptionBackend(max_workers=PROCESS_POOL_SIZE)
+
+# Splits long clips and transcribes the pieces in parallel
+segmented_transcriber = SegmentedTranscriber(
+    segment_bytes=TRANSCRIPTION_SEGMENT_BYTES,
+    overlap_bytes=TRANSCRIPTION_SEGMENT_OVERLAP_BYTES,
+    search_bytes=TRANSCRIPTION_SILENCE_SEARCH_BYTES,
+    max_workers=TRANSCRIPTION_SEGMENT_WORKERS
+)
+
+
+class PipelineJob:
+    """State a job carries between pipeline stages"""
+    
+    def __init__(self, job_id: str, audio_path: Optional[str], control: JobControl, user_id: Optional[str] = None,
+                 model_lookup: Optional["Future[str]"] = None):
+        """Create the pipeline state for a job.
+        
+        Args:
+            job_id: The ID of the job
+            audio_path: Optional path of the job's spooled audio
+            control: The job's cancellation and deadline handle
+            user_id: Optional ID of the user whose model preference is used
+            model_lookup: Optional in-flight lookup of the user's preferred provider
+        """
+        self.job_id = job_id
+        self.audio_path = audio_path
+        self.control = control
+        self.user_id = user_id
+        self.model_lookup = model_lookup
+        self.transcription: Optional[str] = None
+        self.model_provider: str = "openai"  # Default model
+        self.categories: Optional[TranscriptionCategories] = None
+
+
+def fail_job(job_id: str, control: JobControl, error: Exception) -> None:
+    """Mark a job as failed unless it has already been cancelled.
+    
+    Args:
+        job_id: The ID of the job that failed
+        control: The job's cancellation handle
+        error: The error that stopped the job
+    """
+    failure_reason = "timeout" if isinstance(error, JobTimeoutError) else "error"
+    with control.lock:
+        if job_store.get(job_id) is not None and not control.cancelled:
+            update_job(job_id, status=JobStatus.FAILED, error=str(error), failure_reason=failure_reason)
+            print(f"Job {job_id} failed with error: {str(error)}")
+    release_job(job_id)
+
+
+def pipeline_stage(stage: Callable[[PipelineJob], None]) -> Callable[[PipelineJob], None]:
+    """Decorator for pipeline stage handlers.
+    
+    Skips jobs that were cancelled or expired while queued for the stage, and
+    turns any error raised by the stage into a failed (or dropped, if
+    cancelled) job so it never reaches the next stage.
+    """
+    @wraps(stage)
+    def run_stage(pjob: PipelineJob) -> None:
+        try:
+            pjob.control.check()
+            stage(pjob)
+        except JobCancelledError:
+            logger.info(f"Job {pjob.job_id} stopped after cancellation")
+            job = job_store.get(pjob.job_id)
+            if job is not None and job["status"] not in FINISHED_STATUSES:
+                # Cancelled from another process just before this one wrote the job's status
+                update_job(pjob.job_id, status=JobStatus.CANCELLED, error="Cancelled by user")
+            release_job(pjob.job_id)
+        except Exception as e:
+            fail_job(pjob.job_id, pjob.control, e)
+    return run_stage
+
+
+def hand_off(pjob: PipelineJob, next_stage: "WorkerPool") -> None:
+    """Queue a job on the next stage, waiting while that stage's queue is full.
+    
+    Blocking here is the pipeline's backpressure: a slow stage holds back the
+    stages in front of it instead of letting jobs pile up in memory.
+    
+    Args:
+        pjob: The job to pass on
+        next_stage: The stage pool to queue it on
+    """
+    while True:
+        pjob.control.check()
+        try:
+            next_stage.submit_wait(pjob, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def start_user_model_lookup(user_id: Optional[str]) -> Optional["Future[str]"]:
+    """Start fetching a user's preferred provider without waiting for it.
+    
+    Called when a job is created so the slow lookup overlaps transcription
+    instead of following it.
+    
+    Args:
+        user_id: Optional ID of the user to look up
+    
+    Returns:
+        Optional[Future]: The in-flight lookup, or None if there is no user
+    """
+    if not user_id:
+        return None
+    if CATEGORIZATION_EXECUTION == "async":
+        return async_bridge.submit(get_user_model_from_db_async(user_id))
+    return stage_call_executor.submit(get_user_model_from_db, user_id)
+
+
+def process_transcription(job_id: str, audio_path: Optional[str] = None, user_id: Optional[str] = None,
+                          model_lookup: Optional["Future[str]"] = None) -> None:
+    """Ingest stage: start a scheduled job on its way through the pipeline.
+    
+    The job then moves through the transcribe, resolve_model, categorize and
+    finalize stages, each with its own worker pool.
+    
+    Args:
+        job_id: The ID of the job to process
+        audio_path: Optional path of the job's spooled audio
+        user_id: Optional ID of the user who submitted the job
+        model_lookup: Optional in-flight lookup of the user's preferred provider
+    """
+    control = job_controls.get(job_id)
+    if control is None:
+        logger.info(f"Skipping job {job_id}: it is no longer active")
+        return
+    try:
+        logger.info(f"Starting processing for job {job_id}")
+        # Update job status to processing
+        with control.lock:
+            control.check()
+            # A resumed job starts its transcript over
+            update_job(job_id, status=JobStatus.PROCESSING, progress=10, last_stage="ingest", segments=None)
+        logger.info(f"Job {job_id} status updated to: {JobStatus.PROCESSING}, progress: 10%")
+        hand_off(PipelineJob(job_id, audio_path, control, user_id, model_lookup), transcribe_stage)
+    except JobCancelledError:
+        logger.info(f"Job {job_id} stopped after cancellation")
+        release_job(job_id)
+    except Exception as e:
+        fail_job(job_id, control, e)
+
+
+@pipeline_stage
+def transcribe_job(pjob: PipelineJob) -> None:
+    """Transcribe stage: turn the job's audio into text."""
+    control = pjob.control
+    control.begin_stage("transcription", STAGE_TIMEOUT_TRANSCRIPTION)
+    segments: List[Tuple[int, int]] = []
+    if pjob.audio_path is not None:
+        with open_job_audio(pjob.audio_path) as audio:
+            segments = segmented_transcriber.split(audio)
+    # Long PCM WAV clips are split and transcribed in parallel; everything else runs in a worker process or in this thread
+    if len(segments) > 1:
+        pjob.transcription = segmented_transcriber.transcribe(pjob.job_id, cast(str, pjob.audio_path), segments, control)
+    elif TRANSCRIPTION_EXECUTOR == "process":
+        pjob.transcription = process_transcription_backend.transcribe(pjob.job_id, pjob.audio_path, control)
+    elif pjob.audio_path is None:
+        pjob.transcription = run_transcription(
+            None,
+            lambda progress: set_job_progress(pjob.job_id, progress),
+            sleep=control.sleep,
+            report_text=lambda text: add_transcript_segment(pjob.job_id, text)
+        )
+    else:
+        with open_job_audio(pjob.audio_path) as audio:
+            pjob.transcription = run_transcription(
+                audio,
+                lambda progress: set_job_progress(pjob.job_id, progress),
+                sleep=control.sleep,
+                report_text=lambda text: add_transcript_segment(pjob.job_id, text)
+            )
+    # Checkpoint the transcript so a restart resumes from here; the audio isn't needed past this point
+    update_job(pjob.job_id, last_stage="transcribe", result=pjob.transcription)
+    pjob.audio_path = None
+    discard_job_audio(pjob.job_id)
+    hand_off(pjob, resolve_model_stage)
+
+
+@pipeline_stage
+def resolve_model_job(pjob: PipelineJob) -> None:
+    """Resolve-model stage: wait for the provider lookup started at job creation.
+    
+    The lookup has been running alongside transcription, so on a cold cache
+    this only waits for whatever is left of it.
+    """
+    control = pjob.control
+    control.begin_stage("preference_lookup", STAGE_TIMEOUT_PREFERENCE_LOOKUP)
+    if pjob.model_lookup is not None:
+        try:
+            pjob.model_provider = control.wait_for(pjob.model_lookup)
+        except JobInterruptedError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting user model preference: {str(e)}")
+    hand_off(pjob, categorize_stage)
+
+
+@pipeline_stage
+def categorize_job(pjob: PipelineJob) -> None:
+    """Categorize stage: categorize the transcription with the resolved provider."""
+    control = pjob.control
+    control.begin_stage("categorization", STAGE_TIMEOUT_CATEGORIZATION)
+    print(f"Categorizing transcription for job {pjob.job_id}")
+    if CATEGORIZATION_EXECUTION == "async":
+        categorization = async_bridge.submit(
+            categorize_with_provider_async(pjob.transcription or "", pjob.model_provider, control=control)
+        )
+    else:
+        categorization = stage_call_executor.submit(
+            categorize_with_provider, pjob.transcription or "", pjob.model_provider, control=control
+        )
+    pjob.categories = control.wait_for(categorization)
+    update_job(pjob.job_id, last_stage="categorize", categories=pjob.categories)
+    hand_off(pjob, finalize_stage)
+
+
+@pipeline_stage
+def finalize_job(pjob: PipelineJob) -> None:
+    """Finalize stage: store the result and mark the job completed."""
+    control = pjob.control
+    transcription = pjob.transcription or ""
+    # Update job with completed status and result
+    with control.lock:
+        control.check()
+        job_store.complete(pjob.job_id, transcription, pjob.categories)
+    release_job(pjob.job_id)
+    print(f"Job {pjob.job_id} completed with result: {transcription[:30]}...")
+    print(f"Categories: {pjob.categories}")
+
+
+def cancel_job(job_id: str, user_id: Optional[str] = None) -> str:
+    """Cancel a pending or processing job.
+    
+    Queued jobs are removed from the scheduler straight away; running jobs
+    stop at their next step or stage boundary. A job this process isn't
+    running is marked cancelled in the store, and whichever process sharing
+    the store is running it stops at its next check.
+    
+    Args:
+        job_id: The ID of the job to cancel
+        user_id: ID of the requesting user, who must own the job if it has an owner
+    
+    Returns:
+        str: "cancelled", "not_found", "forbidden" or "not_cancellable"
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        return "not_found"
+    if job.get("user_id") and job["user_id"] != user_id:
+        return "forbidden"
+    control = job_controls.get(job_id)
+    if control is None:
+        if not job_store.request_cancel(job_id):
+            return "not_cancellable"
+        logger.info(f"Job {job_id} cancelled for the process running it")
+        return "cancelled"
+    with control.lock:
+        job = job_store.get(job_id)
+        if job is None or job["status"] not in (JobStatus.PENDING, JobStatus.PROCESSING):
+            return "not_cancellable"
+        control.cancel()
+        update_job(job_id, status=JobStatus.CANCELLED, error="Cancelled by user")
+    # Give the queue slot back immediately if no worker has picked the job up yet,
+    # and stop waiting if the job was following another job's run of the same audio
+    if ingest_stage.remove_queued(lambda args: args[0] == job_id) or audio_dedup.detach(job_id):
+        release_job(job_id)
+    logger.info(f"Job {job_id} cancelled")
+    return "cancelled"
+
+
+class TokenBucket:
+    """Rate limiter that queues callers for tokens in arrival order.
+    
+    Tokens refill at rate per second up to burst. Each caller reserves the
+    next token as it arrives, letting the balance go negative, then sleeps
+    until the refill covers its reservation. Reservations are handed out in
+    arrival order, so waiting callers are served first come first served
+    and nobody is turned away. A caller that gives up while waiting still
+    uses its slot, which keeps the queue order intact.
+    """
+    
+    def __init__(self, name: str, rate: float, burst: float, wait_sample_size: int = 1000):
+        """Create a full bucket.
+        
+        Args:
+            name: Name of the limited resource, used in stats
+            rate: Tokens added per second; 0 or less disables limiting
+            burst: Most tokens the bucket holds
+            wait_sample_size: Number of recent wait times kept for percentiles
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._acquired = 0
+        self._throttled = 0
+        self._waiting = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._wait_samples: deque = deque(maxlen=wait_sample_size)
+    
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill. Caller holds the lock."""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def _reserve(self) -> float:
+        """Take the next token and return how long to wait before using it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+            self._acquired += 1
+            if wait > 0:
+                self._throttled += 1
+                self._waiting += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._wait_samples.append(wait)
+            return wait
+    
+    def _done_waiting(self) -> None:
+        with self._lock:
+            self._waiting -= 1
+    
+    def acquire(self, control: Optional["JobControl"] = None) -> float:
+        """Wait for a token.
+        
+        Args:
+            control: Optional cancellation handle; waiting stops if the job is cancelled or out of time
+        
+        Returns:
+            float: Seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0.0
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                if control:
+                    control.sleep(wait)
+                else:
+                    time.sleep(wait)
+            finally:
+                self._done_waiting()
+        return wait
+    
+    async def acquire_async(self, control: Optional["JobControl"] = None) -> float:
+        """Asyncio version of acquire."""
+        if self.rate <= 0:
+            return 0.0
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                remaining = control.remaining() if control else None
+                await asyncio.sleep(wait if remaining is None else max(0.0, min(wait, remaining)))
+                if control:
+                    control.check()
+            finally:
+                self._done_waiting()
+        return wait
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return the bucket's configuration, current tokens and wait statistics.
+        
+        Returns:
+            Dict[str, Any]: Tokens available, throttle counts and wait times
+        """
+        with self._lock:
+            if self.rate > 0:
+                self._refill(time.monotonic())
+            samples = list(self._wait_samples)
+            return {
+                "name": self.name,
+                "enabled": self.rate > 0,
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "tokens": round(self._tokens, 2),
+                "acquired": self._acquired,
+                "throttled": self._throttled,
+                "waiting": self._waiting,
+                "total_wait_seconds": round(self._total_wait, 3),
+                "average_wait_seconds": round(self._total_wait / self._acquired, 4) if self._acquired else None,
+                "max_wait_seconds": round(self._max_wait, 3),
+                "wait_seconds_p95": percentile(samples, 95),
+                "wait_seconds_p99": percentile(samples, 99)
+            }
+
+
+class _ConcurrencyWaiter:
+    """A caller queued for an AdaptiveConcurrencyLimiter slot"""
+    
+    __slots__ = ("granted", "abandoned", "notify")
+    
+    def __init__(self, notify: Callable[[], None]):
+        self.granted = False
+        self.abandoned = False
+        self.notify = notify
+
+
+class AdaptiveConcurrencyLimiter:
+    """Caps in-flight calls to a backend and adapts the cap to its latency (AIMD).
+    
+    Latencies are judged a window of window_size calls at a time, by the
+    window's median, so a backend whose calls naturally vary a lot isn't
+    mistaken for a congested one. The baseline is the lowest window median
+    of the last baseline_windows windows, i.e. what the backend does when
+    it isn't queueing. A window whose median is above latency_tolerance
+    times the baseline pauses growth, and congested_windows of them in a
+    row are congestion and multiply the limit by decrease_factor;
+    otherwise each success grows the limit by 1/limit (about one slot per
+    round trip). A failure also cuts the limit, at
+    most once per baseline round trip so one bad burst only counts once.
+    Callers over the limit wait in arrival order.
+    """
+    
+    def __init__(self, name: str, initial_limit: int, min_limit: int, max_limit: int,
+                 latency_tolerance: float, decrease_factor: float, window_size: int = 30,
+                 baseline_windows: int = 10, congested_windows: int = 2):
+        """Create a limiter.
+        
+        Args:
+            name: Name of the limited backend, used in stats
+            initial_limit: Starting in-flight limit
+            min_limit: Lowest the limit can fall to
+            max_limit: Highest the limit can grow to
+            latency_tolerance: Multiple of the baseline window median treated as congestion
+            decrease_factor: Multiplier applied to the limit on congestion or failure
+            window_size: Calls per latency window
+            baseline_windows: Recent windows the baseline is the minimum of
+            congested_windows: Slow windows in a row that count as congestion
+        """
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self._lock = threading.Lock()
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self._in_flight = 0
+        self._waiters: deque = deque()
+        self.window_size = max(1, window_size)
+        self._window: List[float] = []
+        self._window_medians: deque = deque(maxlen=max(1, baseline_windows))
+        self.congested_windows = max(1, congested_windows)
+        self._slow_windows = 0
+        self._last_decrease = 0.0
+        self._increases = 0
+        self._decreases = 0
+        self._peak_in_flight = 0
+    
+    def _admit(self, notify: Callable[[], None]) -> Optional[_ConcurrencyWaiter]:
+        """Take a slot if one is free and nobody is queued, else queue a waiter."""
+        with self._lock:
+            if not self._waiters and self._in_flight < int(self._limit):
+                self._in_flight += 1
+                self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+                return None
+            waiter = _ConcurrencyWaiter(notify)
+            self._waiters.append(waiter)
+            return waiter
+    
+    def _abandon(self, waiter: _ConcurrencyWaiter) -> None:
+        """Withdraw a waiter that stopped waiting, giving back its slot if it was granted meanwhile."""
+        with self._lock:
+            if not waiter.granted:
+                waiter.abandoned = True
+                return
+        self.release()
+    
+    def _grant_waiters(self) -> List[_ConcurrencyWaiter]:
+        """Hand free slots to queued waiters in order. Caller holds the lock."""
+        granted = []
+        while self._waiters and self._in_flight < int(self._limit):
+            waiter = self._waiters.popleft()
+            if waiter.abandoned:
+                continue
+            waiter.granted = True
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            granted.append(waiter)
+        return granted
+    
+    def acquire(self, control: Optional["JobControl"] = None) -> None:
+        """Wait for an in-flight slot.
+        
+        Args:
+            control: Optional cancellation handle; waiting stops if the job is cancelled or out of time
+        """
+        event = threading.Event()
+        waiter = self._admit(event.set)
+        if waiter is None:
+            return
+        try:
+            while not event.wait(0.1):
+                if control:
+                    control.check()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+    
+    async def acquire_async(self, control: Optional["JobControl"] = None) -> None:
+        """Asyncio version of acquire."""
+        loop = asyncio.get_running_loop()
+        granted: "asyncio.Future[None]" = loop.create_future()
+        
+        def notify() -> None:
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+        
+        waiter = self._admit(notify)
+        if waiter is None:
+            return
+        try:
+            while not granted.done():
+                await asyncio.wait({granted}, timeout=0.1)
+                if control:
+                    control.check()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+    
+    def release(self, latency: Optional[float] = None, failed: bool = False) -> None:
+        """Give back a slot and adjust the limit from the call's outcome.
+        
+        Args:
+            latency: Seconds the call took, or None if it didn't run to an outcome
+            failed: Whether the call failed
+        """
+        with self._lock:
+            self._in_flight -= 1
+            if failed:
+                self._decrease()
+            elif latency is not None:
+                self._window.append(latency)
+                if len(self._window) >= self.window_size:
+                    self._end_window()
+                if not self._slow_windows and self._limit < self.max_limit:
+                    self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                    self._increases += 1
+            granted = self._grant_waiters()
+        for waiter in granted:
+            waiter.notify()
+    
+    def _baseline(self) -> Optional[float]:
+        """Return the lowest recent window median, or None before the first window. Caller holds the lock."""
+        return min(self._window_medians) if self._window_medians else None
+    
+    def _end_window(self) -> None:
+        """Judge a full window of latencies against the baseline. Caller holds the lock."""
+        median = cast(float, percentile(self._window, 50))
+        self._window = []
+        self._window_medians.append(median)
+        if median <= cast(float, self._baseline()) * self.latency_tolerance:
+            self._slow_windows = 0
+            return
+        self._slow_windows += 1
+        if self._slow_windows >= self.congested_windows:
+            self._last_decrease = 0.0
+            self._decrease()
+    
+    def _decrease(self) -> None:
+        """Cut the limit multiplicatively, at most once per baseline round trip. Caller holds the lock."""
+        now = time.monotonic()
+        if now - self._last_decrease < (self._baseline() or 0.0):
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        self._decreases += 1
+        logger.info(f"Concurrency limit for {self.name} cut to {int(self._limit)}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limit, load and latency estimates.
+        
+        Returns:
+            Dict[str, Any]: Limit, in-flight and queued calls, latencies and adjustment counts
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "limit": int(self._limit),
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "waiting": sum(1 for waiter in self._waiters if not waiter.abandoned),
+                "baseline_latency_seconds": self._baseline(),
+                "window_latency_seconds": self._window_medians[-1] if self._window_medians else None,
+                "slow_windows": self._slow_windows,
+                "increases": self._increases,
+                "decreases": self._decreases
+            }
+
+
+class LLMProviderError(Exception):
+    """Raised when a call to an LLM provider fails"""
+
+
+class CircuitOpenError(LLMProviderError):
+    """Raised instead of calling a provider whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Stops calling a provider that keeps failing, then probes for recovery.
+    
+    Closed: calls go through, and failure_threshold consecutive failures
+    open the circuit. Open: calls fail fast with CircuitOpenError for
+    reset_timeout seconds. Half-open: up to half_open_max_calls probe calls
+    go through; a success closes the circuit and a failure re-opens it.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, half_open_max_calls: int = 1):
+        """Create a closed circuit breaker.
+        
+        Args:
+            name: Name of the protected provider, used in errors and stats
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before probing
+            half_open_max_calls: Probe calls allowed at once while half-open
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._successes = 0
+        self._failures = 0
+        self._rejected = 0
+        self._times_opened = 0
+    
+    def acquire(self) -> None:
+        """Claim permission for one call.
+        
+        Every successful acquire must be followed by exactly one of
+        record_success(), record_failure() or release().
+        
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all probe slots taken
+        """
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                logger.info(f"Circuit for {self.name} is half-open, probing")
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return
+            self._rejected += 1
+        raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+    
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit if it was probing."""
+        with self._lock:
+            self._successes += 1
+            self._consecutive_failures = 0
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight -= 1
+                self._state = self.CLOSED
+                logger.info(f"Circuit for {self.name} closed")
+    
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit if it has failed enough."""
+        with self._lock:
+            self._failures += 1
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight -= 1
+            elif self._consecutive_failures < self.failure_threshold:
+                return
+            if self._state != self.OPEN:
+                self._times_opened += 1
+                logger.warning(f"Circuit for {self.name} opened after {self._consecutive_failures} consecutive failures")
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+    
+    def release(self) -> None:
+        """Give back a call slot without an outcome, e.g. when the job was cancelled mid-call."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight -= 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return the breaker's state and counters.
+        
+        Returns:
+            Dict[str, Any]: State, failure streak and call outcomes
+        """
+        with self._lock:
+            retry_in = None
+            if self._state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "probe_in_seconds": retry_in,
+                "times_opened": self._times_opened,
+                "successes": self._successes,
+                "failures": self._failures,
+                "rejected": self._rejected
+            }
+
+
+class ProviderGuard:
+    """Wraps calls to one LLM provider with retries and a circuit breaker.
+    
+    Failed calls are retried with exponential backoff and full jitter, so
+    callers that failed together don't retry together. Only LLMProviderError
+    is retried; an open circuit fails fast without retrying. Every attempt,
+    retries included, waits for an in-flight slot from the provider's
+    adaptive concurrency limiter and then for a token from its rate limiter.
+    """
+    
+    def __init__(self, name: str, breaker: CircuitBreaker, concurrency: AdaptiveConcurrencyLimiter,
+                 rate_limiter: TokenBucket, max_attempts: int, base_delay: float, max_delay: float):
+        """Create a guard for a provider.
+        
+        Args:
+            name: Name of the provider
+            breaker: The provider's circuit breaker
+            concurrency: The provider's in-flight call limiter
+            rate_limiter: The provider's request rate limiter
+            max_attempts: Calls made before giving up, including the first
+            base_delay: Backoff cap in seconds before the first retry
+            max_delay: Upper bound on any backoff in seconds
+        """
+        self.name = name
+        self.breaker = breaker
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._exhausted = 0
+    
+    def backoff_delay(self, attempt: int) -> float:
+        """Return a jittered delay before retrying after the given (1-based) attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+    
+    def _before_retry(self, attempt: int, error: Exception) -> Optional[float]:
+        """Count a failed attempt and return the backoff before the next, or None to give up."""
+        with self._lock:
+            if attempt >= self.max_attempts:
+                self._exhausted += 1
+                return None
+            self._retries += 1
+        delay = self.backoff_delay(attempt)
+        logger.warning(f"{self.name} call failed ({str(error)}), retrying in {delay:.2f}s")
+        return delay
+    
+    def call(self, func: Callable[..., Any], *args: Any, control: Optional[JobControl] = None) -> Any:
+        """Call a provider function, retrying failures.
+        
+        Args:
+            func: The provider call
+            *args: Arguments for func
+            control: Optional cancellation handle; backoff stops at the job's deadline
+        
+        Returns:
+            Any: Whatever func returns
+        
+        Raises:
+            LLMProviderError: If every attempt failed or the circuit is open
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.acquire()
+            try:
+                self.concurrency.acquire(control)
+            except BaseException:
+                self.breaker.release()
+                raise
+            started: Optional[float] = None
+            try:
+                self.rate_limiter.acquire(control)
+                started = time.monotonic()
+                result = func(*args)
+            except LLMProviderError as e:
+                self.concurrency.release(failed=True)
+                self.breaker.record_failure()
+                delay = self._before_retry(attempt, e)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.concurrency.release()
+                self.breaker.release()
+                raise
+            else:
+                self.concurrency.release(latency=time.monotonic() - cast(float, started))
+                self.breaker.record_success()
+                return result
+            if control:
+                control.sleep(delay)
+            else:
+                time.sleep(delay)
+    
+    async def call_async(self, func: Callable[..., Any], *args: Any, control: Optional[JobControl] = None) -> Any:
+        """Asyncio version of call, for coroutine provider functions."""
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.acquire()
+            try:
+                await self.concurrency.acquire_async(control)
+            except BaseException:
+                self.breaker.release()
+                raise
+            started: Optional[float] = None
+            try:
+                await self.rate_limiter.acquire_async(control)
+                started = time.monotonic()
+                result = await func(*args)
+            except LLMProviderError as e:
+                self.concurrency.release(failed=True)
+                self.breaker.record_failure()
+                delay = self._before_retry(attempt, e)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.concurrency.release()
+                self.breaker.release()
+                raise
+            else:
+                self.concurrency.release(latency=time.monotonic() - cast(float, started))
+                self.breaker.record_success()
+                return result
+            remaining = control.remaining() if control else None
+            await asyncio.sleep(delay if remaining is None else max(0.0, min(delay, remaining)))
+            if control:
+                control.check()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return retry counters and the breaker's state.
+        
+        Returns:
+            Dict[str, Any]: Breaker stats plus retries made and calls given up on
+        """
+        with self._lock:
+            retries, exhausted = self._retries, self._exhausted
+        return {**self.breaker.stats(), "retries": retries, "gave_up": exhausted}
+
+
+def _create_provider_guard(name: str) -> ProviderGuard:
+    """Build a provider guard using the configured retry, breaker and rate limit settings."""
+    rate = float(os.environ.get(f"LLM_RATE_LIMIT_PER_SECOND_{name.upper()}", LLM_RATE_LIMIT_PER_SECOND))
+    return ProviderGuard(
+        name,
+        CircuitBreaker(name, failure_threshold=LLM_BREAKER_FAILURE_THRESHOLD, reset_timeout=LLM_BREAKER_RESET_SECONDS),
+        AdaptiveConcurrencyLimiter(
+            name,
+            initial_limit=LLM_CONCURRENCY_INITIAL,
+            min_limit=LLM_CONCURRENCY_MIN,
+            max_limit=LLM_CONCURRENCY_MAX,
+            latency_tolerance=ADAPTIVE_LATENCY_TOLERANCE,
+            decrease_factor=ADAPTIVE_DECREASE_FACTOR
+        ),
+        TokenBucket(name, rate=rate, burst=LLM_RATE_LIMIT_BURST),
+        max_attempts=LLM_RETRY_MAX_ATTEMPTS,
+        base_delay=LLM_RETRY_BASE_DELAY_MS / 1000,
+        max_delay=LLM_RETRY_MAX_DELAY_MS / 1000
+    )
+
+
+provider_guards: Dict[str, ProviderGuard] = {name: _create_provider_guard(name) for name in ("openai", "anthropic")}
+
+
+def provider_guard(provider: str) -> ProviderGuard:
+    """Return the guard for a provider, creating one for providers not seen before."""
+    guard = provider_guards.get(provider)
+    if guard is None:
+        guard = provider_guards.setdefault(provider, _create_provider_guard(provider))
+    return guard
+
+
+class HedgingPolicy:
+    """Decides when a slow categorization is raced against another provider.
+    
+    A call is hedged once it has run longer than its provider's recent
+    latency percentile. Hedges are paid for from a budget that earns
+    max_hedge_rate of a hedge per categorization, up to burst hedges, so
+    hedging adds at most that fraction of extra provider calls.
+    """
+    
+    def __init__(self, percentile: float, min_samples: int, default_delay: float, max_hedge_rate: float,
+                 burst: float = 10.0, sample_size: int = 500):
+        """Create a hedging policy with an empty budget.
+        
+        Args:
+            percentile: Latency percentile after which a call is hedged
+            min_samples: Samples needed before a provider's percentile is used
+            default_delay: Hedge delay in seconds for providers without enough samples
+            max_hedge_rate: Hedges earned per categorization
+            burst: Most hedges that can be saved up
+            sample_size: Number of recent latency samples kept per provider
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.max_hedge_rate = max_hedge_rate
+        self.burst = burst
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {}
+        self._budget = 0.0
+        self._calls = 0
+        self._hedges = 0
+        self._denied = 0
+        self._wins = {"primary": 0, "hedge": 0}
+    
+    def record_latency(self, provider: str, seconds: float) -> None:
+        """Record how long a successful call to a provider took."""
+        with self._lock:
+            self._latencies.setdefault(provider, deque(maxlen=self.sample_size)).append(seconds)
+    
+    def hedge_delay(self, provider: str) -> float:
+        """Return how long to wait on a provider before hedging."""
+        with self._lock:
+            samples = list(self._latencies.get(provider, ()))
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        return cast(float, percentile(samples, self.percentile))
+    
+    def note_call(self) -> None:
+        """Count a categorization, earning a fraction of a hedge."""
+        with self._lock:
+            self._calls += 1
+            self._budget = min(self.burst, self._budget + self.max_hedge_rate)
+    
+    def try_hedge(self) -> bool:
+        """Spend a hedge from the budget if one is available."""
+        with self._lock:
+            if self._budget < 1:
+                self._denied += 1
+                return False
+            self._budget -= 1
+            self._hedges += 1
+            return True
+    
+    def record_winner(self, winner: str) -> None:
+        """Record whether the primary or the hedge answered a hedged call first."""
+        with self._lock:
+            self._wins[winner] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hedge counts and the current per-provider hedge delays.
+        
+        Returns:
+            Dict[str, Any]: Calls, hedges sent and denied, winners and delays
+        """
+        with self._lock:
+            calls, hedges, denied, wins, budget = self._calls, self._hedges, self._denied, dict(self._wins), self._budget
+            providers = list(self._latencies)
+        return {
+            "enabled": LLM_HEDGING_ENABLED,
+            "calls": calls,
+            "hedges_sent": hedges,
+            "hedges_denied": denied,
+            "hedge_rate": round(hedges / calls, 3) if calls else None,
+            "max_hedge_rate": self.max_hedge_rate,
+            "budget": round(budget, 2),
+            "primary_wins": wins["primary"],
+            "hedge_wins": wins["hedge"],
+            "hedge_delay_seconds": {provider: round(self.hedge_delay(provider), 3) for provider in providers}
+        }
+
+
+hedging_policy = HedgingPolicy(
+    percentile=LLM_HEDGE_PERCENTILE,
+    min_samples=LLM_HEDGE_MIN_SAMPLES,
+    default_delay=LLM_HEDGE_DEFAULT_DELAY_MS / 1000,
+    max_hedge_rate=LLM_HEDGE_MAX_RATE
+)
+
+# Provider a slow call is hedged against
+HEDGE_ALTERNATES = {"openai": "anthropic", "anthropic": "openai"}
+
+
+def _default_categories() -> TranscriptionCategories:
+    """Return the fallback categorization used for empty transcriptions."""
+    return cast(TranscriptionCategories, {
+        "categories": ["General"],
+        "sentiment": "neutral",
+        "confidence": 0.5
+    })
+
+
+def _fallback_categories(error: Exception) -> TranscriptionCategories:
+    """Return the categorization used when the provider can't be reached. It is never cached."""
+    return cast(TranscriptionCategories, {
+        **_default_categories(),
+        "error": f"Categorization unavailable: {str(error)}"
+    })
+
+
+def _categorization_cache_key(transcription_string: str) -> str:
+    """Build the categorization cache key for a transcription.
+    
+    Using first 100 chars of transcription for the cache key is usually sufficient
+    and keeps the cache keys to a reasonable size
+    """
+    return transcription_string[:100].strip().lower()
+
+
+def _get_cached_categorization(cache_key: str) -> Optional[TranscriptionCategories]:
+    """Return a cached categorization if one exists and hasn't expired."""
+    if cache_key in llm_categorization_cache and llm_categorization_cache[cache_key]['expires_at'] > datetime.now():
+        logger.info("Cache hit for transcription categorization")
+        return llm_categorization_cache[cache_key]['result']
+    return None
+
+
+def _cache_categorization(cache_key: str, result: TranscriptionCategories) -> None:
+    """Cache a categorization result for 24 hours."""
+    llm_categorization_cache[cache_key] = {
+        'result': result,
+        'expires_at': datetime.now() + timedelta(hours=24)
+    }
+
+
+def categorize_with_provider(transcription_string: str, model_provider: str,
+                             control: Optional[JobControl] = None) -> TranscriptionCategories:
+    """Categorize transcription text with an already-resolved LLM provider.
+    
+    Args:
+        transcription_string: The text to categorize
+        model_provider: The LLM provider to use
+        control: Optional cancellation handle, checked before the billable LLM call
+    
+    Returns:
+        TranscriptionCategories: The categorization results
+    """
+    if not transcription_string:
+        return _default_categories()
+    
+    cache_key = _categorization_cache_key(transcription_string)
+    cached = _get_cached_categorization(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Make LLM API call - we'll mock this for now
+    if control:
+        control.check()
+    logger.info(f"Using {model_provider} to categorize transcription")
+    try:
+        result = provider_guard(model_provider).call(
+            mock_llm_categorization, transcription_string, model_provider, control=control
+        )
+    except LLMProviderError as e:
+        logger.error(f"Categorization with {model_provider} failed: {str(e)}")
+        return _fallback_categories(e)
+    
+    _cache_categorization(cache_key, result)
+    return result
+
+
+async def categorize_with_provider_async(transcription_string: str, model_provider: str,
+                                         control: Optional[JobControl] = None) -> TranscriptionCategories:
+    """Asyncio version of categorize_with_provider.
+    
+    Args:
+        transcription_string: The text to categorize
+        model_provider: The LLM provider to use
+        control: Optional cancellation handle, checked before the billable LLM call
+    
+    Returns:
+        TranscriptionCategories: The categorization results
+    """
+    if not transcription_string:
+        return _default_categories()
+    
+    cache_key = _categorization_cache_key(transcription_string)
+    cached = _get_cached_categorization(cache_key)
+    if cached is not None:
+        return cached
+    
+    if control:
+        control.check()
+    logger.info(f"Using {model_provider} to categorize transcription")
+    try:
+        result = await _hedged_categorization(transcription_string, model_provider, control)
+    except LLMProviderError as e:
+        logger.error(f"Categorization with {model_provider} failed: {str(e)}")
+        return _fallback_categories(e)
+    
+    _cache_categorization(cache_key, result)
+    return result
+
+
+async def _call_provider_async(text: str, provider: str, control: Optional[JobControl]) -> TranscriptionCategories:
+    """Make one guarded categorization call to a provider and record its latency."""
+    started = time.monotonic()
+    if LLM_BATCHING_ENABLED:
+        # The batcher guards the batched call itself
+        result = await llm_batcher.categorize(text, provider)
+    else:
+        result = await provider_guard(provider).call_async(mock_llm_categorization_async, text, provider, control=control)
+    hedging_policy.record_latency(provider, time.monotonic() - started)
+    return result
+
+
+async def _hedged_categorization(text: str, provider: str, control: Optional[JobControl]) -> TranscriptionCategories:
+    """Categorize with a provider, racing the alternate provider if the call runs slow.
+    
+    If the primary call is still running after the provider's hedge delay
+    and the hedge budget allows, the same text is sent to the alternate
+    provider. The first successful result wins and the other call is
+    cancelled; both results come out of _parse_llm_response in the same
+    format.
+    
+    Args:
+        text: The text to categorize
+        provider: The primary LLM provider
+        control: Optional cancellation handle
+    
+    Returns:
+        TranscriptionCategories: The categorization results
+    
+    Raises:
+        LLMProviderError: If every call that was made failed
+    """
+    alternate = HEDGE_ALTERNATES.get(provider)
+    if not LLM_HEDGING_ENABLED or alternate is None:
+        return await _call_provider_async(text, provider, control)
+    
+    hedging_policy.note_call()
+    primary = asyncio.ensure_future(_call_provider_async(text, provider, control))
+    hedge: Optional["asyncio.Future[TranscriptionCategories]"] = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedging_policy.hedge_delay(provider))
+        if done or not hedging_policy.try_hedge():
+            return await primary
+        logger.info(f"{provider} is slow, hedging categorization with {alternate}")
+        hedge = asyncio.ensure_future(_call_provider_async(text, alternate, control))
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    hedging_policy.record_winner("hedge" if task is hedge else "primary")
+                    return task.result()
+        # Both calls failed; report the primary's error
+        return primary.result()
+    finally:
+        for task in (primary, hedge):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+def _simulate_provider_failure(provider: str) -> None:
+    """Fail a mock provider call LLM_MOCK_FAILURE_RATE of the time.
+    
+    Raises:
+        LLMProviderError: When the simulated call fails
+    """
+    if random.random() < LLM_MOCK_FAILURE_RATE:
+        raise LLMProviderError(f"{provider} request failed")
+
+
+def mock_llm_categorization(text: str, provider: str) -> TranscriptionCategories:
+    """Mock function to simulate LLM categorization with different providers.
+    
+    Args:
+        text: The text to categorize
+        provider: The LLM provider to simulate (e.g., 'openai', 'anthropic')
+        
+    Returns:
+        TranscriptionCategories: The categorization results
+    """
+    # Simulate processing time (would be API call in production)
+    time.sleep(LLM_MOCK_LATENCY_SECONDS)
+    _simulate_provider_failure(provider)
+    return _parse_llm_response(text, provider)
 
 
-def process_transcription(job_id: str, audio_data: Optional[bytes] = None) -> Optional[str]:
-    """Mock function to simulate async transcription processing.
+async def mock_llm_categorization_async(text: str, provider: str) -> TranscriptionCategories:
+    """Asyncio version of mock_llm_categorization.
     
     Args:
-        job_id: The ID of the job to process
-        audio_data: Optional audio data bytes
-    
+        text: The text to categorize
+        provider: The LLM provider to simulate (e.g., 'openai', 'anthropic')
+        
     Returns:
-        Optional[str]: The transcription text if successful, None if failed
+        TranscriptionCategories: The categorization results
     """
-    try:
-        logger.info(f"Starting processing for job {job_id}")
-        # Update job status to processing
-        job_queue[job_id]["status"] = JobStatus.PROCESSING
-        job_queue[job_id]["progress"] = 10
-        job_queue[job_id]["updated_at"] = datetime.now().isoformat()
-        logger.info(f"Job {job_id} status updated to: {job_queue[job_id]['status']}, progress: {job_queue[job_id]['progress']}%")
-        
-        # Simulate different processing stages - shorter times for testing
-        processing_steps = 3
-        for step in range(processing_steps):
-            # Simulate work - shorter times for testing (1-2 seconds per step)
-            time.sleep(random.randint(1, 2))
-            # Update progress (from 10% to 90%)
-            progress = 10 + int((step + 1) * (80 / processing_steps))
-            job_queue[job_id]["progress"] = progress
-            job_queue[job_id]["updated_at"] = datetime.now().isoformat()
-            print(f"Job {job_id} progress updated to: {progress}%")
-        
-        # Generate random transcription
-        transcription = random.choice([
-            "I've always been fascinated by cars, especially classic muscle cars from the 60s and 70s. The raw power and beautiful design of those vehicles is just incredible.",
-            "Bald eagles are such majestic creatures. I love watching them soar through the sky and dive down to catch fish. Their white heads against the blue sky is a sight I'll never forget.",
-            "Deep sea diving opens up a whole new world of exploration. The mysterious creatures and stunning coral reefs you encounter at those depths are unlike anything else on Earth."
-        ])
-        
-        # Add optional processing step for categorization
-        print(f"Categorizing transcription for job {job_id}")
-        categories = categorize_transcription(transcription)
-        
-        # Update job with completed status and result
-        job_queue[job_id]["status"] = JobStatus.COMPLETED
-        job_queue[job_id]["progress"] = 100
-        job_queue[job_id]["result"] = transcription
-        job_queue[job_id]["categories"] = categories
-        job_queue[job_id]["completed_at"] = datetime.now().isoformat()
-        job_queue[job_id]["updated_at"] = datetime.now().isoformat()
-        print(f"Job {job_id} completed with result: {transcription[:30]}...")
-        print(f"Categories: {categories}")
-        
-        return transcription
-    except Exception as e:
-        # Handle errors by updating job status
-        if job_id in job_queue:
-            job_queue[job_id]["status"] = JobStatus.FAILED
-            job_queue[job_id]["error"] = str(e)
-            job_queue[job_id]["updated_at"] = datetime.now().isoformat()
-            print(f"Job {job_id} failed with error: {str(e)}")
-        return None
+    # Simulate the provider round trip without blocking the event loop
+    await asyncio.sleep(LLM_MOCK_LATENCY_SECONDS)
+    _simulate_provider_failure(provider)
+    return _parse_llm_response(text, provider)
 
 
-def categorize_transcription(transcription_string: str, user_id: Optional[str] = None) -> TranscriptionCategories:
-    """Categorize transcription text using the user's preferred LLM model.
+async def mock_llm_batch_categorization_async(texts: List[str], provider: str) -> List[TranscriptionCategories]:
+    """Mock a single batched provider request that categorizes several texts.
     
     Args:
-        transcription_string: The text to categorize
-        user_id: Optional user ID to get model preferences
-    
+        texts: The texts to categorize, in order
+        provider: The LLM provider to simulate (e.g., 'openai', 'anthropic')
+        
     Returns:
-        TranscriptionCategories: The categorization results
+        List[TranscriptionCategories]: One categorization per text, in the same order
     """
-    if not transcription_string:
-        return cast(TranscriptionCategories, {
-            "categories": ["General"],
-            "sentiment": "neutral",
-            "confidence": 0.5
-        })
+    # One round trip for the whole batch, plus a little per-item generation time
+    await asyncio.sleep(LLM_MOCK_LATENCY_SECONDS + LLM_MOCK_BATCH_ITEM_SECONDS * len(texts))
+    _simulate_provider_failure(provider)
+    return [_parse_llm_response(text, provider) for text in texts]
+
+
+class CategorizationBatcher:
+    """Collects concurrent categorization requests into batched provider calls.
+    
+    Requests for the same provider are held for up to max_wait_seconds or
+    until max_batch_size are waiting, then sent as one request and the
+    results fanned back out to each caller. Runs on the async bridge's
+    event loop; requests cancelled before their batch is sent are dropped.
+    """
+    
+    def __init__(self, max_batch_size: int, max_wait_seconds: float):
+        """Create an empty batcher.
         
-    # Log user ID if provided
-    if user_id:
-        logger.info(f"Categorizing transcription for user {user_id}")
+        Args:
+            max_batch_size: Send a batch as soon as this many requests are waiting
+            max_wait_seconds: Longest a request waits for its batch to fill
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: Dict[str, List[Tuple[str, "asyncio.Future[TranscriptionCategories]"]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._batches = 0
+        self._items = 0
+        self._size_flushes = 0
+        self._timer_flushes = 0
     
-    # Generate a cache key based on the transcription content
-    # Using first 100 chars of transcription for the cache key is usually sufficient
-    # and keeps the cache keys to a reasonable size
-    cache_key = transcription_string[:100].strip().lower()
+    async def categorize(self, text: str, provider: str) -> TranscriptionCategories:
+        """Queue a text for the next batch to a provider and wait for its result.
+        
+        Args:
+            text: The text to categorize
+            provider: The LLM provider to use
+        
+        Returns:
+            TranscriptionCategories: The categorization results
+        """
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[TranscriptionCategories]" = loop.create_future()
+        pending = self._pending.setdefault(provider, [])
+        pending.append((text, future))
+        if len(pending) >= self.max_batch_size:
+            self._flush(provider, "size")
+        elif provider not in self._timers:
+            self._timers[provider] = loop.call_later(self.max_wait_seconds, self._flush, provider, "timer")
+        return await future
     
-    # Check if we have this result cached
-    if cache_key in llm_categorization_cache and llm_categorization_cache[cache_key]['expires_at'] > datetime.now():
-        logger.info("Cache hit for transcription categorization")
-        return llm_categorization_cache[cache_key]['result']
+    def _flush(self, provider: str, reason: str) -> None:
+        """Send everything waiting for a provider as one batch."""
+        timer = self._timers.pop(provider, None)
+        if timer is not None:
+            timer.cancel()
+        batch = [(text, future) for text, future in self._pending.pop(provider, []) if not future.done()]
+        if not batch:
+            return
+        self._batches += 1
+        self._items += len(batch)
+        if reason == "size":
+            self._size_flushes += 1
+        else:
+            self._timer_flushes += 1
+        logger.info(f"Sending batch of {len(batch)} categorizations to {provider} ({reason})")
+        asyncio.ensure_future(self._send(provider, batch))
     
-    # Get the user's preferred model
-    model_provider = "openai"  # Default model
-    if user_id:
+    async def _send(self, provider: str, batch: List[Tuple[str, "asyncio.Future[TranscriptionCategories]"]]) -> None:
+        """Make the batched provider call and resolve each caller's future."""
         try:
-            model_provider = get_user_model_from_db(user_id)
+            results = await provider_guard(provider).call_async(
+                mock_llm_batch_categorization_async, [text for text, _ in batch], provider
+            )
         except Exception as e:
-            logger.error(f"Error getting user model preference: {str(e)}")
-    
-    # Make LLM API call - we'll mock this for now
-    logger.info(f"Using {model_provider} to categorize transcription")
-    result = mock_llm_categorization(transcription_string, model_provider)
-    
-    # Cache the result for 24 hours
-    llm_categorization_cache[cache_key] = {
-        'result': result,
-        'expires_at': datetime.now() + timedelta(hours=24)
-    }
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
     
-    return result
+    def stats(self) -> Dict[str, Any]:
+        """Return batching counters.
+        
+        Returns:
+            Dict[str, Any]: Batch sizes, flush reasons and requests currently waiting
+        """
+        return {
+            "enabled": LLM_BATCHING_ENABLED,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait_seconds * 1000),
+            "batches_sent": self._batches,
+            "items_sent": self._items,
+            "average_batch_size": round(self._items / self._batches, 2) if self._batches else None,
+            "size_flushes": self._size_flushes,
+            "timer_flushes": self._timer_flushes,
+            "waiting": sum(len(pending) for pending in list(self._pending.values()))
+        }
 
 
-def mock_llm_categorization(text: str, provider: str) -> TranscriptionCategories:
-    """Mock function to simulate LLM categorization with different providers.
+# Batches categorizations made on the async path
+llm_batcher = CategorizationBatcher(
+    max_batch_size=LLM_BATCH_MAX_SIZE,
+    max_wait_seconds=LLM_BATCH_MAX_WAIT_MS / 1000
+)
+
+
+def _parse_llm_response(text: str, provider: str) -> TranscriptionCategories:
+    """Build and validate a mock provider response for the given text.
     
     Args:
         text: The text to categorize
@@ -215,9 +3957,6 @@ def mock_llm_categorization(text: str, provider: str) -> TranscriptionCategories
     Returns:
         TranscriptionCategories: The categorization results
     """
-    # Simulate processing time (would be API call in production)
-    time.sleep(1.5)
-    
     # Different mock behaviors based on provider
     try:
         if provider == "openai":
@@ -301,6 +4040,34 @@ def mock_llm_categorization(text: str, provider: str) -> TranscriptionCategories
         }
 
 
+def _get_cached_user_model(user_id: str) -> Optional[Literal["openai", "anthropic"]]:
+    """Return the cached model preference for a user if it hasn't expired."""
+    if user_id in user_model_cache and user_model_cache[user_id]['expires_at'] > datetime.now():
+        logger.info(f"Cache hit for user model preference: {user_id}")
+        return user_model_cache[user_id]['model']
+    return None
+
+
+def _cache_user_model(user_id: str, model: Literal["openai", "anthropic"]) -> None:
+    """Cache a user's model preference for 24 hours."""
+    user_model_cache[user_id] = {
+        'model': model,
+        'expires_at': datetime.now() + timedelta(hours=24)
+    }
+
+
+# Limit how hard cache misses hit the preference DB
+db_lookup_rate_limiter = TokenBucket("user_model_db", rate=DB_LOOKUP_RATE_LIMIT_PER_SECOND, burst=DB_LOOKUP_RATE_LIMIT_BURST)
+db_lookup_concurrency = AdaptiveConcurrencyLimiter(
+    "user_model_db",
+    initial_limit=DB_LOOKUP_CONCURRENCY_INITIAL,
+    min_limit=DB_LOOKUP_CONCURRENCY_MIN,
+    max_limit=DB_LOOKUP_CONCURRENCY_MAX,
+    latency_tolerance=ADAPTIVE_LATENCY_TOLERANCE,
+    decrease_factor=ADAPTIVE_DECREASE_FACTOR
+)
+
+
 def get_user_model_from_db(user_id: str) -> Literal["openai", "anthropic"]:
     """
     Mocks a slow and expensive function to simulate fetching a user's preferred LLM model from database
@@ -308,24 +4075,68 @@ def get_user_model_from_db(user_id: str) -> Literal["openai", "anthropic"]:
     With caching to avoid repeated calls.
     """
     # Check if we have a valid cached result
-    if user_id in user_model_cache and user_model_cache[user_id]['expires_at'] > datetime.now():
-        logger.info(f"Cache hit for user model preference: {user_id}")
-        return user_model_cache[user_id]['model']
+    cached = _get_cached_user_model(user_id)
+    if cached is not None:
+        return cached
     
     # Simulate slow database query
     logger.info(f"Cache miss for user model preference: {user_id}, fetching from DB...")
-    time.sleep(random.randint(2, 8))
-    model = random.choice(["openai", "anthropic"])
-    
-    # Cache the result for 24 hours
-    user_model_cache[user_id] = {
-        'model': model,
-        'expires_at': datetime.now() + timedelta(hours=24)
-    }
+    db_lookup_concurrency.acquire()
+    try:
+        db_lookup_rate_limiter.acquire()
+        started = time.monotonic()
+        time.sleep(random.randint(2, 8))
+        model = random.choice(["openai", "anthropic"])
+    except Exception:
+        db_lookup_concurrency.release(failed=True)
+        raise
+    db_lookup_concurrency.release(latency=time.monotonic() - started)
     
+    _cache_user_model(user_id, model)
     return model
 
 
+# In-flight async DB lookups keyed by user ID, only touched from the event loop
+_user_model_lookups: Dict[str, "asyncio.Future[Literal['openai', 'anthropic']]"] = {}
+
+
+async def get_user_model_from_db_async(user_id: str) -> Literal["openai", "anthropic"]:
+    """Asyncio version of get_user_model_from_db.
+    
+    Concurrent cache misses for the same user share a single DB query.
+    """
+    cached = _get_cached_user_model(user_id)
+    if cached is not None:
+        return cached
+    
+    if user_id not in _user_model_lookups:
+        _user_model_lookups[user_id] = asyncio.ensure_future(_query_user_model(user_id))
+    return await asyncio.shield(_user_model_lookups[user_id])
+
+
+async def _query_user_model(user_id: str) -> Literal["openai", "anthropic"]:
+    """Run the mock DB query for a user and cache the result."""
+    try:
+        logger.info(f"Cache miss for user model preference: {user_id}, fetching from DB...")
+        await db_lookup_concurrency.acquire_async()
+        try:
+            await db_lookup_rate_limiter.acquire_async()
+            started = time.monotonic()
+            await asyncio.sleep(random.randint(2, 8))
+            model = random.choice(["openai", "anthropic"])
+        except Exception:
+            db_lookup_concurrency.release(failed=True)
+            raise
+        except BaseException:
+            db_lookup_concurrency.release()
+            raise
+        db_lookup_concurrency.release(latency=time.monotonic() - started)
+        _cache_user_model(user_id, model)
+        return model
+    finally:
+        _user_model_lookups.pop(user_id, None)
+
+
 @app.route('/version', methods=['GET'])
 def get_version():
     """Return the current API version"""
@@ -354,6 +4165,47 @@ def get_cache_stats():
     return jsonify({
         "user_model_cache_entries": user_cache_size,
         "llm_categorization_cache_entries": llm_cache_size,
+        "audio_dedup": audio_dedup.stats(),
+        "version": VERSION
+    })
+
+@app.route('/workers/stats', methods=['GET'])
+@check_version_compatibility()
+def get_worker_stats():
+    """Return sizing and utilisation statistics for the pipeline stages and executors"""
+    return jsonify({
+        "stages": {stage.name: stage.stats() for stage in pipeline_stages},
+        "scheduler": job_scheduler.stats(),
+        "transcription_executor": TRANSCRIPTION_EXECUTOR,
+        "process_pool": process_transcription_backend.stats(),
+        "segmented_transcription": segmented_transcriber.stats(),
+        "categorization_execution": CATEGORIZATION_EXECUTION,
+        "async_loop": async_bridge.stats(),
+        "llm_batcher": llm_batcher.stats(),
+        "llm_providers": {name: guard.stats() for name, guard in list(provider_guards.items())},
+        "llm_hedging": hedging_policy.stats(),
+        "job_reaper": job_reaper.stats(),
+        "job_recovery": job_recovery.stats(),
+        "job_events": job_changes.stats(),
+        "rate_limiters": {
+            **{name: guard.rate_limiter.stats() for name, guard in list(provider_guards.items())},
+            "user_model_db": db_lookup_rate_limiter.stats()
+        },
+        "concurrency_limits": {
+            **{name: guard.concurrency.stats() for name, guard in list(provider_guards.items())},
+            "user_model_db": db_lookup_concurrency.stats()
+        },
+        "job_store": job_store.stats(),
+        "version": VERSION
+    })
+
+@app.route('/admission', methods=['GET'])
+@check_version_compatibility()
+def get_admission_state():
+    """Return whether /transcribe is currently accepting uploads and why"""
+    user_id = request.headers.get('X-User-ID')
+    return jsonify({
+        **admission_controller.state(user_id),
         "version": VERSION
     })
 
@@ -366,14 +4218,320 @@ def generate_user_id():
     
     return jsonify({"user_id": user_id, "version": VERSION})
 
-def start_transcription_job(job_id: str, audio_data=None):
-    """Start a new transcription job in a separate thread"""
-    thread = threading.Thread(
-        target=process_transcription,
-        args=(job_id, audio_data)
-    )
-    thread.daemon = True
-    thread.start()
+# Fair scheduler that orders jobs waiting for a transcription worker
+job_scheduler = FairJobScheduler(
+    maxsize=JOB_QUEUE_MAX_DEPTH,
+    class_weights={
+        PriorityClass.INTERACTIVE: INTERACTIVE_PRIORITY_WEIGHT,
+        PriorityClass.BULK: BULK_PRIORITY_WEIGHT
+    }
+)
+
+# Job pipeline: each stage has its own worker pool and bounded input queue.
+# The ingest stage pulls from the fair scheduler; later stages are FIFO.
+ingest_stage = WorkerPool(
+    name="ingest",
+    handler=process_transcription,
+    size=INGEST_WORKERS,
+    max_queue_depth=JOB_QUEUE_MAX_DEPTH,
+    task_queue=job_scheduler
+)
+transcribe_stage = WorkerPool(name="transcribe", handler=transcribe_job, size=WORKER_POOL_SIZE, max_queue_depth=STAGE_QUEUE_DEPTH)
+resolve_model_stage = WorkerPool(name="resolve_model", handler=resolve_model_job, size=RESOLVE_MODEL_WORKERS, max_queue_depth=STAGE_QUEUE_DEPTH)
+categorize_stage = WorkerPool(name="categorize", handler=categorize_job, size=CATEGORIZE_WORKERS, max_queue_depth=STAGE_QUEUE_DEPTH)
+finalize_stage = WorkerPool(name="finalize", handler=finalize_job, size=FINALIZE_WORKERS, max_queue_depth=STAGE_QUEUE_DEPTH)
+pipeline_stages = [ingest_stage, transcribe_stage, resolve_model_stage, categorize_stage, finalize_stage]
+
+# Admission control in front of the scheduler, sized by the transcribe bottleneck
+admission_controller = AdmissionController(
+    pool=transcribe_stage,
+    scheduler=job_scheduler,
+    max_queue_depth=ADMISSION_MAX_QUEUE_DEPTH,
+    max_estimated_wait=ADMISSION_MAX_ESTIMATED_WAIT,
+    max_user_backlog=ADMISSION_MAX_USER_BACKLOG,
+    default_job_seconds=ADMISSION_DEFAULT_JOB_SECONDS
+)
+
+def start_transcription_job(job_id: str, audio_path: Optional[str] = None, user_id: Optional[str] = None,
+                            priority: str = PriorityClass.INTERACTIVE):
+    """Queue a new transcription job on the pipeline's ingest stage.
+    
+    The user's provider lookup starts straight away so it overlaps
+    transcription.
+    
+    Raises:
+        queue.Full: If the scheduler is at capacity
+    """
+    model_lookup = start_user_model_lookup(user_id)
+    try:
+        ingest_stage.submit(job_id, audio_path, user_id, model_lookup, flow_key=user_id, priority=priority)
+    except queue.Full:
+        if model_lookup is not None:
+            model_lookup.cancel()
+        raise
+
+
+def dispatch_job(job_id: str, audio_hash: Optional[str], user_id: Optional[str] = None,
+                 priority: str = PriorityClass.INTERACTIVE) -> str:
+    """Send a new job's spooled audio for transcription, unless the same clip was already seen.
+    
+    A clip that has already been transcribed completes the job straight away
+    with the earlier result; a clip that is being transcribed right now makes
+    the job wait for that run instead of starting another.
+    
+    Args:
+        job_id: The ID of the new job
+        audio_hash: Content hash of the job's audio, or None to skip dedup
+        user_id: Optional ID of the user who submitted the job
+        priority: Scheduling priority class
+    
+    Returns:
+        str: "completed", "attached" or "queued"
+    
+    Raises:
+        queue.Full: If the job has to be queued and the scheduler is at capacity
+    """
+    outcome, existing = ("miss", None)
+    if AUDIO_DEDUP_ENABLED and audio_hash:
+        outcome, existing = audio_dedup.claim(audio_hash, job_id)
+    if outcome == "completed" and existing is not None:
+        logger.info(f"Job {job_id} reuses the result of job {existing['id']}")
+        complete_duplicate(job_id, existing)
+        return "completed"
+    if outcome == "in_flight" and existing is not None:
+        logger.info(f"Job {job_id} attached to in-flight job {existing['id']}")
+        update_job(job_id, duplicate_of=existing["id"])
+        # The leader may run past this job's own deadline, so stop waiting on it when that passes
+        control = job_controls.get(job_id)
+        if control is not None and control.deadline is not None:
+            audio_dedup.expire_at(job_id, control.deadline)
+        return "attached"
+    try:
+        start_transcription_job(job_id, _audio_spool_path(job_id), user_id=user_id, priority=priority)
+    except queue.Full:
+        if audio_hash:
+            audio_dedup.forget(audio_hash, job_id)
+        raise
+    return "queued"
+
+
+def complete_duplicate(job_id: str, source: TranscriptionJob) -> None:
+    """Complete a pending job with the result of another job that had the same audio.
+    
+    Args:
+        job_id: The ID of the duplicate job
+        source: The completed job whose result is reused
+    """
+    control = job_controls.get(job_id)
+    if control is None:
+        return
+    try:
+        with control.lock:
+            job = job_store.get(job_id)
+            if job is None or job["status"] != JobStatus.PENDING:
+                return
+            # A follower whose deadline passed while it waited fails like any other late job
+            control.check()
+            update_job(job_id, duplicate_of=source["id"])
+            job_store.complete(job_id, source["result"] or "", source.get("categories"))
+    except JobInterruptedError as e:
+        fail_job(job_id, control, e)
+        return
+    release_job(job_id)
+
+
+def expire_follower(job_id: str) -> None:
+    """Fail a job whose deadline passed while it was still following another job.
+    
+    Args:
+        job_id: The ID of the following job
+    """
+    control = job_controls.get(job_id)
+    if control is None or not audio_dedup.detach(job_id):
+        # Already settled by its leader, or cancelled
+        return
+    logger.info(f"Job {job_id} reached its deadline while following another job")
+    fail_job(job_id, control, JobTimeoutError("Timed out: job deadline passed while waiting on a duplicate upload"))
+
+
+def settle_followers(job_id: str) -> None:
+    """Finish the jobs that were waiting on a job that has just stopped running.
+    
+    If it completed they get its result. Otherwise each follower is
+    dispatched again on its own audio, so one user's cancellation or short
+    deadline doesn't fail another user's job.
+    
+    Args:
+        job_id: The ID of the job that stopped
+    """
+    followers = audio_dedup.take_followers(job_id)
+    if not followers:
+        return
+    job = job_store.get(job_id)
+    for follower_id in followers:
+        if job is not None and job["status"] == JobStatus.COMPLETED:
+            complete_duplicate(follower_id, job)
+            continue
+        follower = job_store.get(follower_id)
+        control = job_controls.get(follower_id)
+        if follower is None or control is None or follower["status"] != JobStatus.PENDING:
+            # Cancelled after it stopped following; nothing else will release it
+            release_job(follower_id)
+            continue
+        try:
+            update_job(follower_id, duplicate_of=None)
+            dispatch_job(follower_id, follower.get("audio_hash"), follower.get("user_id"),
+                         follower.get("priority") or PriorityClass.INTERACTIVE)
+        except Exception as e:
+            fail_job(follower_id, control, e)
+
+
+def resume_job(job: TranscriptionJob, control: JobControl) -> None:
+    """Re-queue a recovered job on the stage after its last checkpoint.
+    
+    Args:
+        job: The stored job to resume
+        control: A fresh cancellation and deadline handle for the job
+    
+    Raises:
+        RuntimeError: If the job has to be transcribed again but its audio is gone
+        queue.Full: If the job has to be re-scheduled and the scheduler is at capacity
+    """
+    job_id = job["id"]
+    user_id = job.get("user_id")
+    last_stage = job.get("last_stage")
+    if last_stage == "categorize":
+        pjob = PipelineJob(job_id, None, control, user_id)
+        pjob.transcription = job.get("result")
+        pjob.categories = job.get("categories")
+        hand_off(pjob, finalize_stage)
+    elif last_stage == "transcribe":
+        pjob = PipelineJob(job_id, None, control, user_id, start_user_model_lookup(user_id))
+        pjob.transcription = job.get("result")
+        hand_off(pjob, resolve_model_stage)
+    else:
+        if not os.path.exists(_audio_spool_path(job_id)):
+            raise RuntimeError("Audio was lost before the job could be transcribed")
+        update_job(job_id, duplicate_of=None)
+        dispatch_job(job_id, job.get("audio_hash"), user_id=user_id, priority=job.get("priority") or PriorityClass.INTERACTIVE)
+
+
+def recover_unfinished_jobs() -> int:
+    """Resume jobs whose owning process stopped while they were pending or processing.
+    
+    Jobs are taken over through the store's leases, so jobs a live process
+    is still running are left alone and no two processes resume the same
+    job. Each job keeps its original deadline. A job that has already been
+    resumed JOB_MAX_RECOVERY_ATTEMPTS times is failed instead, so a job that
+    crashes the server can't do so forever. Stores that don't survive a
+    restart have nothing to resume, so their leftover spooled audio is
+    deleted instead.
+    
+    Returns:
+        int: Number of jobs resumed
+    """
+    if not job_store.durable:
+        # Spooled audio from a previous run belongs to jobs that no longer exist
+        if os.path.isdir(AUDIO_SPOOL_DIR):
+            for name in os.listdir(AUDIO_SPOOL_DIR):
+                path = os.path.join(AUDIO_SPOOL_DIR, name)
+                try:
+                    if os.path.getmtime(path) < process_started_at.timestamp():
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return 0
+    resumed = 0
+    for job in job_store.claim_orphaned():
+        job_id = job["id"]
+        # Our own lease lapsed (e.g. renewals stalled) but the job is still running here
+        if job_id in job_controls:
+            continue
+        deadline_seconds = None
+        if job.get("deadline_at"):
+            deadline_seconds = (datetime.fromisoformat(job["deadline_at"]) - datetime.now()).total_seconds()
+        control = JobControl(job_id, deadline_seconds=deadline_seconds)
+        try:
+            if job["recovery_attempts"] > JOB_MAX_RECOVERY_ATTEMPTS:
+                raise RuntimeError(f"Job did not finish after {JOB_MAX_RECOVERY_ATTEMPTS} restarts")
+            control.check()
+            job_controls[job_id] = control
+            resume_job(job, control)
+            resumed += 1
+            logger.info(f"Resumed job {job_id} after stage: {job.get('last_stage') or 'none'}")
+        except Exception as e:
+            fail_job(job_id, control, e)
+    if resumed:
+        logger.info(f"Recovered {resumed} unfinished jobs")
+    return resumed
+
+
+class JobRecovery:
+    """Background thread that resumes jobs orphaned by a stopped process.
+    
+    Checks straight away, which picks up jobs left by a previous run of the
+    server, and then every interval seconds, which picks up jobs left by a
+    worker process that died while others sharing the store carry on.
+    """
+    
+    def __init__(self, interval: float):
+        """Create a recovery thread. Call start() to begin checking.
+        
+        Args:
+            interval: Seconds between checks for orphaned jobs
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._checks = 0
+        self._resumed = 0
+    
+    def start(self) -> None:
+        """Start the background recovery thread if it isn't running."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="job-recovery", daemon=True)
+            self._thread.start()
+    
+    def _run(self) -> None:
+        while True:
+            try:
+                resumed = recover_unfinished_jobs()
+                with self._lock:
+                    self._checks += 1
+                    self._resumed += resumed
+            except Exception as e:
+                logger.error(f"Job recovery failed: {str(e)}")
+            time.sleep(self.interval)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return how often recovery has run and what it resumed.
+        
+        Returns:
+            Dict[str, Any]: Check interval and counts
+        """
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "interval_seconds": self.interval,
+                "checks": self._checks,
+                "resumed": self._resumed
+            }
+
+
+job_recovery = JobRecovery(interval=JOB_LEASE_SECONDS)
+
+
+def start_background_tasks() -> None:
+    """Start the job reaper and job recovery in this process.
+    
+    Call once in every process that serves requests: the __main__ block
+    does for the development server, and wsgi.py for WSGI servers.
+    """
+    job_reaper.start()
+    job_recovery.start()
+
 
 @app.route('/transcribe', methods=['POST'])
 @check_version_compatibility()
@@ -392,96 +4550,422 @@ def transcribe_audio():
             return jsonify({"error": "No audio file provided", "version": VERSION}), 400
             
         audio_file = request.files['audio']
-        print(f"Received audio file: {audio_file.filename if audio_file.filename else 'unnamed'}")
         
-        # Initialize job in queue
-        job_queue[job_id] = {
-            "id": job_id,
-            "status": JobStatus.PENDING,
-            "progress": 0,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
-            "completed_at": None,
-            "result": None,
-            "error": None,
-            "user_id": user_id
-        }
+        # Priority class comes from a header or form field, interactive by default
+        priority = request.headers.get('X-Job-Priority') or request.form.get('priority') or PriorityClass.INTERACTIVE
+        if priority not in (PriorityClass.INTERACTIVE, PriorityClass.BULK):
+            return jsonify({"error": f"Invalid priority: {priority}", "version": VERSION}), 400
+        
+        # Deadline in seconds from now, from a header or form field
+        deadline_value = request.headers.get('X-Job-Deadline') or request.form.get('deadline_seconds')
+        try:
+            deadline_seconds = float(deadline_value) if deadline_value else JOB_DEFAULT_DEADLINE_SECONDS
+        except ValueError:
+            return jsonify({"error": f"Invalid deadline: {deadline_value}", "version": VERSION}), 400
+        if not math.isfinite(deadline_seconds):
+            return jsonify({"error": f"Invalid deadline: {deadline_value}", "version": VERSION}), 400
+        if deadline_seconds <= 0:
+            return jsonify({"error": "Deadline must be positive", "version": VERSION}), 400
+        deadline_seconds = min(deadline_seconds, JOB_MAX_DEADLINE_SECONDS)
         
-        logger.info(f"Job {job_id} initialized with status: {JobStatus.PENDING}")
-        print(f"Current job queue has {len(job_queue)} jobs")
+        # Shed load before spooling the upload
+        decision = admission_controller.check(user_id)
+        if not decision["admitted"]:
+            logger.warning(f"Rejected upload from user {user_id or 'unknown'}: {decision['reason']}")
+            return jsonify({
+                "error": decision["reason"],
+                "retry_after": decision["retry_after"],
+                "version": VERSION
+            }), decision["status_code"], {"Retry-After": str(decision["retry_after"])}
+        print(f"Received audio file: {audio_file.filename if audio_file.filename else 'unnamed'}")
         
-        # Read audio data
-        audio_data = audio_file.read()
-        print(f"Read {len(audio_data)} bytes of audio data")
+        # Stream the audio to the spool in chunks rather than reading it into memory
+        audio_size, audio_hash = spool_job_audio(job_id, audio_file.stream)
+        print(f"Spooled {audio_size} bytes of audio data")
         
-        # Start processing in background
-        start_transcription_job(job_id, audio_data)
-        print(f"Started background processing for job {job_id}")
+        try:
+            # Initialize job in queue
+            job_store.create({
+                "id": job_id,
+                "status": JobStatus.PENDING,
+                "progress": 0,
+                "created_at": datetime.now().isoformat(),
+                "updated_at": datetime.now().isoformat(),
+                "completed_at": None,
+                "result": None,
+                "error": None,
+                "failure_reason": None,
+                "deadline_at": (datetime.now() + timedelta(seconds=deadline_seconds)).isoformat(),
+                "user_id": user_id,
+                "priority": priority,
+                "last_stage": None,
+                "recovery_attempts": 0,
+                "audio_hash": audio_hash,
+                "duplicate_of": None,
+                "segments": None
+            })
+            job_controls[job_id] = JobControl(job_id, deadline_seconds=deadline_seconds)
+            # Keep the caps hard between reaper sweeps
+            if job_store.over_caps(JOB_RETENTION_MAX_JOBS, JOB_RETENTION_MAX_BYTES):
+                job_reaper.enforce_caps()
+            
+            logger.info(f"Job {job_id} initialized with status: {JobStatus.PENDING}")
+            print(f"Current job store has {job_store.count()} jobs")
+            
+            # Start processing in background
+            try:
+                outcome = dispatch_job(job_id, audio_hash, user_id=user_id, priority=priority)
+            except queue.Full:
+                job_store.delete(job_id)
+                release_job(job_id)
+                logger.warning(f"Rejected job {job_id}: transcription queue is full")
+                retry_after = max(1, math.ceil(admission_controller.state()["estimated_wait_seconds"]))
+                return jsonify({
+                    "error": "Server is busy, please try again later",
+                    "retry_after": retry_after,
+                    "version": VERSION
+                }), 503, {"Retry-After": str(retry_after)}
+        except Exception:
+            # The job never got going, so nothing else will remove its audio or its half-made record
+            job_controls.pop(job_id, None)
+            discard_job_audio(job_id)
+            try:
+                job_store.delete(job_id)
+            except Exception as e:
+                logger.error(f"Failed to remove job {job_id} after a failed upload: {str(e)}")
+            raise
+        print(f"Job {job_id} dispatched: {outcome}")
         
         # Return job ID immediately
+        job = job_store.get(job_id)
         return jsonify({
             "job_id": job_id,
-            "status": JobStatus.PENDING,
+            "status": job["status"] if job else JobStatus.PENDING,
+            "duplicate_of": job.get("duplicate_of") if job else None,
             "version": VERSION
         })
+    except (RequestEntityTooLarge, UploadTooLargeError):
+        return jsonify({"error": f"Audio file is too large (max {UPLOAD_MAX_BYTES} bytes)", "version": VERSION}), 413
     except Exception as e:
         print(f"Error in transcribe_audio: {str(e)}")
         return jsonify({"error": f"Server error: {str(e)}", "version": VERSION}), 500
 
+def job_view(job: TranscriptionJob, cursor: int = 0) -> Dict[str, Any]:
+    """Return a job as clients see it, with its transcript so far.
+    
+    Args:
+        job: The job to show
+        cursor: Segments the client already has; only later ones are included
+    
+    Returns:
+        Dict[str, Any]: The job plus partial_result and segment_cursor
+    """
+    segments = job.get("segments") or []
+    return {
+        **job,
+        "segments": segments[cursor:],
+        "segment_cursor": len(segments),
+        "partial_result": job["result"] if job["result"] is not None else " ".join(segments)
+    }
+
+
+def job_etag(job: TranscriptionJob, cursor: int = 0) -> str:
+    """Return the strong entity tag for a job as returned by GET /job/<job_id>.
+    
+    Every write to a job increments its revision, so the revision (with the
+    segment cursor and API version, which also shape the body) identifies
+    the representation exactly.
+    """
+    return f"{job['id']}-{job['revision']}-{cursor}-{VERSION}"
+
+
+def not_modified(etag: str) -> Response:
+    """Return a 304 Not Modified response for a resource that still matches etag."""
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def wait_for_job_change(job_id: str, since: Optional[int], timeout: float) -> Optional[TranscriptionJob]:
+    """Block until a job moves past a revision, then return it.
+    
+    The caller parks on an event that the job's next write sets, so no
+    thread polls the store while it waits.
+    
+    Args:
+        job_id: The ID of the job to watch
+        since: The revision the caller last saw; None waits for the next change
+        timeout: Longest time to wait in seconds
+    
+    Returns:
+        Optional[TranscriptionJob]: The job, once changed, finished or timed out;
+        None if it doesn't exist
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        changed = job_changes.watch(job_id)
+        try:
+            job = job_store.get(job_id)
+            # Finished jobs won't change again, so there is nothing to wait for
+            if job is None or job["status"] in FINISHED_STATUSES:
+                return job
+            if since is None:
+                since = job["revision"]
+            elif job["revision"] != since:
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not changed.wait(remaining):
+                return job
+        finally:
+            job_changes.unwatch(job_id, changed)
+
+
 @app.route('/job/<job_id>', methods=['GET'])
 @check_version_compatibility()
 def get_job_status(job_id: str) -> Union[Response, Tuple[Response, int]]:
     """Get the status of a specific transcription job.
     
+    While a job is processing, partial_result holds the transcript so far
+    and segment_cursor counts the segments it was built from. Passing that
+    cursor back as ?cursor= returns only the segments added since.
+    
+    For long polling, ?wait= holds the request for up to that many seconds
+    (capped at JOB_LONG_POLL_MAX_SECONDS) until the job's revision differs
+    from ?since=, or until its next change if since is omitted.
+    
+    Responses carry a strong ETag. A request whose If-None-Match still
+    matches gets 304 Not Modified, and with ?wait= and no ?since= it
+    waits for a change from the revision it holds.
+    
     Args:
         job_id: The ID of the job to check
         
     Returns:
         Response with job status or error
     """
-    if job_id not in job_queue:
+    wait = min(max(0.0, request.args.get("wait", 0.0, type=float)), JOB_LONG_POLL_MAX_SECONDS)
+    cursor = max(0, request.args.get("cursor", 0, type=int))
+    since = request.args.get("since", type=int)
+    job = job_store.get(job_id)
+    if job is not None and since is None and request.if_none_match:
+        # A revalidating client has seen the current revision only if its tag matches; -1 never does
+        since = job["revision"] if request.if_none_match.contains_weak(job_etag(job, cursor)) else -1
+    if job is not None and wait > 0:
+        job = wait_for_job_change(job_id, since, wait)
+    if job is None:
         return jsonify({
             "error": "Job not found",
             "version": VERSION
         }), 404
     
-    job = job_queue[job_id]
+    etag = job_etag(job, cursor)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
     
     # Return job status and details
+    response = jsonify({
+        **job_view(job, cursor=cursor),
+        "version": VERSION
+    })
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route('/job/<job_id>', methods=['DELETE'])
+@check_version_compatibility()
+def delete_job(job_id: str) -> Union[Response, Tuple[Response, int]]:
+    """Cancel a pending or processing transcription job.
+    
+    Args:
+        job_id: The ID of the job to cancel
+        
+    Returns:
+        Response with the cancelled job or error
+    """
+    outcome = cancel_job(job_id, request.headers.get('X-User-ID'))
+    if outcome == "forbidden":
+        return jsonify({"error": "Job belongs to another user", "version": VERSION}), 403
+    # The reaper or another request may remove the job at any point
+    job = job_store.get(job_id)
+    if outcome == "not_found" or job is None:
+        return jsonify({"error": "Job not found", "version": VERSION}), 404
+    if outcome == "not_cancellable":
+        return jsonify({
+            "error": f"Job is already {job['status']}",
+            "version": VERSION
+        }), 409
+    
     return jsonify({
         **job,
         "version": VERSION
     })
 
+@app.route('/jobs/cancel', methods=['POST'])
+@check_version_compatibility()
+def cancel_jobs() -> Union[Response, Tuple[Response, int]]:
+    """Cancel several jobs at once.
+    
+    The JSON body may list "job_ids"; without it every pending or processing
+    job belonging to the requesting user is cancelled.
+    
+    Returns:
+        Response with the cancelled job IDs and the reasons others were skipped
+    """
+    user_id = request.headers.get('X-User-ID')
+    body = request.get_json(silent=True) or {}
+    job_ids = body.get("job_ids")
+    if job_ids is None:
+        if not user_id:
+            return jsonify({"error": "job_ids or X-User-ID header required", "version": VERSION}), 400
+        job_ids = [job["id"] for job in job_store.list(user_id=user_id, statuses=(JobStatus.PENDING, JobStatus.PROCESSING))]
+    elif not isinstance(job_ids, list) or not all(isinstance(job_id, str) for job_id in job_ids):
+        return jsonify({"error": "job_ids must be a list of strings", "version": VERSION}), 400
+    
+    cancelled: List[str] = []
+    skipped: Dict[str, str] = {}
+    for job_id in job_ids:
+        outcome = cancel_job(job_id, user_id)
+        if outcome == "cancelled":
+            cancelled.append(job_id)
+        else:
+            skipped[job_id] = outcome
+    logger.info(f"Bulk cancel for user {user_id or 'unknown'}: {len(cancelled)} cancelled, {len(skipped)} skipped")
+    
+    return jsonify({
+        "cancelled": cancelled,
+        "skipped": skipped,
+        "version": VERSION
+    })
+
 @app.route('/jobs', methods=['GET'])
 @check_version_compatibility()
 def get_all_jobs() -> Union[Response, Tuple[Response, int]]:
     """Get status of all transcription jobs.
     
+    The response's strong ETag is the store's change token, which moves on
+    every write to any job by any process sharing the store, so a client
+    whose If-None-Match still matches gets 304 Not Modified without the
+    jobs being read.
+    
     Returns:
         Response with all jobs or error
     """
     try:
+        # Read the position before listing, so the tag can only be older than the list it goes out with
+        etag = f"jobs-{job_store.change_token()}-{VERSION}"
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        
         # Log the current job queue state
-        logger.info(f"Getting all jobs. Current job queue has {len(job_queue)} jobs")
-        for job_id, job in job_queue.items():
-            logger.info(f"Job {job_id}: status={job['status']}, progress={job['progress']}")
+        jobs_list = job_store.list()
+        logger.info(f"Getting all jobs. Current job store has {len(jobs_list)} jobs")
+        for job in jobs_list:
+            logger.info(f"Job {job['id']}: status={job['status']}, progress={job['progress']}")
         
         # Return list of all jobs (could be paginated in a real app)
-        jobs_list = list(job_queue.values())
         print(f"Returning {len(jobs_list)} jobs to client")
         
-        return jsonify({
+        response = jsonify({
             "jobs": jobs_list,
             "version": VERSION
         })
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     except Exception as e:
         print(f"Error in get_all_jobs: {str(e)}")
         return jsonify({"error": f"Server error: {str(e)}", "version": VERSION}), 500
 
 
+def job_event_stream(user_id: str, last_sequence: Optional[int]) -> Iterator[str]:
+    """Yield Server-Sent Events for changes to a user's jobs.
+    
+    A "snapshot" event lists all of the user's jobs, then each "job" event
+    carries one changed job and each "removed" event the ID of a job that
+    no longer exists. Event IDs are the store's change epoch and sequence
+    number, which every process sharing the store agrees on, so a client
+    reconnecting with Last-Event-ID (to any worker) only gets what it
+    missed, or a fresh snapshot if the backlog no longer reaches back that
+    far or the store has restarted its sequence.
+    
+    Args:
+        user_id: Only jobs of this user are sent
+        last_sequence: The last event ID the client saw, if reconnecting
+    """
+    def event(name: str, data: Any, sequence: int) -> str:
+        return f"id: {job_store.change_epoch}.{sequence}\nevent: {name}\ndata: {json.dumps(data)}\n\n"
+    
+    def snapshot() -> Tuple[int, str]:
+        # Read the sequence first, so changes made while listing are sent again rather than missed
+        sequence = job_changes.sequence
+        jobs = [job_view(job) for job in job_store.list(user_id=user_id)]
+        known.clear()
+        known.update(job["id"] for job in jobs)
+        return sequence, event("snapshot", {"jobs": jobs, "version": VERSION}, sequence)
+    
+    known: Set[str] = set()
+    yield "retry: 2000\n\n"
+    changed: Optional[List[str]] = None
+    if last_sequence is not None:
+        sequence, changed = job_changes.changes_since(last_sequence)
+    if changed is None:
+        sequence, payload = snapshot()
+        yield payload
+        changed = []
+    while True:
+        for job_id in changed:
+            job = job_store.get(job_id)
+            if job is not None and job["user_id"] == user_id:
+                known.add(job_id)
+                yield event("job", job_view(job), sequence)
+            elif job is None and job_id in known:
+                known.discard(job_id)
+                yield event("removed", {"id": job_id}, sequence)
+        latest = job_changes.wait(sequence, JOB_EVENTS_HEARTBEAT_SECONDS)
+        if latest == sequence:
+            # A comment line keeps proxies from timing out the idle connection
+            yield ": keep-alive\n\n"
+            changed = []
+            continue
+        sequence, changed = job_changes.changes_since(sequence)
+        if changed is None:
+            sequence, payload = snapshot()
+            yield payload
+            changed = []
+
+
+@app.route('/jobs/events', methods=['GET'])
+@check_version_compatibility()
+def stream_job_events() -> Union[Response, Tuple[Response, int]]:
+    """Stream status, progress and result changes for the caller's jobs as Server-Sent Events.
+    
+    Only jobs of the X-User-ID user are sent, so the header is required.
+    A reconnecting client sends Last-Event-ID to resume where it left off.
+    
+    Returns:
+        Streaming text/event-stream response, or error
+    """
+    user_id = request.headers.get('X-User-ID')
+    if not user_id:
+        return jsonify({"error": "X-User-ID header required", "version": VERSION}), 400
+    epoch, _, sequence = request.headers.get('Last-Event-ID', '').partition(".")
+    last_sequence = int(sequence) if epoch == job_store.change_epoch and sequence.isdigit() else None
+    logger.info(f"Opening job event stream (resuming after {last_sequence})")
+    return Response(
+        stream_with_context(job_event_stream(user_id, last_sequence)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 if __name__ == '__main__':
     print(f"Starting server with version: {VERSION}")
+    for stage in pipeline_stages:
+        stage.start()
+    # With the debug reloader only the child process serves requests, so only it runs background tasks
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_tasks()
     print("Registered routes:")
     for rule in app.url_map.iter_rules():
         print(f"  {rule.endpoint}: {rule}")
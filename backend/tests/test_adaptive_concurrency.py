@@ -0,0 +1,52 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import AdaptiveConcurrencyLimiter  # noqa: E402
+
+
+def make_limiter() -> AdaptiveConcurrencyLimiter:
+    return AdaptiveConcurrencyLimiter(
+        "test", initial_limit=4, min_limit=1, max_limit=16,
+        latency_tolerance=2.0, decrease_factor=0.7,
+    )
+
+
+class AdaptiveConcurrencyLimiterTest(unittest.TestCase):
+    def test_limit_holds_under_stationary_latency(self):
+        """Jitter like the mock DB's randint(2, 8) isn't congestion."""
+        limiter = make_limiter()
+        rng = random.Random(1234)
+        for _ in range(500):
+            limiter.acquire()
+            limiter.release(latency=rng.randint(2, 8))
+        stats = limiter.stats()
+        self.assertEqual(stats["decreases"], 0)
+        self.assertGreaterEqual(stats["limit"], 4)
+
+    def test_limit_drops_when_latency_grows_with_queueing(self):
+        limiter = make_limiter()
+        rng = random.Random(1234)
+        for _ in range(200):
+            limiter.acquire()
+            limiter.release(latency=rng.randint(2, 8))
+        before = limiter.stats()["limit"]
+        for _ in range(100):
+            limiter.acquire()
+            limiter.release(latency=rng.randint(2, 8) * 4)
+        stats = limiter.stats()
+        self.assertGreater(stats["decreases"], 0)
+        self.assertLess(stats["limit"], before)
+
+    def test_failure_cuts_limit(self):
+        limiter = make_limiter()
+        limiter.acquire()
+        limiter.release(failed=True)
+        self.assertLess(limiter.stats()["limit"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+import time
+import unittest
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app  # noqa: E402
+from app import JobControl, JobStatus  # noqa: E402
+
+
+def create_job(status: str, audio_hash: str, deadline_seconds: float) -> str:
+    job_id = str(uuid.uuid4())
+    now = datetime.now().isoformat()
+    app.job_store.create({
+        "id": job_id, "status": status, "progress": 0, "created_at": now, "updated_at": now,
+        "completed_at": None, "result": None, "error": None, "failure_reason": None, "deadline_at": None,
+        "categories": None, "user_id": None, "priority": "interactive", "last_stage": None,
+        "recovery_attempts": 0, "audio_hash": audio_hash, "duplicate_of": None, "segments": None
+    })
+    app.job_controls[job_id] = JobControl(job_id, deadline_seconds=deadline_seconds)
+    return job_id
+
+
+class FollowerDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.audio_hash = uuid.uuid4().hex
+        self.leader = create_job(JobStatus.PROCESSING, self.audio_hash, deadline_seconds=60)
+        self.assertEqual(app.audio_dedup.claim(self.audio_hash, self.leader)[0], "miss")
+
+    def test_follower_fails_at_its_own_deadline(self):
+        follower = create_job(JobStatus.PENDING, self.audio_hash, deadline_seconds=0.2)
+        self.assertEqual(app.dispatch_job(follower, self.audio_hash), "attached")
+        time.sleep(0.6)
+        job = app.job_store.get(follower)
+        self.assertEqual(job["status"], JobStatus.FAILED)
+        self.assertEqual(job["failure_reason"], "timeout")
+        self.assertNotIn(follower, app.job_controls)
+        self.assertEqual(app.job_store.get(self.leader)["status"], JobStatus.PROCESSING)
+
+    def test_settled_followers_leave_no_deadlines_or_threads(self):
+        threads_before = threading.active_count()
+        followers = [create_job(JobStatus.PENDING, self.audio_hash, deadline_seconds=300) for _ in range(20)]
+        for follower in followers:
+            self.assertEqual(app.dispatch_job(follower, self.audio_hash), "attached")
+        self.assertEqual(app.audio_dedup.stats()["follower_deadlines"], 20)
+        self.assertLessEqual(threading.active_count(), threads_before + 1)
+        app.job_store.complete(self.leader, "same words", None)
+        app.release_job(self.leader)
+        self.assertEqual(app.audio_dedup.stats()["follower_deadlines"], 0)
+        for follower in followers:
+            self.assertEqual(app.job_store.get(follower)["status"], JobStatus.COMPLETED)
+        self.assertFalse(any(isinstance(thread, threading.Timer) for thread in threading.enumerate()))
+
+    def test_cancelled_follower_drops_its_deadline(self):
+        follower = create_job(JobStatus.PENDING, self.audio_hash, deadline_seconds=300)
+        app.dispatch_job(follower, self.audio_hash)
+        self.assertTrue(app.audio_dedup.detach(follower))
+        self.assertEqual(app.audio_dedup.stats()["follower_deadlines"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import uuid
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app  # noqa: E402
+from app import JobCancelledError, JobControl, JobStatus, SQLiteJobStore  # noqa: E402
+
+
+def make_job(user_id: str, status: str = JobStatus.PROCESSING) -> dict:
+    now = datetime.now().isoformat()
+    return {
+        "id": str(uuid.uuid4()), "status": status, "progress": 10, "created_at": now, "updated_at": now,
+        "completed_at": None, "result": None, "error": None, "failure_reason": None, "deadline_at": None,
+        "categories": None, "user_id": user_id, "priority": "interactive", "last_stage": None,
+        "recovery_attempts": 0, "audio_hash": None, "duplicate_of": None, "segments": None
+    }
+
+
+class CancelRoutesTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.app.test_client()
+        self.headers = {"X-Frontend-Version": app.VERSION}
+
+    def test_bulk_cancel_rejects_non_string_ids(self):
+        for job_ids in ([["x"]], [1], [None], "abc"):
+            response = self.client.post("/jobs/cancel", json={"job_ids": job_ids}, headers=self.headers)
+            self.assertEqual(response.status_code, 400, job_ids)
+
+    def test_owned_job_needs_the_owners_id(self):
+        job = make_job("alice")
+        app.job_store.create(job)
+        for headers in ({}, {"X-User-ID": "bob"}):
+            response = self.client.delete(f"/job/{job['id']}", headers={**self.headers, **headers})
+            self.assertEqual(response.status_code, 403, headers)
+        self.assertEqual(app.job_store.get(job["id"])["status"], JobStatus.PROCESSING)
+        response = self.client.delete(f"/job/{job['id']}", headers={**self.headers, "X-User-ID": "alice"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["status"], JobStatus.CANCELLED)
+
+    def test_job_removed_during_cancel_is_not_found(self):
+        with mock.patch.object(app, "cancel_job", return_value="cancelled"):
+            response = self.client.delete(f"/job/{uuid.uuid4()}", headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+
+class CrossProcessCancelTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, "jobs.db")
+        # Two handles on one database stand in for two worker processes
+        self.owner = SQLiteJobStore(path, flush_interval=0.05, change_poll_interval=0.05, change_log_rows=100)
+        self.other = SQLiteJobStore(path, flush_interval=0.05, change_poll_interval=0.05, change_log_rows=100)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cancel_reaches_the_owning_process(self):
+        job = make_job("alice")
+        self.owner.create(job)
+        with mock.patch.object(app, "job_store", self.other):
+            self.assertEqual(app.cancel_job(job["id"], "alice"), "cancelled")
+        with mock.patch.object(app, "job_store", self.owner):
+            with self.assertRaises(JobCancelledError):
+                JobControl(job["id"]).check()
+        self.assertEqual(self.owner.get(job["id"])["status"], JobStatus.CANCELLED)
+        self.assertNotIn("cancel_requested", self.owner.get(job["id"]))
+
+    def test_finished_job_is_not_cancellable(self):
+        job = make_job("alice", JobStatus.COMPLETED)
+        self.owner.create(job)
+        with mock.patch.object(app, "job_store", self.other):
+            self.assertEqual(app.cancel_job(job["id"], "alice"), "not_cancellable")
+        self.assertFalse(self.owner.cancel_requested(job["id"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
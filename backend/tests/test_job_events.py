@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+import unittest
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app  # noqa: E402
+from app import JobStatus  # noqa: E402
+
+
+def create_job(user_id: str) -> str:
+    job_id = str(uuid.uuid4())
+    now = datetime.now().isoformat()
+    app.job_store.create({
+        "id": job_id, "status": JobStatus.COMPLETED, "progress": 100, "created_at": now, "updated_at": now,
+        "completed_at": now, "result": f"words for {user_id}", "error": None, "failure_reason": None,
+        "deadline_at": None, "categories": None, "user_id": user_id, "priority": "interactive",
+        "last_stage": None, "recovery_attempts": 0, "audio_hash": None, "duplicate_of": None, "segments": None
+    })
+    return job_id
+
+
+class JobEventStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.app.test_client()
+        self.headers = {"X-Frontend-Version": app.VERSION}
+
+    def test_user_id_is_required(self):
+        response = self.client.get("/jobs/events", headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_snapshot_only_has_the_users_jobs(self):
+        own = create_job("alice")
+        create_job("bob")
+        response = self.client.get("/jobs/events", headers={**self.headers, "X-User-ID": "alice"}, buffered=False)
+        self.assertEqual(response.status_code, 200)
+        text = ""
+        for chunk in response.response:
+            text += chunk.decode() if isinstance(chunk, bytes) else chunk
+            if "event: snapshot" in text and text.endswith("\n\n"):
+                break
+        response.close()
+        data = next(line for line in text.split("\n") if line.startswith("data: "))
+        jobs = json.loads(data[len("data: "):])["jobs"]
+        self.assertIn(own, [job["id"] for job in jobs])
+        self.assertEqual({job["user_id"] for job in jobs}, {"alice"})
+
+
+if __name__ == "__main__":
+    unittest.main()
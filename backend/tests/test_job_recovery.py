@@ -0,0 +1,65 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import JobStatus, SQLiteJobStore  # noqa: E402
+
+
+def make_job(job_id: str, status: str = JobStatus.PROCESSING) -> dict:
+    now = datetime.now().isoformat()
+    return {
+        "id": job_id, "status": status, "progress": 10, "created_at": now, "updated_at": now,
+        "completed_at": None, "result": None, "error": None, "failure_reason": None, "deadline_at": None,
+        "categories": None, "user_id": None, "priority": "interactive", "last_stage": None,
+        "recovery_attempts": 0, "audio_hash": None, "duplicate_of": None, "segments": None
+    }
+
+
+class JobRecoveryOwnershipTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "jobs.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_store(self, lease_seconds: float, alive: bool = True) -> SQLiteJobStore:
+        """Open the shared database as another process would; a dead one never renews its leases."""
+        store = SQLiteJobStore(self.path, flush_interval=0.05, change_poll_interval=0.05, change_log_rows=100,
+                               lease_seconds=lease_seconds)
+        if not alive:
+            store._ensure_lease_keeper = lambda: None  # type: ignore[method-assign]
+        return store
+
+    def test_live_owner_keeps_its_jobs(self):
+        owner = self.open_store(lease_seconds=0.3)
+        for index in range(5):
+            owner.create(make_job(f"job-{index}"))
+        time.sleep(0.8)
+        other = self.open_store(lease_seconds=0.3)
+        self.assertEqual(other.claim_orphaned(), [])
+        self.assertEqual(owner.get("job-0")["recovery_attempts"], 0)
+
+    def test_orphaned_jobs_are_claimed_once(self):
+        dead = self.open_store(lease_seconds=0.1, alive=False)
+        dead.create(make_job("running"))
+        dead.create(make_job("queued", JobStatus.PENDING))
+        dead.create(make_job("done", JobStatus.COMPLETED))
+        time.sleep(0.2)
+        first = self.open_store(lease_seconds=5)
+        second = self.open_store(lease_seconds=5)
+        claimed = first.claim_orphaned()
+        self.assertEqual(sorted(job["id"] for job in claimed), ["queued", "running"])
+        self.assertTrue(all(job["recovery_attempts"] == 1 for job in claimed))
+        self.assertNotIn("lease_owner", claimed[0])
+        self.assertEqual(second.claim_orphaned(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app  # noqa: E402
+
+
+class TranscribeUploadTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.app.test_client()
+        self.headers = {"X-Frontend-Version": app.VERSION}
+
+    def upload(self, **headers: str):
+        return self.client.post(
+            "/transcribe",
+            data={"audio": (io.BytesIO(b"not really audio"), "clip.wav")},
+            headers={**self.headers, **headers}
+        )
+
+    def test_non_finite_deadlines_are_rejected(self):
+        for value in ("nan", "NaN", "inf", "-inf"):
+            response = self.upload(**{"X-Job-Deadline": value})
+            self.assertEqual(response.status_code, 400, value)
+            self.assertIn("Invalid deadline", response.get_json()["error"])
+
+    def test_failed_job_creation_removes_spooled_audio(self):
+        spooled = set(os.listdir(app.AUDIO_SPOOL_DIR)) if os.path.isdir(app.AUDIO_SPOOL_DIR) else set()
+        with mock.patch.object(app.job_store, "create", side_effect=RuntimeError("database is locked")):
+            response = self.upload()
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(set(os.listdir(app.AUDIO_SPOOL_DIR)), spooled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import io
+import os
+import random
+import struct
+import sys
+import unittest
+import wave
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import SegmentedTranscriber, parse_wav_header  # noqa: E402
+
+
+def make_wav(channels: int = 1, sample_width: int = 2, rate: int = 16000, seconds: float = 1.0) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(sample_width)
+        f.setframerate(rate)
+        f.writeframes(random.Random(7).randbytes(int(rate * seconds) * channels * sample_width))
+    return buffer.getvalue()
+
+
+def insert_chunk(audio: bytes, chunk_id: bytes, body: bytes, pad: bool = True) -> bytes:
+    """Put a chunk in front of the data chunk."""
+    chunk = chunk_id + struct.pack("<I", len(body)) + body + (b"\0" if pad and len(body) % 2 else b"")
+    index = audio.index(b"data")
+    return audio[:index] + chunk + audio[index:]
+
+
+class ParseWavHeaderTest(unittest.TestCase):
+    def test_pcm_wav(self):
+        audio = make_wav(channels=2, sample_width=4, rate=8000)
+        self.assertEqual(parse_wav_header(audio), {
+            "data_start": 44, "data_end": len(audio), "channels": 2, "sample_width": 4, "sample_rate": 8000
+        })
+
+    def test_odd_sized_chunk_is_padded(self):
+        audio = insert_chunk(make_wav(), b"LIST", b"abcde")
+        self.assertEqual(parse_wav_header(audio)["data_start"], 44 + 8 + 6)
+
+    def test_unpadded_odd_sized_chunk_is_rejected(self):
+        self.assertIsNone(parse_wav_header(insert_chunk(make_wav(), b"LIST", b"abcde", pad=False)))
+
+    def test_truncated_fmt_chunk(self):
+        audio = make_wav()
+        for length in range(12, 36):
+            self.assertIsNone(parse_wav_header(audio[:length]), length)
+
+    def test_short_fmt_chunk(self):
+        audio = make_wav()
+        audio = audio[:16] + struct.pack("<I", 8) + audio[20:28] + audio[36:]
+        self.assertIsNone(parse_wav_header(audio))
+
+    def test_fmt_chunk_larger_than_file(self):
+        audio = make_wav()
+        self.assertIsNone(parse_wav_header(audio[:16] + struct.pack("<I", 1 << 20) + audio[20:]))
+
+    def test_compressed_and_non_wav_uploads(self):
+        self.assertIsNone(parse_wav_header(b"\x1aE\xdf\xa3" + bytes(100)))
+        self.assertIsNone(parse_wav_header(b""))
+        float_wav = bytearray(make_wav())
+        float_wav[20:22] = struct.pack("<H", 3)
+        self.assertIsNone(parse_wav_header(bytes(float_wav)))
+
+
+class SegmentedTranscriberSplitTest(unittest.TestCase):
+    def setUp(self):
+        self.transcriber = SegmentedTranscriber(segment_bytes=64 * 1024, overlap_bytes=4 * 1024,
+                                                search_bytes=8 * 1024, max_workers=1)
+
+    def test_pcm_wav_is_cut_on_sample_frames(self):
+        audio = make_wav(channels=2, sample_width=2, seconds=5)
+        segments = self.transcriber.split(audio)
+        self.assertGreater(len(segments), 1)
+        self.assertEqual(segments[0][0], 44)
+        self.assertEqual(segments[-1][1], len(audio))
+        for start, end in segments:
+            self.assertEqual((start - 44) % 4, 0)
+            self.assertEqual((end - 44) % 4, 0)
+        for (_, previous_end), (next_start, _) in zip(segments, segments[1:]):
+            self.assertLess(next_start, previous_end)
+
+    def test_other_uploads_take_a_single_pass(self):
+        webm = b"\x1aE\xdf\xa3" + random.Random(1).randbytes(500 * 1024)
+        self.assertEqual(self.transcriber.split(webm), [(0, len(webm))])
+        truncated = make_wav(seconds=5)[:30]
+        self.assertEqual(self.transcriber.split(truncated), [(0, 30)])
+
+
+if __name__ == "__main__":
+    unittest.main()
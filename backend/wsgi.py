@@ -0,0 +1,9 @@
+"""WSGI entry point, e.g. `gunicorn --workers 4 wsgi:app` from the backend directory.
+
+Every worker process imports this module and starts its own job reaper and
+job recovery. Don't preload the app: threads started before the fork don't
+survive into the workers.
+"""
+from app import app, start_background_tasks
+
+start_background_tasks()
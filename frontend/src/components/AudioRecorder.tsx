@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from "react";
+import React, { useState, useEffect, useCallback, useRef } from "react";
 import {
   Button,
   Typography,
@@ -29,13 +29,14 @@ const StyledPaper = styled(Paper)(({ theme }) => ({
  */
 interface TranscriptionJob {
   id: string;
-  status: 'pending' | 'processing' | 'completed' | 'failed';
+  status: 'pending' | 'processing' | 'completed' | 'failed' | 'cancelled';
   progress: number;
   created_at: string;
   updated_at: string;
   completed_at: string | null;
   result: string | null;
   error: string | null;
+  partial_result?: string;
   categories?: {
     categories: string[];
     sentiment: string;
@@ -64,8 +65,10 @@ const AudioRecorder: React.FC<AudioRecorderProps> = ({ onTranscriptionComplete,
   const [recordingTime, setRecordingTime] = useState(0);
   const [finalRecordingTime, setFinalRecordingTime] = useState(0);
   const [activeJobs, setActiveJobs] = useState<TranscriptionJob[]>([]);
-  const [pollingInterval, setPollingInterval] = useState<NodeJS.Timeout | null>(null);
-  const [isPolling, setIsPolling] = useState<boolean>(false);
+  // Jobs whose completion has already been reported to the parent
+  const notifiedJobs = useRef<Set<string>>(new Set());
+  const onCompleteRef = useRef(onTranscriptionComplete);
+  onCompleteRef.current = onTranscriptionComplete;
 
   // Maximum recording time in seconds
   const MAX_RECORDING_TIME = 60;
@@ -163,29 +166,8 @@ const AudioRecorder: React.FC<AudioRecorderProps> = ({ onTranscriptionComplete,
             };
             
             console.log('Adding new job to active jobs:', newJob);
-            setActiveJobs(prevJobs => {
-              const newJobs = [...prevJobs, newJob];
-              console.log('Updated active jobs:', newJobs);
-              return newJobs;
-            });
-            
-            // Start polling for job status if not already polling
-            if (!isPolling) {
-              console.log('Starting polling process');
-              setIsPolling(true);
-              
-              // First poll immediately
-              await pollJobsStatus();
-              
-              // Then set up interval
-              console.log('Setting up polling interval');
-              const interval = setInterval(() => {
-                pollJobsStatus().catch(err => {
-                  console.error('Error in polling interval:', err);
-                });
-              }, 1000);
-              setPollingInterval(interval);
-            }
+            // The event stream may already have delivered this job, so don't add it twice
+            setActiveJobs(prevJobs => prevJobs.some(j => j.id === newJob.id) ? prevJobs : [...prevJobs, newJob]);
           }
         } catch (error) {
           console.error("Error sending audio:", error);
@@ -203,102 +185,39 @@ const AudioRecorder: React.FC<AudioRecorderProps> = ({ onTranscriptionComplete,
   };
 
   /**
-   * Polls for updates on active transcription jobs
+   * Subscribes to server-pushed job events for the lifetime of the component
    */
-  const pollJobsStatus = async (): Promise<void> => {
-    try {
-      console.log('Polling for job status updates...', activeJobs);
-      
-      // Handle race condition: If component just initialized its state, we may have empty activeJobs
-      // Let's also check for jobs in the backend
-      if (activeJobs.length === 0) {
-        console.log('No active jobs in state, checking backend for any jobs');
-        try {
-          const allJobsResponse = await APIService.getAllJobs();
-          if (!allJobsResponse.error && allJobsResponse.data?.jobs?.length > 0) {
-            console.log('Found jobs in backend:', allJobsResponse.data.jobs);
-            // Update our state with all jobs from backend
-            setActiveJobs(allJobsResponse.data.jobs);
-            return; // Return and let the next polling cycle handle these jobs
-          }
-        } catch (err) {
-          console.error('Error fetching all jobs:', err);
-        }
-      }
-      
-      // Find jobs that need polling (pending or processing)
-      const pendingJobs = activeJobs.filter(job => 
-        job.status === 'pending' || job.status === 'processing'
-      );
-      
-      console.log(`Found ${pendingJobs.length} pending jobs to poll, total jobs: ${activeJobs.length}`);  
-      
-      // If no pending jobs but we have completed/failed jobs, we still want to show them
-      // We'll just stop the polling
-      if (pendingJobs.length === 0 && activeJobs.length > 0) {
-        if (pollingInterval) {
-          console.log('No more pending jobs, but keeping completed jobs visible');
-          clearInterval(pollingInterval);
-          setPollingInterval(null);
-          setIsPolling(false);
-        }
-        return;
-      }
-      
-      // If no jobs at all, no need to poll
-      if (activeJobs.length === 0) {
-        if (pollingInterval) {
-          console.log('No active jobs at all, clearing polling interval');
-          clearInterval(pollingInterval);
-          setPollingInterval(null);
-          setIsPolling(false);
-        }
-        return;
-      }
-      
-      // Poll for each pending job
-      for (const job of pendingJobs) {
-        try {
-          console.log(`Polling job ${job.id}...`);
-          const response = await APIService.getJobStatus(job.id);
-          if (!response.error && response.data) {
-            console.log(`Job ${job.id} status update:`, {
-              previousStatus: job.status,
-              newStatus: response.data.status,
-              id: response.data.id,
-              data: response.data
-            });
-            
-            // Update job in state with a proper state update to trigger re-renders
-            setActiveJobs(prevJobs => {
-              // Create completely new job object to ensure React detects the change
-              const updatedJobs = prevJobs.map(j => 
-                j.id === job.id ? {...response.data} : j
-              );
-              
-              console.log('Updated jobs after polling:', updatedJobs);
-              
-              // Force a complete new array to ensure proper re-rendering
-              return [...updatedJobs];
-            });
-            
-            // If job is complete, notify parent component
-            if (response.data.status === 'completed' && response.data.result) {
-              console.log(`Job ${job.id} completed with result:`, response.data.result);
-              onTranscriptionComplete(response.data.result, job.id);
-              
-              // Important: We keep the job in the activeJobs state even when complete
-              // This ensures it remains visible in the UI
-            }
+  useEffect(() => {
+    const unsubscribe = APIService.subscribeToJobEvents({
+      onSnapshot: (jobs) => {
+        console.log('Received job snapshot:', jobs);
+        // Jobs that were already finished when we connected aren't new completions
+        jobs.forEach(job => {
+          if (job.status === 'completed') {
+            notifiedJobs.current.add(job.id);
           }
-        } catch (error) {
-          console.error(`Error polling job ${job.id}:`, error);
+        });
+        setActiveJobs(jobs);
+      },
+      onJob: (job) => {
+        console.log(`Job ${job.id} update:`, job);
+        setActiveJobs(prevJobs => prevJobs.some(j => j.id === job.id)
+          ? prevJobs.map(j => j.id === job.id ? { ...job } : j)
+          : [...prevJobs, job]);
+
+        // If job is complete, notify parent component once
+        if (job.status === 'completed' && job.result && !notifiedJobs.current.has(job.id)) {
+          notifiedJobs.current.add(job.id);
+          console.log(`Job ${job.id} completed with result:`, job.result);
+          onCompleteRef.current(job.result, job.id);
         }
+      },
+      onRemoved: (jobId) => {
+        setActiveJobs(prevJobs => prevJobs.filter(j => j.id !== jobId));
       }
-    } catch (error) {
-      console.error('Error in pollJobsStatus:', error);
-    }
-  };
+    });
+    return unsubscribe;
+  }, []);
 
   // Debug: Log active jobs when they change
   useEffect(() => {
@@ -320,16 +239,18 @@ const AudioRecorder: React.FC<AudioRecorderProps> = ({ onTranscriptionComplete,
     console.log('Jobs after sorting (debug):', sortedJobs.map(job => `${job.id.split('-')[0]}: ${job.status}`));
   }, [activeJobs]);
   
-  // Clean up polling interval on unmount
-  useEffect(() => {
-    return () => {
-      if (pollingInterval) {
-        console.log('Component unmounting, clearing polling interval');
-        clearInterval(pollingInterval);
-        setIsPolling(false);
-      }
-    };
-  }, [pollingInterval]);
+  /**
+   * Cancels a pending or processing job and updates it in place
+   * @param jobId - ID of the job to cancel
+   */
+  const cancelJob = async (jobId: string): Promise<void> => {
+    const response = await APIService.cancelJob(jobId);
+    if (response.error) {
+      console.error(`Error cancelling job ${jobId}:`, response.error);
+    } else if (response.data) {
+      setActiveJobs(prevJobs => prevJobs.map(j => j.id === jobId ? { ...response.data! } : j));
+    }
+  };
   
   // Function to get status chip color
   const getStatusColor = (status: string) => {
@@ -338,6 +259,7 @@ const AudioRecorder: React.FC<AudioRecorderProps> = ({ onTranscriptionComplete,
       case 'processing': return 'info';
       case 'completed': return 'success';
       case 'failed': return 'error';
+      case 'cancelled': return 'default';
       default: return 'default';
     }
   };
@@ -387,15 +309,15 @@ const AudioRecorder: React.FC<AudioRecorderProps> = ({ onTranscriptionComplete,
               Transcription Jobs ({activeJobs.length}):
             </Typography>
             
-            {activeJobs.some(job => job.status === 'completed' || job.status === 'failed') && (
+            {activeJobs.some(job => job.status === 'completed' || job.status === 'failed' || job.status === 'cancelled') && (
               <Button 
                 size="small" 
                 variant="text" 
                 color="secondary"
                 onClick={() => {
-                  // Filter out completed and failed jobs
+                  // Filter out completed, failed and cancelled jobs
                   setActiveJobs(prev => prev.filter(
-                    job => job.status !== 'completed' && job.status !== 'failed'
+                    job => job.status !== 'completed' && job.status !== 'failed' && job.status !== 'cancelled'
                   ));
                 }}
               >
@@ -411,7 +333,8 @@ const AudioRecorder: React.FC<AudioRecorderProps> = ({ onTranscriptionComplete,
                 'processing': 0,
                 'pending': 1,
                 'completed': 2,
-                'failed': 3
+                'failed': 3,
+                'cancelled': 4
               };
               
               // Extract priorities with fallback to high number for unknown statuses
@@ -427,12 +350,19 @@ const AudioRecorder: React.FC<AudioRecorderProps> = ({ onTranscriptionComplete,
                 <Typography variant="body2" sx={{ fontWeight: 'medium' }}>
                   Job: {job.id.split('-')[0]}...
                 </Typography>
-                <Chip 
-                  label={job.status}
-                  size="small"
-                  color={getStatusColor(job.status) as any}
-                  variant={job.status === 'completed' ? 'filled' : 'outlined'}
-                />
+                <Box sx={{ display: 'flex', alignItems: 'center', gap: 0.5 }}>
+                  {(job.status === 'pending' || job.status === 'processing') && (
+                    <Button size="small" variant="text" color="secondary" onClick={() => cancelJob(job.id)}>
+                      Cancel
+                    </Button>
+                  )}
+                  <Chip 
+                    label={job.status}
+                    size="small"
+                    color={getStatusColor(job.status) as any}
+                    variant={job.status === 'completed' ? 'filled' : 'outlined'}
+                  />
+                </Box>
               </Box>
               
               <LinearProgress 
@@ -448,9 +378,17 @@ const AudioRecorder: React.FC<AudioRecorderProps> = ({ onTranscriptionComplete,
                     ? `Completed in ${Math.round((new Date(job.completed_at!).getTime() - new Date(job.created_at).getTime()) / 1000)}s` 
                     : job.status === 'failed' 
                       ? `Error: ${job.error}` 
-                      : `Progress: ${job.progress}%`}
+                      : job.status === 'cancelled'
+                        ? 'Cancelled'
+                        : `Progress: ${job.progress}%`}
                 </Typography>
                 
+                {job.status === 'processing' && job.partial_result && (
+                  <Typography variant="caption" color="text.secondary" display="block" sx={{ mt: 1, fontSize: '0.7rem', fontStyle: 'italic' }}>
+                    So far: {job.partial_result}
+                  </Typography>
+                )}
+                
                 {job.status === 'completed' && job.result && (
                   <>
                     <Typography variant="caption" color="text.secondary" display="block" sx={{ mt: 1, fontSize: '0.7rem' }}>
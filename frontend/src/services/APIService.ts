@@ -3,10 +3,11 @@ interface APIResponse<T> {
   data?: T;
   error?: string;
   version?: string;
+  retryAfter?: number;
 }
 
 // Job status types
-type JobStatus = 'pending' | 'processing' | 'completed' | 'failed';
+type JobStatus = 'pending' | 'processing' | 'completed' | 'failed' | 'cancelled';
 
 // Transcription Job interface
 interface TranscriptionJob {
@@ -18,6 +19,15 @@ interface TranscriptionJob {
   completed_at: string | null;
   result: string | null;
   error: string | null;
+  failure_reason?: 'timeout' | 'error' | null;
+  deadline_at?: string | null;
+  duplicate_of?: string | null;
+  // Transcript so far while the job is processing, and how many segments it covers
+  segments?: string[];
+  segment_cursor?: number;
+  partial_result?: string;
+  // Incremented on every change to the job
+  revision?: number;
   categories?: {
     categories: string[];
     sentiment: string;
@@ -29,12 +39,43 @@ interface TranscriptionJob {
 interface TranscriptionJobResponse {
   job_id: string;
   status: JobStatus;
+  duplicate_of?: string | null;
 }
 
 interface AllJobsResponse {
   jobs: TranscriptionJob[];
 }
 
+interface CancelJobsResponse {
+  cancelled: string[];
+  skipped: Record<string, string>;
+}
+
+// Admission control state reported by the backend
+interface AdmissionState {
+  accepting: boolean;
+  queue_depth: number;
+  estimated_wait_seconds: number;
+  average_job_seconds: number;
+  max_queue_depth: number;
+  max_estimated_wait_seconds: number;
+  max_user_backlog: number;
+  user_backlog?: number;
+  admitted: number;
+  shed: number;
+  throttled: number;
+}
+
+// Handlers for the job event stream
+interface JobEventHandlers {
+  // All of the user's jobs, sent on connect and whenever the stream has to resync
+  onSnapshot: (jobs: TranscriptionJob[]) => void;
+  // A job was created or changed
+  onJob: (job: TranscriptionJob) => void;
+  // A job no longer exists on the server
+  onRemoved?: (jobId: string) => void;
+}
+
 // Version callback type
 type VersionChangeCallback = (backendVersion: string, frontendVersion: string) => void;
 
@@ -51,13 +92,15 @@ class APIService {
   // State
   private backendVersion: string = "";
   private userID: string = "";
+  private userIDReady: Promise<void>;
   private versionMismatch: boolean = false;
   private versionChangeCallbacks: VersionChangeCallback[] = [];
   private versionCheckInterval: number | null = null;
+  private backoffUntil: number = 0;
 
   constructor() {
     // Initialize user ID from localStorage or get from server
-    this.initializeUserID();
+    this.userIDReady = this.initializeUserID();
     
     // Check version on initialization
     this.checkBackendVersion();
@@ -236,6 +279,14 @@ class APIService {
       
       const data = await response.json();
       
+      // Back off when the server sheds load or throttles this user
+      if (response.status === 429 || response.status === 503) {
+        const retryAfter = Number(response.headers.get('Retry-After') ?? data.retry_after) || 1;
+        this.backoffUntil = Math.max(this.backoffUntil, Date.now() + retryAfter * 1000);
+        console.warn(`Server is busy (${response.status}), backing off for ${retryAfter}s`);
+        return { error: data.error || 'Server is busy, please try again later', retryAfter, version: data.version };
+      }
+      
       // Check for version mismatch in response
       if (response.status === 409 && data.error === "Version mismatch") {
         this.versionMismatch = true;
@@ -256,6 +307,11 @@ class APIService {
         }
       }
       
+      // Surface other error responses (e.g. 404, 409 on cancel) as errors rather than data
+      if (!response.ok) {
+        return { error: data.error || `Request failed with status ${response.status}`, version: data.version };
+      }
+      
       return { data: data, version: data.version };
     } catch (error) {
       return { error: `Request failed: ${error}` };
@@ -265,11 +321,24 @@ class APIService {
   /**
    * Uploads audio blob for transcription
    * @param audioBlob - The audio recording blob to transcribe
+   * @param deadlineSeconds - Optional time the server may spend on the job before failing it
    * @returns Promise with job creation response
    */
-  public async transcribeAudio(audioBlob: Blob): Promise<APIResponse<TranscriptionJobResponse>> {
+  public async transcribeAudio(audioBlob: Blob, deadlineSeconds?: number): Promise<APIResponse<TranscriptionJobResponse>> {
+    // Don't pile more uploads onto an overloaded server
+    const backoffRemaining = this.getBackoffRemaining();
+    if (backoffRemaining > 0) {
+      return {
+        error: `Server is busy, please try again in ${backoffRemaining}s`,
+        retryAfter: backoffRemaining
+      };
+    }
+
     const formData = new FormData();
     formData.append("audio", audioBlob, "recording.wav");
+    if (deadlineSeconds !== undefined) {
+      formData.append("deadline_seconds", String(deadlineSeconds));
+    }
 
     return this.makeRequest<TranscriptionJobResponse>("/transcribe", "POST", formData);
   }
@@ -277,12 +346,22 @@ class APIService {
   /**
    * Gets status of a specific transcription job
    * @param jobId - ID of the job to check
+   * @param waitSeconds - Optional long-poll: let the server hold the request until the job changes
+   * @param sinceRevision - Optional revision already seen; the server answers once the job moves past it
    * @returns Promise with job status
    */
-  public async getJobStatus(jobId: string): Promise<APIResponse<TranscriptionJob>> {
+  public async getJobStatus(jobId: string, waitSeconds?: number, sinceRevision?: number): Promise<APIResponse<TranscriptionJob>> {
     console.log(`Polling job status for job ${jobId}`);
     try {
-      const response = await this.makeRequest<TranscriptionJob>(`/job/${jobId}`, "GET");
+      const params = new URLSearchParams();
+      if (waitSeconds !== undefined) {
+        params.append("wait", String(waitSeconds));
+      }
+      if (sinceRevision !== undefined) {
+        params.append("since", String(sinceRevision));
+      }
+      const query = params.toString();
+      const response = await this.makeRequest<TranscriptionJob>(`/job/${jobId}${query ? `?${query}` : ''}`, "GET");
       console.log(`Got response for job ${jobId}:`, response);
       
       if (response.error) {
@@ -322,6 +401,140 @@ class APIService {
     }
   }
 
+  /**
+   * Subscribes to status, progress and result changes for this user's jobs.
+   * The stream is read with fetch rather than EventSource so the version and
+   * user headers can be sent; it opens once the user ID is known and
+   * reconnects with Last-Event-ID after errors.
+   * @param handlers - Callbacks for snapshot, job and removed events
+   * @returns Function that closes the subscription
+   */
+  public subscribeToJobEvents(handlers: JobEventHandlers): () => void {
+    const controller = new AbortController();
+    let lastEventId = '';
+    let retryMs = 2000;
+
+    const dispatch = (name: string, data: string, id: string) => {
+      if (id) {
+        lastEventId = id;
+      }
+      const payload = JSON.parse(data);
+      if (name === 'snapshot') {
+        handlers.onSnapshot(payload.jobs);
+      } else if (name === 'job') {
+        handlers.onJob(payload);
+      } else if (name === 'removed') {
+        handlers.onRemoved?.(payload.id);
+      }
+    };
+
+    const connect = async (): Promise<void> => {
+      // The server only streams a user's own jobs, so wait until we know who that is
+      await this.userIDReady;
+      while (!controller.signal.aborted && !this.versionMismatch) {
+        try {
+          const headers: Record<string, string> = {
+            'Accept': 'text/event-stream',
+            'X-Frontend-Version': this.currentVersion,
+            'X-User-ID': this.userID
+          };
+          if (lastEventId) {
+            headers['Last-Event-ID'] = lastEventId;
+          }
+          const response = await fetch(`${this.baseUrl}/jobs/events`, { headers, signal: controller.signal });
+
+          if (response.status === 409) {
+            const data = await response.json();
+            this.versionMismatch = true;
+            this.backendVersion = data.backend_version;
+            this.notifyVersionChange(data.backend_version, this.currentVersion);
+            return;
+          }
+          if (!response.ok || !response.body) {
+            throw new Error(`Event stream failed with status ${response.status}`);
+          }
+
+          const reader = response.body.getReader();
+          const decoder = new TextDecoder();
+          let buffer = '';
+          for (;;) {
+            const { value, done } = await reader.read();
+            if (done) {
+              break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            // Events are separated by a blank line; keep any incomplete tail for the next chunk
+            const blocks = buffer.split('\n\n');
+            buffer = blocks.pop() ?? '';
+            for (const block of blocks) {
+              let name = 'message';
+              let id = '';
+              const data: string[] = [];
+              for (const line of block.split('\n')) {
+                if (line.startsWith('event:')) {
+                  name = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                  data.push(line.slice(5).trim());
+                } else if (line.startsWith('id:')) {
+                  id = line.slice(3).trim();
+                } else if (line.startsWith('retry:')) {
+                  retryMs = Number(line.slice(6).trim()) || retryMs;
+                }
+              }
+              if (data.length > 0) {
+                dispatch(name, data.join('\n'), id);
+              }
+            }
+          }
+        } catch (error) {
+          if (controller.signal.aborted) {
+            return;
+          }
+          console.error('Job event stream error:', error);
+        }
+        // Reconnect after the server's retry delay, or later if uploads are backing off
+        await new Promise(resolve => setTimeout(resolve, Math.max(retryMs, this.getBackoffRemaining() * 1000)));
+      }
+    };
+
+    connect();
+    return () => controller.abort();
+  }
+
+  /**
+   * Cancels a pending or processing transcription job
+   * @param jobId - ID of the job to cancel
+   * @returns Promise with the cancelled job
+   */
+  public async cancelJob(jobId: string): Promise<APIResponse<TranscriptionJob>> {
+    return this.makeRequest<TranscriptionJob>(`/job/${jobId}`, "DELETE");
+  }
+
+  /**
+   * Cancels several jobs at once
+   * @param jobIds - IDs of the jobs to cancel; omit to cancel all of this user's active jobs
+   * @returns Promise with the cancelled and skipped job IDs
+   */
+  public async cancelJobs(jobIds?: string[]): Promise<APIResponse<CancelJobsResponse>> {
+    return this.makeRequest<CancelJobsResponse>("/jobs/cancel", "POST", jobIds ? { job_ids: jobIds } : {});
+  }
+
+  /**
+   * Gets the backend's current admission state for uploads
+   * @returns Promise with admission state
+   */
+  public async getAdmissionState(): Promise<APIResponse<AdmissionState>> {
+    return this.makeRequest<AdmissionState>("/admission", "GET");
+  }
+
+  /**
+   * Seconds left before uploads should be retried after a 429/503
+   * @returns Remaining backoff in whole seconds, 0 if not backing off
+   */
+  public getBackoffRemaining(): number {
+    return Math.max(0, Math.ceil((this.backoffUntil - Date.now()) / 1000));
+  }
+
   /**
    * Check if there's a version mismatch between frontend and backend
    * @returns boolean indicating if versions don't match